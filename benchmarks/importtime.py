@@ -0,0 +1,123 @@
+"""Mesure le temps d'import de fre.opregex (et des modules dont il
+dépend) dans des interpréteurs neufs, avec python -X importtime,
+ainsi que le coût du premier accès aux caractères prédéfinis, et
+les compare à ceux d'une révision de référence (par défaut le
+premier commit du dépôt).
+
+Usage : python benchmarks/importtime.py [--runs N] [--baseline REV]
+"""
+
+import argparse
+import compileall
+import io
+import os
+import subprocess
+import sys
+import tarfile
+from statistics import median
+from tempfile import TemporaryDirectory
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CASES = (
+    ('re', 'import re'),
+    ('fre.fnregex', 'import fre.fnregex'),
+    ('fre.opregex', 'import fre.opregex'),
+    ('fre.opregex', 'import fre.opregex as op; op.lower, op.a, op.digit'),
+)
+
+
+def git(*args: str) -> bytes:
+    return subprocess.run(['git', *args], cwd=ROOT, capture_output=True,
+                          check=True).stdout
+
+
+def checkout(rev: str, path: str):
+    """Extrait le package fre de la révision rev dans path, puis
+    le compile afin de ne pas mesurer la compilation des sources
+    """
+
+    archive = git('archive', '--format=tar', rev, 'fre')
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(path)
+
+    compileall.compile_dir(os.path.join(path, 'fre'), quiet=1)
+
+
+def environ(root: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=root)
+    # un bytecode périmé forcerait la compilation à chaque import
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def importtime(root: str, code: str, module: str) -> int:
+    """Temps d'import cumulé de module, en microsecondes, lors de
+    l'exécution de code dans un nouvel interpréteur
+    """
+
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                         env=environ(root), capture_output=True, text=True,
+                         check=True).stderr
+
+    for line in err.splitlines():
+        fields = line.split('|')
+
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+
+    raise ValueError(f'{module} was not imported by {code!r}')
+
+
+def total(root: str, code: str) -> float:
+    """Durée totale de l'exécution de code dans un nouvel
+    interpréteur, en millisecondes
+    """
+
+    script = ('from time import perf_counter as t; s = t(); %s; '
+              'print((t() - s) * 1e3)' % code)
+    return float(subprocess.run([sys.executable, '-c', script],
+                                env=environ(root), capture_output=True,
+                                text=True, check=True).stdout)
+
+
+def measure(root: str, runs: int) -> list:
+    """Médianes du temps d'import et de la durée totale de
+    chaque cas
+    """
+
+    return [(median(importtime(root, code, module) for _ in range(runs)),
+             median(total(root, code) for _ in range(runs)))
+            for module, code in CASES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--baseline', default=None,
+                        help='révision de référence (premier commit si '
+                             'absente)')
+    args = parser.parse_args()
+    baseline = args.baseline or \
+        git('rev-list', '--max-parents=0', 'HEAD').split()[0].decode()
+
+    compileall.compile_dir(os.path.join(ROOT, 'fre'), quiet=1)
+
+    with TemporaryDirectory() as path:
+        checkout(baseline, path)
+        before = measure(path, args.runs)
+
+    after = measure(ROOT, args.runs)
+    print('%-56s %19s %19s' % ('', 'import (us)', 'total (ms)'))
+
+    for (module, code), (imp0, tot0), (imp1, tot1) in zip(CASES, before,
+                                                          after):
+        print('%-56s %8d -> %8d %8.2f -> %8.2f'
+              % (code, imp0, imp1, tot0, tot1))
+
+    print('baseline: %s' % baseline[:12])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compare le classement de lignes contre N FnRegex par un
+fre.patternset.PatternSet (un seul parcours par ligne) et par
+un appel à fnregex.match par FnRegex, pour N croissant.
+
+Usage : python benchmarks/patternset.py [--lines N] [--max N]
+"""
+
+import argparse
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import fre.opregex as op  # noqa: E402
+from fre.fnregex import literal, match  # noqa: E402
+from fre.patternset import PatternSet  # noqa: E402
+
+WORDS = ('GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'PATCH', 'TRACE', 'OPTIONS')
+
+
+def patterns(count: int) -> list:
+    """count FnRegex distinctes de la forme mot-nombre:"""
+
+    return [op.op(literal('%s-%d' % (WORDS[i % len(WORDS)], i)))
+            >> op.colon >> op.lower[1:] for i in range(count)]
+
+
+def corpus(size: int, count: int) -> list:
+    rnd = Random(21)
+    return ['%s-%d:%s' % (rnd.choice(WORDS), rnd.randrange(count * 2),
+                          'abc' * rnd.randint(1, 5)) for _ in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--max', type=int, default=128)
+    args = parser.parse_args()
+    count = 1
+
+    while count <= args.max:
+        fnrxs = patterns(count)
+        lines = corpus(args.lines, count)
+        patternset = PatternSet(fnrxs)
+        patternset.matches(lines[0])
+
+        start = perf_counter()
+        found = [patternset.first(line) for line in lines]
+        single = perf_counter() - start
+
+        start = perf_counter()
+        expected = [next((i for i, fnrx in enumerate(fnrxs)
+                          if match(fnrx, line).matched()), None)
+                    for line in lines]
+        each = perf_counter() - start
+
+        assert found == expected
+        print('patterns=%-4d patternset=%7.3fs  match-each=%7.3fs  '
+              'states=%d' % (count, single, each, patternset.states))
+        count *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""Compare les backends de fre au module re de la librairie
+standard sur des charges couvrant char, charinterval, seq, choice,
+repeat et les presets de fre.opregex, à plusieurs tailles
+d'input.
+
+Pour chaque charge, taille et moteur, la suite mesure le débit
+(caractères par seconde), les percentiles de latence d'un appel
+et le pic de mémoire allouée par un appel (tracemalloc). Les
+résultats sont enregistrés au format JSON afin de pouvoir être
+comparés d'une version à l'autre avec --compare.
+
+Usage : python benchmarks/suite.py [--quick] [--output FICHIER]
+        [--compare FICHIER] [--sizes N [N ...]] [--engines ...]
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from sys import maxsize
+from time import perf_counter_ns
+from typing import Callable, List, NamedTuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import fre.opregex as op  # noqa: E402
+from fre.fnregex import FnRegex, fullmatch, seq, repeat, choice, \
+    char, charinterval, literal  # noqa: E402
+
+FORMAT = 1
+SIZES = (16, 256, 4096)
+QUICK_SIZES = (16, 256)
+ENGINES = ('fre', 'dfa', 'lazydfa', 'codegen', 're-backend', 'stdlib-re')
+# durée de mesure visée par cas, en secondes
+BUDGET = 0.2
+QUICK_BUDGET = 0.02
+PERCENTILES = (50, 90, 99)
+# écart relatif de débit au delà duquel --compare signale une
+# régression
+THRESHOLD = 0.1
+
+
+class Workload(NamedTuple):
+    """Une charge : fnrx et regex sont équivalentes et
+    correspondent entièrement à text(size)
+    """
+
+    name: str
+    fnrx: FnRegex
+    regex: str
+    unit: str
+
+    def text(self, size: int) -> str:
+        return self.unit * max(size // len(self.unit), 1)
+
+
+def _many(fnrx: FnRegex) -> FnRegex:
+    return repeat(fnrx, 0, maxsize)
+
+
+WORKLOADS = (
+    Workload('char', _many(char('a')), 'a*', 'a'),
+    Workload('charinterval', _many(charinterval('a', 'z')), '[a-z]*',
+             'abcdefghijklmnopqrstuvwxyz'),
+    Workload('seq', _many(seq(char('a'), char('b'), char('c'))), '(?:abc)*',
+             'abc'),
+    Workload('literal', _many(literal('abc')), '(?:abc)*', 'abc'),
+    Workload('choice', _many(choice(literal('ab'), literal('cd'),
+                                    literal('ef'))),
+             '(?:ab|cd|ef)*', 'abcdef'),
+    Workload('repeat', _many(seq(repeat(charinterval('0', '9'), 1, 3),
+                                 char('-'))),
+             '(?:[0-9]{1,3}-)*', '123-45-6-'),
+    Workload('lower', op.lower[1:], '[a-z]+', 'thequickbrownfox'),
+    Workload('upper', op.upper[1:], '[A-Z]+', 'THEQUICKBROWNFOX'),
+    Workload('digit', op.digit[1:], '[0-9]+', '0123456789'),
+)
+
+
+def _engine(workload: Workload, engine: str) -> Callable[[str], bool]:
+    if engine == 'stdlib-re':
+        regex = re.compile(workload.regex)
+        return lambda inp: regex.fullmatch(inp) is not None
+
+    fnrx = workload.fnrx
+    backend = {'fre': None, 're-backend': 're'}.get(engine, engine)
+    return lambda inp: fullmatch(fnrx, inp, backend).matched()
+
+
+def _percentile(values: List[int], p: int) -> int:
+    return values[min(len(values) - 1, len(values) * p // 100)]
+
+
+def _peak(fn: Callable[[str], bool], inp: str) -> int:
+    """Pic de mémoire allouée par un appel, en octets"""
+
+    tracemalloc.start()
+
+    try:
+        fn(inp)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn(inp)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return max(peak - before, 0)
+
+
+def measure(workload: Workload, engine: str, size: int,
+            budget: float) -> dict:
+    """Mesure un cas
+
+    :return: le résultat du cas, prêt pour JSON
+    """
+
+    inp = workload.text(size)
+    fn = _engine(workload, engine)
+
+    if not fn(inp):
+        raise AssertionError(f'{engine} does not match {workload.name}')
+
+    latencies = []
+    deadline = perf_counter_ns() + int(budget * 1e9)
+
+    while not latencies or perf_counter_ns() < deadline:
+        start = perf_counter_ns()
+        fn(inp)
+        latencies.append(perf_counter_ns() - start)
+
+    latencies.sort()
+    total = sum(latencies)
+    result = {
+        'workload': workload.name,
+        'size': len(inp),
+        'engine': engine,
+        'calls': len(latencies),
+        'throughput': len(inp) * len(latencies) * 1e9 / max(total, 1),
+        'peak_bytes': _peak(fn, inp),
+    }
+
+    for p in PERCENTILES:
+        result[f'p{p}_ns'] = _percentile(latencies, p)
+
+    return result
+
+
+def _version() -> dict:
+    info = {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform()}
+
+    try:
+        info['commit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__), capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+
+    return info
+
+
+def run(sizes, engines, budget: float, log=None) -> dict:
+    """Exécute la suite
+
+    :return: le rapport complet, prêt pour JSON
+    """
+
+    results = []
+
+    for workload in WORKLOADS:
+        for size in sizes:
+            cases = [measure(workload, engine, size, budget)
+                     for engine in engines]
+            reference = next((c for c in cases
+                              if c['engine'] == 'stdlib-re'), None)
+
+            for case in cases:
+                if reference is not None:
+                    case['vs_re'] = case['throughput'] / \
+                                    reference['throughput']
+
+                results.append(case)
+
+                if log is not None:
+                    log(case)
+
+    return {'format': FORMAT,
+            'date': datetime.now(timezone.utc).isoformat(),
+            'environment': _version(),
+            'results': results}
+
+
+def _key(case: dict) -> tuple:
+    return case['workload'], case['size'], case['engine']
+
+
+def compare(baseline: dict, report: dict) -> List[str]:
+    """Compare le débit de chaque cas à celui d'un rapport
+    précédent
+
+    :return: la description des régressions
+    """
+
+    previous = {_key(case): case for case in baseline['results']}
+    regressions = []
+
+    for case in report['results']:
+        old = previous.get(_key(case))
+
+        if old is None:
+            continue
+
+        ratio = case['throughput'] / old['throughput']
+
+        if ratio < 1 - THRESHOLD:
+            regressions.append('%s size=%d %s: %.2fx throughput'
+                               % (_key(case) + (ratio,)))
+
+    return regressions
+
+
+def _print(case: dict):
+    print('%-13s %6d %-11s %12.0f ch/s  p50=%8dns  p99=%8dns  %7dB%s'
+          % (case['workload'], case['size'], case['engine'],
+             case['throughput'], case['p50_ns'], case['p99_ns'],
+             case['peak_bytes'],
+             '  %.2fx re' % case['vs_re'] if 'vs_re' in case else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true',
+                        help='tailles et durées réduites')
+    parser.add_argument('--sizes', type=int, nargs='+')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES,
+                        default=ENGINES)
+    parser.add_argument('--budget', type=float,
+                        help='durée de mesure par cas, en secondes')
+    parser.add_argument('--output', help='fichier JSON du rapport')
+    parser.add_argument('--compare', help='rapport JSON de référence')
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    budget = args.budget or (QUICK_BUDGET if args.quick else BUDGET)
+    report = run(sizes, args.engines, budget, _print)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report)
+
+        for regression in regressions:
+            print('regression:', regression)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Mesure la montée en charge de fre.threads.match_all de 1 à N
+threads, pour l'évaluation vectorisée (si NumPy est installé) et
+pour l'évaluation input par input d'une FnRegex non vectorisable.
+
+Usage : python benchmarks/threads.py [--threads N] [--size N]
+"""
+
+import argparse
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import fre.opregex as op  # noqa: E402
+from fre.threads import match_all  # noqa: E402
+
+code = op.upper[2:2] >> op.minus >> op.digit[4:4]
+# un noeud opaque empêche l'évaluation vectorisée
+opaque = code >> op.op(lambda m: m.current_ok())
+
+
+def corpus(size: int) -> list:
+    rnd = Random(15)
+    return [rnd.choice(['AB-1234', 'AB-123', 'ab-1234', 'XY-98765'])
+            for _ in range(size)]
+
+
+def measure(fnrx, inputs: list, threads: int, chunk_size: int) -> float:
+    start = perf_counter()
+    match_all(fnrx, inputs, True, threads, chunk_size)
+    return perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--size', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=1 << 12)
+    args = parser.parse_args()
+    inputs = corpus(args.size)
+
+    for name, fnrx in (('vector', code), ('scalar', opaque)):
+        base = None
+
+        for threads in range(1, args.threads + 1):
+            elapsed = measure(fnrx, inputs, threads, args.chunk_size)
+            base = base or elapsed
+            print('%-6s threads=%-3d %8.3fs  speedup=%.2f'
+                  % (name, threads, elapsed, base / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,669 @@
+"""Le module analysis regroupe les analyses statiques
+effectuées sur l'arbre des FnRegex : ensemble des premiers
+caractères possibles, préfixe littéral, bornes de la longueur
+des correspondances, sous-chaines littérales requises,
+capacité à matcher vide et déterminisme de l'expression.
+
+Une FnRegex est dite déterministe lorsque chaque décision
+(choix d'une branche, poursuite ou arrêt d'une répétition)
+peut être prise au vu du seul caractère courant. Pour ces
+expressions, la sémantique gloutonne et sans retour arrière
+des FnRegex coïncide avec celle d'une expression régulière
+classique (correspondance la plus longue), ce qui autorise
+leur compilation en automate.
+
+Ces analyses portent sur le langage décrit par l'arbre, dont
+les correspondances trouvées par le matching (possessif ou
+avec retour arrière) font toujours partie : un input qu'elles
+excluent peut donc être rejeté sans exécuter le matching
+(voir Guard).
+"""
+
+from __future__ import annotations
+
+from os.path import commonprefix
+from sys import maxsize
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+from fre import ranges as rg
+from fre.fnregex import FnRegex, Node, Seq, Repeat, Choice, CharInterval, \
+    Char, CharSet, Literal, Group, UnsupportedPatternError, LATIN1_MAX, \
+    MAX_DEPTH, SEQ, CHOICE, REPEAT, GROUP, node
+
+# au delà de FIND_LIMIT premiers caractères possibles, le
+# Prefilter teste chaque position plutôt que d'appeler str.find
+# pour chacun d'eux
+FIND_LIMIT = 4
+
+
+def char_ranges(fnrx: FnRegex) -> Optional[rg.Ranges]:
+    """Retourne l'ensemble des caractères matchés par une
+    FnRegex ne consommant qu'un seul caractère
+
+    :param fnrx: FnRegex à analyser
+    :return: les Ranges des caractères matchés ou None si la
+            FnRegex n'est pas un simple caractère
+    """
+
+    fnrx = node(fnrx)
+
+    if isinstance(fnrx, (Char, CharInterval, CharSet)):
+        return fnrx.ranges
+    else:
+        return None
+
+
+def _common(text: str, other: str) -> str:
+    """Retourne la plus longue sous-chaine commune à text et
+    other
+    """
+
+    best, start = 0, 0
+    # lengths[j] est la longueur du suffixe commun à text[:i]
+    # et other[:j]
+    lengths = [0] * (len(other) + 1)
+
+    for i in range(1, len(text) + 1):
+        for j in range(len(other), 0, -1):
+            if text[i - 1] == other[j - 1]:
+                lengths[j] = lengths[j - 1] + 1
+
+                if lengths[j] > best:
+                    best, start = lengths[j], i - lengths[j]
+            else:
+                lengths[j] = 0
+
+    return text[start:start + best]
+
+
+class _Analyzer:
+    """Calcule (avec mémoïsation) les propriétés first et
+    nullable des noeuds d'un arbre
+    """
+
+    def __init__(self):
+        self.firsts: Dict[int, rg.Ranges] = {}
+        self.nullables: Dict[int, bool] = {}
+        self.lengths: Dict[int, Tuple[int, int]] = {}
+
+    def first(self, n: FnRegex) -> rg.Ranges:
+        key = id(n)
+
+        if key not in self.firsts:
+            self.firsts[key] = self._first(n)
+
+        return self.firsts[key]
+
+    def nullable(self, n: FnRegex) -> bool:
+        key = id(n)
+
+        if key not in self.nullables:
+            self.nullables[key] = self._nullable(n)
+
+        return self.nullables[key]
+
+    def prepare(self, root: Node):
+        """Calcule first, nullable et length pour tous les
+        noeuds de root, des feuilles vers la racine et avec une
+        pile explicite : les appels suivants sur ces noeuds ne
+        demandent alors aucune récursion, quelle que soit la
+        profondeur de l'arbre
+        """
+
+        stack = [(root, False)]
+
+        while stack:
+            n, ready = stack.pop()
+
+            if id(n) in self.lengths:
+                continue
+            elif ready:
+                self.length(n)
+                self.nullable(n)
+                self.first(n)
+            else:
+                stack.append((n, True))
+
+                if n._kind in (SEQ, CHOICE):
+                    stack.extend((item, False) for item in n.items)
+                elif n._kind in (REPEAT, GROUP):
+                    stack.append((n.re, False))
+
+    def length(self, n: FnRegex) -> Tuple[int, int]:
+        """Retourne les longueurs minimale et maximale des
+        correspondances de n, maxsize tenant lieu d'infini. Un
+        noeud qui ne peut jamais matcher a pour bornes
+        (maxsize, 0).
+        """
+
+        key = id(n)
+
+        if key not in self.lengths:
+            self.lengths[key] = self._length(n)
+
+        return self.lengths[key]
+
+    def _length(self, n: FnRegex) -> Tuple[int, int]:
+        if char_ranges(n) is not None:
+            return (1, 1) if n.ranges else (maxsize, 0)
+        elif isinstance(n, Literal):
+            return len(n.text), len(n.text)
+        elif isinstance(n, Seq):
+            lengths = [self.length(item) for item in n.items]
+            low = min(maxsize, sum(lo for lo, _ in lengths))
+            return (low, 0) if low == maxsize \
+                else (low, min(maxsize, sum(hi for _, hi in lengths)))
+        elif isinstance(n, Choice):
+            lengths = [self.length(item) for item in n.items]
+            return min((lo for lo, _ in lengths), default=maxsize), \
+                max((hi for _, hi in lengths), default=0)
+        elif isinstance(n, Repeat):
+            start, stop = max(n.start, 0), max(n.stop, 0)
+
+            if start > stop:
+                return maxsize, 0
+
+            low, high = self.length(n.re)
+
+            if low == maxsize:
+                # seule la répétition vide est possible
+                return (0, 0) if start == 0 else (maxsize, 0)
+
+            return min(maxsize, low * start), min(maxsize, high * stop)
+        elif isinstance(n, Group):
+            return self.length(n.re)
+        else:
+            raise UnsupportedPatternError(n)
+
+    def required(self, n: FnRegex) -> FrozenSet[str]:
+        """Retourne des sous-chaines littérales non vides que
+        toute correspondance de n contient
+        """
+
+        literal = self.literal(n)
+
+        if literal is not None:
+            return frozenset((literal,) if literal else ())
+        elif isinstance(n, Seq):
+            found, run = set(), ''
+
+            # les littéraux consécutifs forment une seule
+            # sous-chaine, prolongée par le préfixe de l'élément
+            # qui les suit
+            for item in n.items:
+                literal = self.literal(item)
+
+                if literal is not None:
+                    run += literal
+                    continue
+
+                found.add(run + self.prefix(item))
+                found.update(self.required(item))
+                run = ''
+
+            found.add(run)
+            found.discard('')
+            return frozenset(found)
+        elif isinstance(n, Choice):
+            if not n.items:
+                return frozenset()
+
+            found = self.required(n.items[0])
+
+            # une sous-chaine commune à deux littéraux requis par
+            # deux branches est requise par l'une comme l'autre
+            for item in n.items[1:]:
+                found = frozenset(
+                    common for common in (_common(text, other)
+                                          for text in found
+                                          for other in self.required(item))
+                    if common)
+
+            return found
+        elif isinstance(n, Repeat) and 0 < n.start <= n.stop:
+            prefix = self.prefix(n)
+            return self.required(n.re) | \
+                frozenset((prefix,) if prefix else ())
+        elif isinstance(n, Group):
+            return self.required(n.re)
+        else:
+            return frozenset()
+
+    def _first(self, n: FnRegex) -> rg.Ranges:
+        chars = char_ranges(n)
+
+        if chars is not None:
+            return chars
+        elif isinstance(n, Literal):
+            return ((ord(n.text[0]), ord(n.text[0])),) if n.text else rg.EMPTY
+        elif isinstance(n, Seq):
+            firsts = []
+
+            for item in n.items:
+                firsts.append(self.first(item))
+
+                if not self.nullable(item):
+                    break
+
+            return rg.union(*firsts)
+        elif isinstance(n, Choice):
+            return rg.union(*(self.first(item) for item in n.items))
+        elif isinstance(n, Repeat):
+            if n.stop <= 0 or n.start > n.stop:
+                return rg.EMPTY
+
+            return self.first(n.re)
+        elif isinstance(n, Group):
+            return self.first(n.re)
+        else:
+            raise UnsupportedPatternError(n)
+
+    def _nullable(self, n: FnRegex) -> bool:
+        if char_ranges(n) is not None:
+            return False
+        elif isinstance(n, Literal):
+            return not n.text
+        elif isinstance(n, Seq):
+            return all(self.nullable(item) for item in n.items)
+        elif isinstance(n, Choice):
+            return any(self.nullable(item) for item in n.items)
+        elif isinstance(n, Repeat):
+            if n.start > n.stop:
+                return False
+
+            return n.start == 0 or self.nullable(n.re)
+        elif isinstance(n, Group):
+            return self.nullable(n.re)
+        else:
+            raise UnsupportedPatternError(n)
+
+    def deterministic(self, n: FnRegex, follow: rg.Ranges) -> bool:
+        if char_ranges(n) is not None or isinstance(n, Literal):
+            return True
+        elif isinstance(n, Seq):
+            for i, item in enumerate(n.items):
+                if not self.deterministic(item,
+                                          self._follow(n, i + 1, follow)):
+                    return False
+
+            return True
+        elif isinstance(n, Choice):
+            seen = rg.EMPTY
+
+            for i, item in enumerate(n.items):
+                first = self.first(item)
+
+                if rg.intersection(seen, first):
+                    return False
+
+                if self.nullable(item) and i != len(n.items) - 1:
+                    return False
+
+                if not self.deterministic(item, follow):
+                    return False
+
+                seen = rg.union(seen, first)
+
+            return not (self.nullable(n) and rg.intersection(seen, follow))
+        elif isinstance(n, Repeat):
+            if n.stop <= 0 or n.start > n.stop:
+                return True
+
+            first = self.first(n.re)
+
+            if n.start < n.stop and rg.intersection(first, follow):
+                return False
+
+            if n.stop == 1:
+                return self.deterministic(n.re, follow)
+            elif self.nullable(n.re):
+                return False
+            else:
+                return self.deterministic(n.re, rg.union(first, follow))
+        elif isinstance(n, Group):
+            return self.deterministic(n.re, follow)
+        else:
+            raise UnsupportedPatternError(n)
+
+    def literal(self, n: FnRegex) -> Optional[str]:
+        """Retourne l'unique chaine matchée par n, ou None si n
+        peut matcher plusieurs chaines
+        """
+
+        chars = char_ranges(n)
+
+        if chars is not None:
+            single = len(chars) == 1 and chars[0][0] == chars[0][1]
+            return chr(chars[0][0]) if single else None
+        elif isinstance(n, Literal):
+            return n.text
+        elif isinstance(n, Seq):
+            literals = [self.literal(item) for item in n.items]
+            return None if None in literals else ''.join(literals)
+        elif isinstance(n, Repeat) and n.start == n.stop:
+            literal = self.literal(n.re)
+            return None if literal is None else literal * n.start
+        elif isinstance(n, Group):
+            return self.literal(n.re)
+        else:
+            return None
+
+    def prefix(self, n: FnRegex) -> str:
+        """Retourne la plus longue chaine par laquelle toutes
+        les correspondances de n commencent
+        """
+
+        literal = self.literal(n)
+
+        if literal is not None:
+            return literal
+        elif isinstance(n, Seq):
+            prefix = ''
+
+            for item in n.items:
+                literal = self.literal(item)
+
+                if literal is None:
+                    return prefix + self.prefix(item)
+
+                prefix += literal
+
+            return prefix
+        elif isinstance(n, Choice) and n.items:
+            return commonprefix([self.prefix(item) for item in n.items])
+        elif isinstance(n, Repeat) and 0 < n.start <= n.stop:
+            literal = self.literal(n.re)
+            return self.prefix(n.re) if literal is None \
+                else literal * n.start
+        elif isinstance(n, Group):
+            return self.prefix(n.re)
+        else:
+            return ''
+
+    def _follow(self, n: Seq, i: int, follow: rg.Ranges) -> rg.Ranges:
+        firsts = []
+
+        for item in n.items[i:]:
+            firsts.append(self.first(item))
+
+            if not self.nullable(item):
+                return rg.union(*firsts)
+
+        return rg.union(follow, *firsts)
+
+
+def first(fnrx: FnRegex) -> rg.Ranges:
+    """Calcule l'ensemble des caractères par lesquels une
+    correspondance non vide de fnrx peut commencer
+
+    :param fnrx: FnRegex à analyser
+    :return: les Ranges des premiers caractères possibles
+    """
+
+    return _Analyzer().first(node(fnrx))
+
+
+def nullable(fnrx: FnRegex) -> bool:
+    """Indique si fnrx peut matcher en ne consommant
+    aucun caractère
+
+    :param fnrx: FnRegex à analyser
+    :return: True si fnrx peut matcher vide
+    """
+
+    return _Analyzer().nullable(node(fnrx))
+
+
+def is_deterministic(fnrx: FnRegex) -> bool:
+    """Indique si fnrx est déterministe, c'est à dire si
+    chacun de ses choix et chacune de ses répétitions peut
+    être décidé au vu du seul caractère courant.
+
+    Les FnRegex opaques (fonctions quelconques) ne sont
+    jamais considérées comme déterministes.
+
+    :param fnrx: FnRegex à analyser
+    :return: True si fnrx est déterministe
+    """
+
+    try:
+        return _Analyzer().deterministic(node(fnrx), rg.EMPTY)
+    except UnsupportedPatternError:
+        return False
+
+
+def length_bounds(fnrx: FnRegex) -> Tuple[int, Optional[int]]:
+    """Calcule les longueurs minimale et maximale des
+    correspondances de fnrx. La longueur minimale dépasse la
+    maximale lorsque fnrx ne peut jamais matcher.
+
+    :param fnrx: FnRegex à analyser
+    :return: la longueur minimale et la longueur maximale, None
+            si les correspondances ne sont pas bornées
+    :raise UnsupportedPatternError: si fnrx contient des
+            FnRegex opaques
+    """
+
+    low, high = _Analyzer().length(node(fnrx))
+    return low, None if high == maxsize else high
+
+
+def required_literals(fnrx: FnRegex) -> Tuple[str, ...]:
+    """Calcule des sous-chaines littérales que toute
+    correspondance de fnrx contient. Les sous-chaines
+    contenues dans une autre sous-chaine retenue sont omises.
+
+    :param fnrx: FnRegex à analyser
+    :return: les sous-chaines, de la plus longue à la plus
+            courte
+    """
+
+    try:
+        found = _Analyzer().required(node(fnrx))
+    except UnsupportedPatternError:
+        return ()
+
+    return tuple(sorted((text for text in found
+                         if not any(text != other and text in other
+                                    for other in found)),
+                        key=lambda text: (-len(text), text)))
+
+
+def literal_prefix(fnrx: FnRegex) -> str:
+    """Calcule la plus longue chaine littérale par laquelle
+    toutes les correspondances de fnrx commencent
+
+    :param fnrx: FnRegex à analyser
+    :return: le préfixe commun, éventuellement vide
+    """
+
+    try:
+        return _Analyzer().prefix(node(fnrx))
+    except UnsupportedPatternError:
+        return ''
+
+
+class Prefilter:
+    """Un Prefilter permet de sauter rapidement aux positions
+    d'un input où une correspondance de la FnRegex peut
+    commencer, à partir de son préfixe littéral (recherché avec
+    str.find) ou de l'ensemble de ses premiers caractères.
+    """
+
+    def __init__(self, fnrx: FnRegex):
+        rx = node(fnrx)
+        analyzer = _Analyzer()
+
+        try:
+            nullable_ = analyzer.nullable(rx)
+            prefix = analyzer.prefix(rx)
+            first_ = analyzer.first(rx)
+        except UnsupportedPatternError:
+            nullable_, prefix, first_ = True, '', rg.ANY
+
+        self.prefix = prefix if not nullable_ else ''
+        self.first = CharSet(first_) if not nullable_ else None
+        self._chars = [chr(c) for lo, hi in first_
+                       for c in range(lo, hi + 1)] \
+            if self.first is not None and rg.size(first_) <= FIND_LIMIT \
+            else None
+
+    def finder(self, value: str) -> Callable[[int], int]:
+        """Construit la fonction de recherche des positions
+        candidates dans value. Les positions demandées à cette
+        fonction doivent être croissantes.
+
+        :param value: input parcouru, str ou input binaire
+        :return: une fonction qui, à partir d'une position,
+                retourne la première position candidate suivante
+                ou -1 s'il n'y en a pas
+        """
+
+        prefix, chars, first = self.prefix, self._chars, self.first
+
+        if not isinstance(value, str):
+            # un octet b correspond au caractère de code point b
+            try:
+                prefix = prefix.encode('latin-1')
+            except UnicodeEncodeError:
+                return lambda pos: -1
+
+            if not hasattr(value, 'find'):
+                # une memoryview ne permet pas la recherche
+                prefix, chars = b'', None
+            elif chars is not None:
+                chars = [ord(c) for c in chars if ord(c) <= LATIN1_MAX]
+
+            if first is not None:
+                first = frozenset(
+                    code for lo, hi in first.ranges
+                    for code in range(lo, min(hi, LATIN1_MAX) + 1))
+
+        if prefix:
+            return lambda pos: value.find(prefix, pos)
+        elif first is None:
+            return lambda pos: pos if pos <= len(value) else -1
+        elif chars is not None:
+            found = dict.fromkeys(chars, -1)
+
+            def find(pos: int) -> int:
+                for c, i in found.items():
+                    if 0 <= i < pos:
+                        found[c] = value.find(c, pos)
+
+                candidates = [i for i in found.values() if i >= 0]
+                return min(candidates) if candidates else -1
+
+            for c in found:
+                found[c] = value.find(c)
+
+            return find
+        else:
+            def scan(pos: int) -> int:
+                for i in range(pos, len(value)):
+                    if value[i] in first:
+                        return i
+
+                return -1
+
+            return scan
+
+
+class Guard:
+    """Un Guard rejette, avant tout matching, les inputs qu'une
+    FnRegex ne peut pas reconnaitre : trop courts (ou trop longs
+    pour un matching total), ne commençant pas par l'un de ses
+    premiers caractères possibles, ou ne contenant pas la plus
+    longue de ses sous-chaines littérales requises. Chaque test
+    coûte O(1), sauf ce dernier qui demande un appel à str.find.
+
+    Pour un input binaire, un octet b est assimilé au caractère
+    de code point b (voir fre.binary).
+    """
+
+    def __init__(self, fnrx: FnRegex):
+        rx = node(fnrx)
+        analyzer = _Analyzer()
+
+        try:
+            analyzer.prepare(rx)
+            low, high = analyzer.length(rx)
+            first_ = None if analyzer.nullable(rx) else analyzer.first(rx)
+        except UnsupportedPatternError:
+            low, high, first_ = 0, maxsize, None
+
+        # la recherche des littéraux requis est récursive, elle
+        # est réservée aux arbres peu profonds
+        literals = required_literals(rx) if rx._depth <= MAX_DEPTH else ()
+        self.min = low
+        self.max = high
+        self.first = None if first_ is None else CharSet(first_)
+        self.literal = literals[0] if literals else ''
+        self._bytes = None if first_ is None else frozenset(
+            code for lo, hi in first_
+            for code in range(lo, min(hi, LATIN1_MAX) + 1))
+
+        try:
+            self._data = self.literal.encode('latin-1')
+        except UnicodeEncodeError:
+            # aucun input binaire ne contient ce littéral
+            self._data = None
+
+    def absent(self, value: str, pos: int) -> bool:
+        """Indique qu'aucune correspondance ne peut commencer à
+        partir de pos dans value, quelle que soit sa position
+
+        :param value: input parcouru, str ou input binaire
+        :param pos: première position de départ possible
+        :return: True si value peut être rejeté
+        """
+
+        size = len(value) - pos
+
+        if self.min and size < self.min:
+            return True
+        elif not self.literal:
+            return False
+        elif isinstance(value, str):
+            return value.find(self.literal, pos) < 0
+        elif self._data is None:
+            return True
+        elif hasattr(value, 'find'):
+            return value.find(self._data, pos) < 0
+        else:
+            # une memoryview ne permet pas la recherche
+            return False
+
+    def rejects(self, value: str, pos: int, full: bool = False) -> bool:
+        """Indique qu'aucune correspondance ne peut commencer à
+        pos dans value
+
+        :param value: input à tester, str ou input binaire
+        :param pos: position de départ du matching
+        :param full: exige une correspondance allant jusqu'à la
+                    fin de value
+        :return: True si value peut être rejeté
+        """
+
+        size = len(value) - pos
+
+        if self.min and size < self.min or full and size > self.max:
+            return True
+
+        if self.first is not None:
+            if size <= 0:
+                return True
+            elif isinstance(value, str):
+                if value[pos] not in self.first:
+                    return True
+            elif value[pos] not in self._bytes:
+                return True
+
+        if not self.literal:
+            return False
+        elif isinstance(value, str):
+            # la sous-chaine est contenue dans la correspondance
+            end = pos + self.max if self.max < size else len(value)
+            return value.find(self.literal, pos, end) < 0
+        else:
+            return self.absent(value, pos)
@@ -0,0 +1,131 @@
+"""Le module backends référence les différentes formes compilées
+d'une FnRegex, sélectionnables par leur nom au travers du
+paramètre backend des fonctions match et fullmatch :
+
+- 'dfa' : automate fini déterministe minimal (fre.dfa),
+- 'lazydfa' : automate construit à la demande (fre.dfa),
+- 'codegen' : fonction python générée (fre.codegen),
+- 're' : expression régulière du module re (fre.stdre).
+
+Les formes compilées sont conservées dans un cache LRU borné
+afin que les appels successifs avec des FnRegex de même
+structure ne les recompilent pas. Ce cache est indexé par
+l'arbre canonique de la FnRegex (voir fre.interning) : deux
+FnRegex égales partagent une seule forme compilée, sans que le
+hash de tout l'arbre soit calculé à chaque appel (l'arbre
+canonique étant conservé sur la racine de la FnRegex après le
+premier appel). Il peut être
+utilisé depuis plusieurs threads, les formes compilées étant
+partagées entre eux. cache_info donne sa taille et le nombre de
+hits et de misses.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Callable, Dict
+
+from fre import codegen, dfa, stdre
+from fre.fnregex import FnRegex, CompiledFnRegex
+from fre.interning import intern
+
+CACHE_SIZE = 256
+
+Compiler = Callable[[FnRegex], CompiledFnRegex]
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+BACKENDS: Dict[str, Compiler] = {
+    'dfa': dfa.compile,
+    'lazydfa': lambda fnrx: dfa.compile(fnrx, lazy=True),
+    'codegen': codegen.compile,
+    're': stdre.compile,
+}
+
+
+def register(name: str, compiler: Compiler):
+    """Ajoute un backend
+
+    :param name: nom du backend
+    :param compiler: fonction compilant une FnRegex
+    """
+
+    with _lock:
+        BACKENDS[name] = compiler
+        _cache.clear()
+
+
+_cache: OrderedDict = OrderedDict()
+_lock = Lock()
+_hits = _misses = 0
+
+
+def cache_info() -> CacheInfo:
+    """Statistiques du cache des formes compilées
+
+    :return: le nombre de hits et de misses depuis le dernier
+            cache_clear, la taille maximale et la taille
+            actuelle du cache
+    """
+
+    with _lock:
+        return CacheInfo(_hits, _misses, CACHE_SIZE, len(_cache))
+
+
+def cache_clear():
+    """Vide le cache des formes compilées et remet à zéro ses
+    statistiques
+    """
+
+    global _hits, _misses
+
+    with _lock:
+        _cache.clear()
+        _hits = _misses = 0
+
+
+def compile(fnrx: FnRegex, backend: str) -> CompiledFnRegex:
+    """Compile fnrx avec le backend nommé backend
+
+    :param fnrx: FnRegex à compiler
+    :param backend: nom du backend
+    :return: la forme compilée de fnrx
+    :raise ValueError: si le backend est inconnu
+    :raise UnsupportedPatternError: si le backend ne supporte
+            pas fnrx
+    """
+
+    global _hits, _misses
+
+    pattern = intern(fnrx)
+    key = (id(pattern), backend)
+
+    with _lock:
+        entry = _cache.get(key)
+
+        if entry is not None:
+            _cache.move_to_end(key)
+            _hits += 1
+            return entry[1]
+
+        _misses += 1
+        compiler = BACKENDS.get(backend)
+
+    if compiler is None:
+        raise ValueError('unknown backend %r, expected one of %s'
+                         % (backend, ', '.join(sorted(BACKENDS))))
+
+    # la compilation a lieu hors du verrou : deux threads peuvent
+    # compiler la même FnRegex, une seule forme est conservée
+    compiled = compiler(pattern)
+
+    with _lock:
+        # l'arbre canonique est conservé avec sa forme compilée
+        # afin que son identifiant ne puisse pas être réutilisé
+        entry = _cache.setdefault(key, (pattern, compiled))
+
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return entry[1]
@@ -0,0 +1,257 @@
+"""Le module backtrack implémente le mode de matching avec retour
+arrière des FnRegex.
+
+Par défaut, le matching est possessif : un choice retient la
+première alternative qui correspond et un repeat consomme autant
+d'itérations que possible sans jamais les rendre. Ainsi
+`a[1:] >> a` ne correspond à aucun input. En mode backtrack,
+lorsque la suite de l'expression échoue, le matching revient sur
+ces décisions et essaie, dans l'ordre de priorité, les
+alternatives suivantes puis les répétitions plus courtes, comme
+le module re. Seule exception : une répétition dont le corps peut
+correspondre à la chaîne vide suit l'ordre de priorité de
+l'automate et non la règle d'arrêt sur itération vide de re, ce
+qui peut alors donner une correspondance différente.
+
+Le retour arrière parcourt le NFA de la FnRegex (voir fre.nfa),
+dont chaque état représente un noeud de l'arbre et la suite de
+l'expression qui le suit. Chaque couple (état, position) visité
+sans succès est mémorisé et n'est jamais exploré deux fois : le
+temps de matching est donc au pire proportionnel au nombre
+d'états multiplié par la longueur de l'input, là où un retour
+arrière naïf peut être exponentiel.
+
+Une répétition bornée est développée dans le NFA en autant de
+copies de son corps que sa borne supérieure : une FnRegex dont
+l'automate dépasserait fre.nfa.MAX_STATES états (repeat(x, 1,
+10**9) par exemple) n'est pas supportée par ce mode, qui lève
+alors UnsupportedPatternError. Les répétitions non bornées
+(x[1:]) n'ont qu'une seule copie.
+
+La table de mémorisation est bornée par memo_size entrées.
+Lorsqu'elle est pleine, les entrées situées après la position
+courante, qui ne servent qu'à éviter de refaire un calcul, sont
+évincées en commençant par les plus lointaines. Les entrées
+situées avant la position courante garantissent la terminaison
+et sont conservées : si elles suffisent à remplir la table, le
+matching se poursuit par une simulation du NFA (machine de Pike)
+dont la mémoire ne dépend que du nombre d'états, pour le même
+résultat.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Set
+
+from fre.fnregex import FnRegex, CompiledFnRegex, FAIL, node
+from fre.nfa import NFA, build
+
+MEMO_SIZE = 1 << 20
+
+# marque, dans une liste d'états ordonnée par priorité, le rang
+# auquel l'acceptation est examinée
+_ACCEPT = -2
+
+
+class _Overflow(Exception):
+    """Levée lorsque les entrées non évinçables de la table de
+    mémorisation la remplissent
+    """
+
+
+class _Memo:
+    """Ensemble borné des couples (état, position) visités, rangé
+    par position
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        self.positions: Dict[int, Set[int]] = {}
+
+    def visit(self, state: int, pos: int) -> bool:
+        """Marque (state, pos) comme visité
+
+        :return: False si le couple était déjà visité
+        """
+
+        marks = self.positions.get(pos)
+
+        if marks is None:
+            marks = self.positions[pos] = set()
+        elif state in marks:
+            return False
+
+        marks.add(state)
+        self.count += 1
+
+        if self.count > self.size:
+            self.evict(pos)
+
+        return True
+
+    def evict(self, pos: int):
+        # les positions les plus lointaines sont évincées jusqu'à
+        # libérer la moitié de la table
+        for ahead in sorted((p for p in self.positions if p > pos),
+                            reverse=True):
+            self.count -= len(self.positions.pop(ahead))
+
+            if self.count <= self.size // 2:
+                return
+
+        if self.count > self.size:
+            raise _Overflow
+
+
+class BacktrackFnRegex(CompiledFnRegex):
+    """Forme compilée d'une FnRegex en mode backtrack. Elle ne
+    contient que le NFA, immuable : la table de mémorisation est
+    propre à chaque appel.
+    """
+
+    def __init__(self, pattern: FnRegex, nfa: NFA, memo_size: int = MEMO_SIZE):
+        self.pattern = pattern
+        self.nfa = nfa
+        self.memo_size = max(memo_size, len(nfa.eps))
+
+    def _search(self, value: str, pos: int, full: bool) -> int:
+        """Recherche en profondeur, dans l'ordre de priorité, le
+        premier chemin atteignant l'état final (à la fin de value
+        si full)
+
+        :return: la fin de la correspondance ou FAIL
+        """
+
+        nfa = self.nfa
+        eps, edges, accept = nfa.eps, nfa.edges, nfa.accept
+        size = len(value)
+        memo = _Memo(self.memo_size)
+        stack = [(nfa.start, pos)]
+
+        try:
+            while stack:
+                state, p = stack.pop()
+
+                if state == _ACCEPT:
+                    if not full or p == size:
+                        return p
+                elif memo.visit(state, p):
+                    if state == accept:
+                        # l'acceptation passe après les transitions
+                        # vides de l'état final (boucle gloutonne)
+                        stack.append((_ACCEPT, p))
+
+                    if p < size:
+                        code = ord(value[p])
+
+                        for lo, hi, target in edges[state]:
+                            if lo <= code <= hi:
+                                stack.append((target, p + 1))
+                                break
+
+                    stack.extend((target, p)
+                                 for target in reversed(eps[state]))
+        except _Overflow:
+            return self._simulate(value, pos, full)
+
+        return FAIL
+
+    def _closure(self, state: int, seen: Set[int], out: List[int]):
+        """Ajoute à out, dans l'ordre de priorité, les états
+        accessibles depuis state par transitions vides
+        """
+
+        eps, accept = self.nfa.eps, self.nfa.accept
+        stack = [state]
+
+        while stack:
+            state = stack.pop()
+
+            if state == _ACCEPT:
+                out.append(_ACCEPT)
+            elif state not in seen:
+                seen.add(state)
+
+                if state == accept:
+                    stack.append(_ACCEPT)
+                elif self.nfa.edges[state]:
+                    out.append(state)
+
+                stack.extend(reversed(eps[state]))
+
+    def _simulate(self, value: str, pos: int, full: bool) -> int:
+        """Simulation du NFA par une liste de threads ordonnée
+        par priorité (machine de Pike), équivalente à _search
+        """
+
+        edges = self.nfa.edges
+        size = len(value)
+        threads: List[int] = []
+        self._closure(self.nfa.start, set(), threads)
+        last = FAIL
+
+        for p in range(pos, size + 1):
+            following: List[int] = []
+            seen: Set[int] = set()
+            code = ord(value[p]) if p < size else None
+
+            for state in threads:
+                if state == _ACCEPT:
+                    if not full or p == size:
+                        # les threads moins prioritaires sont
+                        # abandonnés
+                        last = p
+                        break
+                elif code is not None:
+                    for lo, hi, target in edges[state]:
+                        if lo <= code <= hi:
+                            self._closure(target, seen, following)
+                            break
+
+            if not following:
+                break
+
+            threads = following
+
+        return last
+
+    def _at(self, value: str, pos: int) -> int:
+        return self._search(value, pos, False)
+
+    def _full(self, value: str, pos: int = 0) -> bool:
+        return self._search(value, pos, True) == len(value)
+
+
+def compile(fnrx: FnRegex, memo_size: int = MEMO_SIZE) -> BacktrackFnRegex:
+    """Compile fnrx pour le mode backtrack
+
+    :param fnrx: FnRegex à compiler
+    :param memo_size: nombre maximal d'entrées de la table de
+                     mémorisation
+    :return: un nouveau BacktrackFnRegex
+    :raise UnsupportedPatternError: si fnrx contient des
+            FnRegex opaques ou si son automate dépasse
+            fre.nfa.MAX_STATES états
+    """
+
+    pattern = node(fnrx)
+    return BacktrackFnRegex(pattern, build(pattern), memo_size)
+
+
+def backtrack(fnrx: FnRegex) -> BacktrackFnRegex:
+    """Forme compilée de fnrx pour le mode backtrack, conservée
+    dans le noeud racine de fnrx
+
+    :param fnrx: FnRegex à compiler
+    :return: la forme compilée
+    """
+
+    root = node(fnrx)
+    compiled = root.__dict__.get('_backtrack')
+
+    if compiled is None:
+        compiled = compile(root)
+        object.__setattr__(root, '_backtrack', compiled)
+
+    return compiled
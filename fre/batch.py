@@ -0,0 +1,267 @@
+"""Le module batch permet de tester une FnRegex sur un grand
+nombre d'inputs en un seul appel (match_many et
+fullmatch_many).
+
+Lorsque NumPy est disponible, les inputs sont rangés dans un
+tableau à deux dimensions de code points (une ligne par input)
+et l'arbre de la FnRegex est évalué colonne par colonne : chaque
+noeud fait progresser en une seule opération vectorisée les
+positions de toutes les lignes. Cette évaluation respecte
+exactement la sémantique des FnRegex et convient
+particulièrement aux champs de largeur fixe (codes,
+identifiants, dates, ...).
+
+Les FnRegex opaques, ou les inputs qui ne peuvent pas être
+rangés dans un tableau de str ou de bytes, sont testés un à un
+avec la forme compilée la plus rapide (voir fre.codegen).
+Sans NumPy, le résultat est une liste de booléens.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List
+
+from fre import backends, ranges as rg
+from fre.binary import binary
+from fre.fnregex import FnRegex, Node, Seq, Repeat, Choice, Literal, \
+    Group, UnsupportedPatternError, FAIL, LATIN1_MAX, _Single, node
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est une dépendance optionnelle
+    np = None
+
+# profondeur d'arbre au delà de laquelle l'évaluation
+# vectorisée, récursive, est abandonnée
+MAX_VECTOR_DEPTH = 200
+INLINE_RANGES = 8
+TABLE_LIMIT = 0x10000
+
+
+class _Columns:
+    """Evalue les noeuds d'un arbre sur toutes les lignes d'un
+    tableau de code points. Pour chaque ligne, pos est la
+    position courante et ok indique si le matching est encore
+    valide.
+    """
+
+    def __init__(self, codes, lengths):
+        self.codes = codes
+        self.lengths = lengths
+        self.rows = np.arange(len(codes))
+        self.last = max(codes.shape[1] - 1, 0)
+        self.tables = {}
+        # les octets d'un tableau de bytes valent au plus LATIN1_MAX
+        self.domain = ((0, LATIN1_MAX),) if codes.dtype == np.uint8 \
+            else rg.ANY
+
+    def char(self, pos):
+        if self.codes.shape[1] == 0:
+            return np.zeros(len(pos), dtype=np.uint32)
+
+        return self.codes[self.rows, np.minimum(pos, self.last)]
+
+    def member(self, ranges: rg.Ranges, codes):
+        ranges = rg.intersection(ranges, self.domain)
+
+        if not ranges:
+            return np.zeros(len(codes), dtype=bool)
+        elif len(ranges) > INLINE_RANGES and ranges[-1][1] < TABLE_LIMIT:
+            table = self.tables.get(ranges)
+
+            if table is None:
+                # la dernière case, jamais dans l'ensemble, reçoit
+                # les code points au delà du dernier intervalle
+                table = np.zeros(ranges[-1][1] + 2, dtype=bool)
+
+                for lo, hi in ranges:
+                    table[lo:hi + 1] = True
+
+                self.tables[ranges] = table
+
+            return table[np.minimum(codes, len(table) - 1)]
+
+        hit = np.zeros(len(codes), dtype=bool)
+
+        for lo, hi in ranges:
+            hit |= (codes >= lo) & (codes <= hi) if lo != hi \
+                else codes == lo
+
+        return hit
+
+    def single(self, ranges: rg.Ranges, pos, ok):
+        hit = ok & (pos < self.lengths) & self.member(ranges, self.char(pos))
+        return pos + hit, hit
+
+    def run(self, n: Node, pos, ok):
+        """Fait progresser les lignes valides (ok) depuis pos
+
+        :return: les nouvelles positions et la validité des lignes
+        """
+
+        if isinstance(n, _Single):
+            return self.single(n.ranges, pos, ok)
+        elif isinstance(n, Literal):
+            for c in n.text:
+                pos, ok = self.single(((ord(c), ord(c)),), pos, ok)
+
+            return pos, ok
+        elif isinstance(n, Seq):
+            for item in n.items:
+                pos, ok = self.run(item, pos, ok)
+
+            return pos, ok
+        elif isinstance(n, Choice):
+            done = np.zeros(len(pos), dtype=bool)
+            end = pos
+
+            for item in n.items:
+                todo = ok & ~done
+
+                if not todo.any():
+                    break
+
+                p, o = self.run(item, pos, todo)
+                end = np.where(o, p, end)
+                done |= o
+
+            return end, done
+        elif isinstance(n, Repeat):
+            return self.repeat(n, pos, ok)
+        elif isinstance(n, Group):
+            return self.run(n.re, pos, ok)
+        else:
+            raise UnsupportedPatternError(n)
+
+    def repeat(self, n: Repeat, pos, ok):
+        count = np.zeros(len(pos), dtype=np.int64)
+        active = ok
+        i = 0
+
+        while i < n.stop and active.any():
+            if isinstance(n.re, _Single):
+                pos, active = self.single(n.re.ranges, pos, active)
+                count += active
+            else:
+                p, o = self.run(n.re, pos, active)
+                # une itération vide se répèterait à l'infini,
+                # toutes les itérations restantes sont donc acquises
+                empty = o & (p == pos)
+                count = np.where(empty, n.stop, count + o)
+                pos = np.where(o, p, pos)
+                active = o & ~empty
+
+            i += 1
+
+        return pos, ok & (count >= n.start)
+
+
+def _columns(inputs):
+    """Range les inputs dans un tableau de code points
+
+    :return: le tableau des code points, celui des longueurs
+            et la forme du tableau d'inputs, ou None si les
+            inputs ne sont ni des str ni des bytes
+    """
+
+    if not isinstance(inputs, np.ndarray):
+        # NumPy convertirait silencieusement les autres types, et
+        # retire les caractères nuls finaux des str et des bytes
+        for kind, nul in ((str, '\0'), (bytes, b'\0')):
+            if all(isinstance(inp, kind) and not inp.endswith(nul)
+                   for inp in inputs):
+                break
+        else:
+            return None
+
+    array = np.asarray(inputs)
+
+    if array.dtype.kind == 'U':
+        unit = np.uint32
+    elif array.dtype.kind == 'S':
+        unit = np.uint8
+    else:
+        return None
+
+    flat = np.ascontiguousarray(array.reshape(-1))
+    width = array.dtype.itemsize // np.dtype(unit).itemsize
+    codes = flat.view(unit).reshape(len(flat), width)
+    return codes, np.char.str_len(flat), array.shape
+
+
+def _scalar(fnrx: FnRegex, inputs: Iterable, full: bool) -> List[bool]:
+    rx = node(fnrx)
+
+    try:
+        compiled = backends.compile(fnrx, 'codegen')
+    except UnsupportedPatternError:
+        compiled = rx
+
+    results = []
+
+    for inp in inputs:
+        end = (compiled if isinstance(inp, str) else binary(rx))._at(inp, 0)
+        results.append(end == len(inp) if full else end != FAIL)
+
+    return results
+
+
+def _many(fnrx: FnRegex, inputs: Iterable, full: bool):
+    if not isinstance(inputs, (list, tuple)) and \
+            (np is None or not isinstance(inputs, np.ndarray)):
+        inputs = list(inputs)
+
+    if np is None:
+        return _scalar(fnrx, inputs, full)
+
+    rx = node(fnrx)
+    columns = _columns(inputs)
+
+    if columns is not None and rx._depth <= MAX_VECTOR_DEPTH:
+        codes, lengths, shape = columns
+        start = np.zeros(len(codes), dtype=np.int64)
+
+        try:
+            pos, ok = _Columns(codes, lengths).run(
+                rx, start, np.ones(len(codes), dtype=bool))
+        except UnsupportedPatternError:
+            pass
+        else:
+            if full:
+                ok &= pos == lengths
+
+            return ok.reshape(shape)
+
+    if isinstance(inputs, np.ndarray):
+        return np.array(_scalar(fnrx, inputs.reshape(-1), full),
+                        dtype=bool).reshape(inputs.shape)
+
+    return np.array(_scalar(fnrx, inputs, full), dtype=bool)
+
+
+def match_many(fnrx: FnRegex, inputs: Iterable):
+    """Equivalent de match sur chacun des inputs
+
+    :param fnrx: FnRegex portant le test
+    :param inputs: séquence de str ou de bytes, ou tableau
+                  NumPy de type U ou S
+    :return: un tableau NumPy de booléens (une liste sans
+            NumPy) indiquant les inputs dont un préfixe
+            correspond à fnrx
+    """
+
+    return _many(fnrx, inputs, False)
+
+
+def fullmatch_many(fnrx: FnRegex, inputs: Iterable):
+    """Equivalent de fullmatch sur chacun des inputs
+
+    :param fnrx: FnRegex portant le test
+    :param inputs: séquence de str ou de bytes, ou tableau
+                  NumPy de type U ou S
+    :return: un tableau NumPy de booléens (une liste sans
+            NumPy) indiquant les inputs correspondant
+            entièrement à fnrx
+    """
+
+    return _many(fnrx, inputs, True)
@@ -0,0 +1,114 @@
+"""Le module binary permet le matching direct d'inputs binaires
+(bytes, bytearray et memoryview) sans les décoder.
+
+Un octet de valeur b est assimilé au caractère de code point b
+(correspondance Latin-1) : char(b'a'), char(0x61) et char('a')
+sont équivalents. Avant le matching d'un input binaire, l'arbre
+de la FnRegex est traduit en un arbre équivalent dont les
+feuilles comparent directement des octets (ByteSet et
+ByteLiteral). Cette traduction est faite une seule fois par
+arbre.
+
+Les positions retournées sont des indices dans le buffer
+d'origine, aucune copie de l'input n'étant effectuée.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from fre import ranges as rg
+from fre.fnregex import FnRegex, Node, CharSet, Literal, FAIL, LATIN1_MAX, \
+    _Single, node
+from fre.optimize import rewrite
+
+BUFFERS = (bytes, bytearray, memoryview)
+BYTES: rg.Ranges = ((0, LATIN1_MAX),)
+
+
+@dataclass(frozen=True)
+class ByteSet(CharSet):
+    """Ensemble de caractères testé sur les octets d'un input
+    binaire
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        object.__setattr__(self, '_bytes', frozenset(
+            code for lo, hi in self.ranges for code in range(lo, hi + 1)))
+
+    def __contains__(self, b: int) -> bool:
+        return b in self._bytes
+
+    def _at(self, value: bytes, pos: int) -> int:
+        if pos < len(value) and value[pos] in self._bytes:
+            return pos + 1
+        else:
+            return FAIL
+
+    def _span(self, value: bytes, pos: int, n: int) -> int:
+        end = min(len(value), pos + n)
+        bytes_ = self._bytes
+
+        while pos < end and value[pos] in bytes_:
+            pos += 1
+
+        return pos
+
+
+@dataclass(frozen=True)
+class ByteLiteral(Literal):
+    """Chaine littérale testée sur les octets d'un input binaire"""
+
+    def __post_init__(self):
+        try:
+            data = self.text.encode('latin-1')
+        except UnicodeEncodeError:
+            # un caractère hors de Latin-1 ne correspond à
+            # aucun octet
+            data = None
+
+        object.__setattr__(self, '_data', data)
+
+    def _at(self, value: bytes, pos: int) -> int:
+        data = self._data
+
+        if data is None:
+            return FAIL
+        elif isinstance(value, memoryview):
+            # le découpage d'une memoryview ne copie pas l'input,
+            # qui n'a pas de méthode startswith
+            matched = value[pos:pos + len(data)] == data
+        else:
+            matched = value.startswith(data, pos)
+
+        return pos + len(data) if matched else FAIL
+
+
+def _encode(n: Node) -> Node:
+    if isinstance(n, _Single):
+        return ByteSet(rg.intersection(n.ranges, BYTES))
+    elif isinstance(n, Literal):
+        return ByteLiteral(n.text)
+    else:
+        return n
+
+
+def binary(fnrx: FnRegex) -> Node:
+    """Traduit l'arbre de fnrx en un arbre équivalent testant
+    les octets d'un input binaire. Le résultat est conservé
+    dans le noeud racine de fnrx.
+
+    :param fnrx: FnRegex à traduire
+    :return: la racine de l'arbre traduit
+    """
+
+    root = node(fnrx)
+    tree = root.__dict__.get('_binary')
+
+    if tree is None:
+        tree = rewrite(root, _encode)
+        object.__setattr__(root, '_binary', tree)
+        object.__setattr__(tree, '_binary', tree)
+
+    return tree
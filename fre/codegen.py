@@ -0,0 +1,300 @@
+"""Le module codegen compile une FnRegex en une fonction python
+spécialisée : le source généré enchaine directement les
+comparaisons de caractères, les boucles while des répétitions
+et les appels à str.startswith des littéraux, sans appel de
+méthode ni allocation par noeud de l'arbre.
+
+Le source est conservé pour inspection (attribut source) et
+peut être mis en cache sur disque, indexé par un hash de
+l'arbre, afin de ne pas refaire la génération et la
+compilation à chaque démarrage d'un processus.
+
+Contrairement au DFA, cette compilation conserve exactement
+la sémantique des FnRegex (choix ordonné, répétitions
+gloutonnes) : toutes les FnRegex construites à partir des
+noeuds de fre.fnregex sont supportées, à l'exception des
+FnRegex opaques (fonctions quelconques).
+"""
+
+from __future__ import annotations
+
+import builtins
+import marshal
+import os
+from hashlib import sha256
+from importlib.util import MAGIC_NUMBER
+from sys import maxsize
+from typing import List, Optional, Tuple
+
+from fre import ranges as rg
+from fre.fnregex import FnRegex, CompiledFnRegex, Node, Seq, Repeat, Choice, \
+    Literal, Group, UnsupportedPatternError, _Single, node
+from fre.files import store
+from fre.wire import dumps
+
+# version du générateur, incluse dans la clé du cache disque
+VERSION = 1
+ENTRY = 'match'
+# profondeur de l'arbre au delà de laquelle un sous-arbre est
+# généré dans une fonction séparée
+MAX_NESTING = 16
+INLINE_RANGES = 2
+SET_LIMIT = 0x100
+
+
+class _Generator:
+    """Génère le source d'un module contenant une fonction par
+    sous-arbre trop profond, la fonction ENTRY correspondant à
+    la racine
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.constants: List[str] = []
+        self.functions: List[str] = []
+        self.pending: List[Tuple[str, Node]] = []
+
+    def name(self, prefix: str) -> str:
+        self.count += 1
+        return '%s%d' % (prefix, self.count)
+
+    def function(self, n: Node) -> str:
+        name = self.name('_m')
+        self.pending.append((name, n))
+        return name
+
+    def module(self, root: Node) -> str:
+        entry = self.function(root)
+
+        while self.pending:
+            name, n = self.pending.pop()
+            lines = ['def %s(value, pos):' % name, '    n = len(value)']
+            self.block(n, lines, 1, 0)
+            lines.append('    return pos')
+            self.functions.append('\n'.join(lines))
+
+        parts = ['# generated by fre.codegen\n'
+                 'from fre.ranges import contains as _contains']
+
+        if self.constants:
+            parts.append('\n'.join(self.constants))
+
+        return '\n\n\n'.join(parts + self.functions) + \
+            '\n\n\n%s = %s\n' % (ENTRY, entry)
+
+    def condition(self, ranges: rg.Ranges, c: str) -> str:
+        """Expression testant l'appartenance du caractère c
+        à ranges
+        """
+
+        if not ranges:
+            return 'False'
+        elif len(ranges) <= INLINE_RANGES:
+            return ' or '.join('%s == %r' % (c, chr(lo)) if lo == hi
+                               else '%r <= %s <= %r' % (chr(lo), c, chr(hi))
+                               for lo, hi in ranges)
+        elif rg.size(ranges) <= SET_LIMIT:
+            name = self.name('_S')
+            chars = ''.join(chr(code) for lo, hi in ranges
+                            for code in range(lo, hi + 1))
+            self.constants.append('%s = frozenset(%r)' % (name, chars))
+            return '%s in %s' % (c, name)
+        else:
+            name = self.name('_R')
+            self.constants.append('%s = %r' % (name, ranges))
+            return '_contains(%s, ord(%s))' % (name, c)
+
+    def block(self, n: Node, lines: List[str], indent: int, depth: int):
+        """Génère un bloc d'instructions jamais vide"""
+
+        size = len(lines)
+        self.emit(n, lines, indent, depth)
+
+        if len(lines) == size:
+            lines.append('    ' * indent + 'pass')
+
+    def emit(self, n: Node, lines: List[str], indent: int, depth: int):
+        """Génère les instructions qui, à partir de pos, placent
+        dans pos la fin de la correspondance de n ou -1
+        """
+
+        tab = '    ' * indent
+
+        if depth > MAX_NESTING and isinstance(n, (Seq, Choice, Repeat, Group)):
+            lines.append('%spos = %s(value, pos)' % (tab, self.function(n)))
+        elif isinstance(n, _Single):
+            lines += ['%sif pos < n and (%s):' % (
+                          tab, self.condition(n.ranges, 'value[pos]')),
+                      '%s    pos += 1' % tab,
+                      '%selse:' % tab,
+                      '%s    pos = -1' % tab]
+        elif isinstance(n, Literal):
+            if n.text:
+                lines += ['%sif value.startswith(%r, pos):' % (tab, n.text),
+                          '%s    pos += %d' % (tab, len(n.text)),
+                          '%selse:' % tab,
+                          '%s    pos = -1' % tab]
+        elif isinstance(n, Seq):
+            for i, item in enumerate(n.items):
+                if i == 0:
+                    self.emit(item, lines, indent, depth + 1)
+                else:
+                    lines.append('%sif pos >= 0:' % tab)
+                    self.block(item, lines, indent + 1, depth + 1)
+        elif isinstance(n, Choice):
+            if not n.items:
+                lines.append('%spos = -1' % tab)
+                return
+
+            start = self.name('s')
+            lines.append('%s%s = pos' % (tab, start))
+            self.emit(n.items[0], lines, indent, depth + 1)
+
+            for item in n.items[1:]:
+                lines += ['%sif pos < 0:' % tab,
+                          '%s    pos = %s' % (tab, start)]
+                self.block(item, lines, indent + 1, depth + 1)
+        elif isinstance(n, Repeat):
+            self.repeat(n, lines, indent, depth)
+        elif isinstance(n, Group):
+            self.emit(n.re, lines, indent, depth + 1)
+        else:
+            raise UnsupportedPatternError(n)
+
+    def repeat(self, n: Repeat, lines: List[str], indent: int, depth: int):
+        tab = '    ' * indent
+        start, stop = self.name('s'), n.stop
+
+        if isinstance(n.re, _Single):
+            end = self.name('e')
+            lines += ['%s%s = pos' % (tab, start),
+                      '%s%s = n' % (tab, end) if stop >= maxsize
+                      else '%s%s = min(n, pos + %d)' % (tab, end, stop),
+                      '%swhile pos < %s and (%s):' % (
+                          tab, end, self.condition(n.re.ranges, 'value[pos]')),
+                      '%s    pos += 1' % tab]
+
+            if n.start > 0:
+                lines += ['%sif pos - %s < %d:' % (tab, start, n.start),
+                          '%s    pos = -1' % tab]
+
+            return
+
+        count = self.name('c')
+        lines += ['%s%s = 0' % (tab, count),
+                  '%swhile %s < %d:' % (tab, count, stop),
+                  '%s    %s = pos' % (tab, start)]
+        self.block(n.re, lines, indent + 1, depth + 1)
+        # une itération vide se répèterait à l'infini, toutes
+        # les itérations restantes sont donc acquises
+        lines += ['%s    if pos < 0:' % tab,
+                  '%s        pos = %s' % (tab, start),
+                  '%s        break' % tab,
+                  '%s    if pos == %s:' % (tab, start),
+                  '%s        %s = %d' % (tab, count, stop),
+                  '%s        break' % tab,
+                  '%s    %s += 1' % (tab, count)]
+
+        if n.start > 0:
+            lines += ['%sif %s < %d:' % (tab, count, n.start),
+                      '%s    pos = -1' % tab]
+
+
+def generate(fnrx: FnRegex) -> str:
+    """Génère le source python du module de matching de fnrx.
+    La fonction ENTRY(value, pos) de ce module retourne la fin
+    de la correspondance ou -1.
+
+    :param fnrx: FnRegex à traduire
+    :return: le source généré
+    :raise UnsupportedPatternError: si fnrx contient des
+            FnRegex opaques
+    """
+
+    return _Generator().module(node(fnrx))
+
+
+class GeneratedFnRegex(CompiledFnRegex):
+    """Forme compilée d'une FnRegex sous forme d'une fonction
+    python générée. Le source de cette fonction est disponible
+    dans l'attribut source.
+    """
+
+    def __init__(self, pattern: FnRegex, source: str, code):
+        namespace = {}
+        exec(code, namespace)
+        self.pattern = pattern
+        self.source = source
+        self._at = namespace[ENTRY]
+
+    def __reduce__(self):
+        # la fonction générée n'est pas sérialisable, elle est
+        # recompilée à partir de son source
+        return GeneratedFnRegex, (self.pattern, self.source, self.source)
+
+
+def key(fnrx: FnRegex) -> str:
+    """Calcule la clé identifiant fnrx dans le cache disque
+
+    :param fnrx: FnRegex à identifier
+    :return: le hash hexadécimal de l'arbre de fnrx
+    :raise UnsupportedPatternError: si fnrx contient des
+            FnRegex opaques
+    """
+
+    # la sérialisation de fre.wire parcourt l'arbre avec une pile
+    # explicite, contrairement à repr qui est limité par la
+    # profondeur de récursion
+    return sha256(b'%d:' % VERSION + dumps(fnrx)).hexdigest()
+
+
+def _load(path: str) -> Optional[Tuple[str, object]]:
+    try:
+        with open(path + '.py', encoding='utf-8') as f:
+            source = f.read()
+
+        with open(path + '.pyc', 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if not data.startswith(MAGIC_NUMBER):
+        return None
+
+    try:
+        return source, marshal.loads(data[len(MAGIC_NUMBER):])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def compile(fnrx: FnRegex, cache_dir: Optional[str] = None) \
+        -> GeneratedFnRegex:
+    """Compile une FnRegex en une fonction python spécialisée
+
+    :param fnrx: FnRegex à compiler
+    :param cache_dir: répertoire du cache disque des sources
+                     et du code compilé, aucun cache si None
+    :return: un nouveau GeneratedFnRegex
+    :raise UnsupportedPatternError: si fnrx contient des
+            FnRegex opaques
+    """
+
+    pattern = node(fnrx)
+
+    if cache_dir is None:
+        source = generate(pattern)
+        return GeneratedFnRegex(pattern, source,
+                                builtins.compile(source, '<fre>', 'exec'))
+
+    path = os.path.join(cache_dir, key(pattern))
+    cached = _load(path)
+
+    if cached is not None:
+        return GeneratedFnRegex(pattern, *cached)
+
+    source = generate(pattern)
+    code = builtins.compile(source, path + '.py', 'exec')
+    os.makedirs(cache_dir, exist_ok=True)
+    store(path + '.py', source.encode('utf-8'))
+    store(path + '.pyc', MAGIC_NUMBER + marshal.dumps(code))
+    return GeneratedFnRegex(pattern, source, code)
@@ -0,0 +1,611 @@
+"""Le module dfa permet de compiler une FnRegex en un automate
+fini déterministe minimal dont les transitions sont stockées
+dans une table. Le matching devient alors une simple boucle
+sur les caractères de l'input.
+
+Les caractères sont regroupés en classes d'équivalence (deux
+caractères sont équivalents s'ils appartiennent exactement
+aux mêmes intervalles de l'expression), ce qui réduit la
+table à une colonne par classe.
+
+Pour les expressions dont le DFA serait trop gros (nombreuses
+répétitions bornées par exemple), compile(fnrx, lazy=True)
+retourne un LazyDFA qui ne construit les états qu'à leur
+première visite, dans un cache de taille bornée.
+
+Seules les FnRegex déterministes (voir fre.analysis) peuvent
+être compilées en un DFA : pour elles, la correspondance la plus
+longue calculée par l'automate est exactement celle que donne le
+matching glouton des FnRegex. En mode lazy, une FnRegex non
+déterministe (une suite de digit[1:64] par exemple) est
+découpée en sous-expressions déterministes, chacune compilée en
+un LazyDFA, qui sont enchainées comme le fait le matching des
+Seq, Choice et Repeat.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from itertools import islice
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from fre import ranges as rg
+from fre.analysis import is_deterministic
+from fre.fnregex import FnRegex, CompiledFnRegex, UnsupportedPatternError, \
+    FAIL, Node, Seq, Choice, Repeat, Group, Function, children, node
+from fre.nfa import NFA, build
+
+LOOKUP_LIMIT = 0x10000
+LATIN1_LIMIT = 0x100
+DEFAULT_CACHE_SIZE = 1000
+MIN_CHARS_PER_STATE = 10
+
+
+class Alphabet:
+    """Un Alphabet partitionne l'ensemble des code points en
+    classes d'équivalence à partir des intervalles portés
+    par les transitions d'un NFA
+    """
+
+    def __init__(self, nfa: NFA):
+        intervals = sorted({(lo, hi) for edges in nfa.edges
+                            for lo, hi, _ in edges})
+        points = sorted({0} | {lo for lo, _ in intervals} |
+                        {hi + 1 for _, hi in intervals if hi < rg.MAX_CODE})
+        signatures: List[set] = [set() for _ in points]
+
+        for interval in intervals:
+            first = bisect_right(points, interval[0]) - 1
+            last = bisect_right(points, interval[1]) - 1
+
+            for i in range(first, last + 1):
+                signatures[i].add(interval)
+
+        ids: Dict[FrozenSet, int] = {}
+        self.points = points
+        self.classes = [ids.setdefault(frozenset(s), len(ids))
+                        for s in signatures]
+        self.size = len(ids)
+        self.representatives = [0] * self.size
+
+        for point, cls in zip(reversed(points), reversed(self.classes)):
+            self.representatives[cls] = point
+
+        # les code points inférieurs à limit sont classés par
+        # simple indexation de lookup, les autres valent default
+        # ou sont classés par recherche dichotomique
+        self.limit = points[-1] if points[-1] <= LOOKUP_LIMIT \
+            else LATIN1_LIMIT
+        self.default = self.classes[-1] if self.limit == points[-1] \
+            else None
+        lookup = [self.classof(code) for code in range(self.limit)]
+        self.lookup = bytes(lookup) if self.size <= 0x100 \
+            else array('H', lookup)
+
+    def classof(self, code: int) -> int:
+        """Retourne la classe d'un code point
+
+        :param code: le code point
+        :return: l'indice de sa classe
+        """
+
+        if code >= self.limit and self.default is not None:
+            return self.default
+
+        return self.classes[bisect_right(self.points, code) - 1]
+
+
+class DFA(CompiledFnRegex):
+    """Un DFA est la forme compilée d'une FnRegex. Il s'utilise
+    comme une FnRegex ou au travers de ses méthodes match et
+    fullmatch.
+
+    Les états sont numérotés par leur décalage dans la table
+    de transitions (indice de l'état multiplié par le nombre de
+    classes), -1 représentant l'état puits.
+    """
+
+    def __init__(self, pattern: FnRegex, alphabet: Alphabet, start: int,
+                 transitions: List[List[int]], accepts: List[bool]):
+        ncls = alphabet.size
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.states = len(transitions)
+        self._table = array('l', (t * ncls if t >= 0 else FAIL
+                                  for row in transitions for t in row))
+        self._accept = bytearray(len(self._table) or 1)
+        self._start = start * ncls if start >= 0 else FAIL
+
+        self._final = bytearray(len(self._accept))
+
+        for i, accept in enumerate(accepts):
+            self._accept[i * ncls] = accept
+            # un état final accepte et ne peut plus progresser
+            self._final[i * ncls] = accept and \
+                all(t < 0 for t in transitions[i])
+
+    def _at(self, value: str, pos: int) -> int:
+        """Parcourt value depuis pos et retourne la fin de la
+        plus longue correspondance ou FAIL
+        """
+
+        state = self._start
+
+        if state < 0:
+            return FAIL
+
+        table, accept = self._table, self._accept
+        alphabet = self.alphabet
+        lookup, limit, classof = alphabet.lookup, alphabet.limit, \
+            alphabet.classof
+        last = pos if accept[state] else FAIL
+
+        for end, code in enumerate(map(ord, islice(value, pos, None)),
+                                   pos + 1):
+            state = table[state + (lookup[code] if code < limit
+                                   else classof(code))]
+
+            if state < 0:
+                break
+            elif accept[state]:
+                last = end
+
+        return last
+
+    def _full(self, value: str) -> bool:
+        """Indique si la totalité de value est reconnue"""
+
+        state = self._start
+
+        if state < 0:
+            return False
+
+        table = self._table
+        alphabet = self.alphabet
+        lookup, limit, classof = alphabet.lookup, alphabet.limit, \
+            alphabet.classof
+
+        for code in map(ord, value):
+            state = table[state + (lookup[code] if code < limit
+                                   else classof(code))]
+
+            if state < 0:
+                return False
+
+        return bool(self._accept[state])
+
+    @property
+    def start(self) -> int:
+        """Etat initial de l'automate, FAIL s'il ne reconnait
+        aucune chaine
+        """
+
+        return self._start
+
+    def accepts(self, state: int) -> bool:
+        """Indique si state est un état acceptant"""
+
+        return state >= 0 and bool(self._accept[state])
+
+    def final(self, state: int) -> bool:
+        """Indique si state est acceptant et sans transition,
+        la correspondance ne pouvant alors plus s'étendre
+        """
+
+        return state >= 0 and bool(self._final[state])
+
+    def feed(self, state: int, chunk: str) -> Tuple[int, int, int]:
+        """Fait progresser l'automate depuis state sur les
+        caractères de chunk, jusqu'à la fin de chunk ou jusqu'à
+        ce que la correspondance soit décidée (état puits ou
+        état final). Permet de parcourir un input découpé en
+        morceaux.
+
+        :param state: état de départ, start pour le premier
+                     morceau
+        :param chunk: caractères à consommer
+        :return: l'état atteint, le nombre de caractères de
+                chunk consommés et le nombre de caractères
+                consommés lors de la dernière acceptation (-1 si
+                aucune)
+        """
+
+        if state < 0:
+            return state, 0, FAIL
+
+        table, accept, final = self._table, self._accept, self._final
+        alphabet = self.alphabet
+        lookup, limit, classof = alphabet.lookup, alphabet.limit, \
+            alphabet.classof
+        last = FAIL
+        end = 0
+
+        for end, code in enumerate(map(ord, chunk), 1):
+            state = table[state + (lookup[code] if code < limit
+                                   else classof(code))]
+
+            if state < 0:
+                break
+            elif accept[state]:
+                last = end
+
+                if final[state]:
+                    break
+
+        return state, end, last
+
+
+class _LazyState:
+    """Etat d'un LazyDFA : un ensemble d'états du NFA et ses
+    transitions déjà calculées (None si pas encore visitée)
+    """
+
+    __slots__ = ('states', 'accept', 'next')
+
+    def __init__(self, states: FrozenSet[int], accept: bool, ncls: int):
+        self.states = states
+        self.accept = accept
+        self.next: List[Optional[_LazyState]] = [None] * ncls
+
+
+_DEAD = _LazyState(frozenset(), False, 0)
+
+
+class LazyDFA(CompiledFnRegex):
+    """Un LazyDFA construit les états du DFA à partir du NFA
+    lors de leur première visite et les conserve dans un cache
+    de taille bornée.
+
+    Lorsque le cache est plein il est vidé. Si cela se produit
+    alors que trop peu de caractères ont été lus depuis le
+    précédent vidage (moins de MIN_CHARS_PER_STATE par état du
+    cache), le parcourt en cours se termine par une simulation
+    directe du NFA.
+    """
+
+    def __init__(self, pattern: FnRegex, nfa: NFA,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.pattern = pattern
+        self.nfa = nfa
+        self.alphabet = Alphabet(nfa)
+        self.cache_size = max(cache_size, 1)
+        self.flushes = 0
+        self.fallbacks = 0
+        self._moves = transitions_by_class(nfa, self.alphabet)
+        self._cache: Dict[FrozenSet[int], _LazyState] = {}
+        self._start = nfa.closure((nfa.start,))
+
+    @property
+    def states(self) -> int:
+        """Nombre d'états actuellement présents dans le cache"""
+
+        return len(self._cache)
+
+    def _state(self, states: FrozenSet[int]) -> _LazyState:
+        state = self._cache.get(states)
+
+        if state is None:
+            if len(self._cache) >= self.cache_size:
+                self._cache = {}
+                self.flushes += 1
+
+            state = _LazyState(states, self.nfa.accept in states,
+                               self.alphabet.size)
+            self._cache[states] = state
+
+        return state
+
+    def _transition(self, state: _LazyState, cls: int) -> _LazyState:
+        moves = self._moves
+        targets = [t for s in state.states for t in moves[s].get(cls, ())]
+        target = self._state(self.nfa.closure(targets)) if targets else _DEAD
+        state.next[cls] = target
+        return target
+
+    def _at(self, value: str, pos: int) -> int:
+        state = self._state(self._start)
+        alphabet = self.alphabet
+        lookup, limit, classof = alphabet.lookup, alphabet.limit, \
+            alphabet.classof
+        last = pos if state.accept else FAIL
+        since, flushes = pos, self.flushes
+
+        for end, code in enumerate(map(ord, islice(value, pos, None)),
+                                   pos + 1):
+            cls = lookup[code] if code < limit else classof(code)
+            target = state.next[cls]
+
+            if target is None:
+                target = self._transition(state, cls)
+
+                if self.flushes != flushes:
+                    if end - since < self.cache_size * MIN_CHARS_PER_STATE:
+                        self.fallbacks += 1
+                        last = end if target.accept else last
+                        return self.nfa.run(target.states, value, end, last)
+
+                    since, flushes = end, self.flushes
+
+            if target is _DEAD:
+                break
+
+            state = target
+
+            if state.accept:
+                last = end
+
+        return last
+
+
+class LazySequence(CompiledFnRegex):
+    """Forme compilée d'une Seq non déterministe : chaque
+    partie, une suite d'éléments déterministe ou un élément seul,
+    est testée à la suite de la précédente
+    """
+
+    def __init__(self, pattern: FnRegex, parts: List[CompiledFnRegex]):
+        self.pattern = pattern
+        self.parts = parts
+
+    def _at(self, value: str, pos: int) -> int:
+        for part in self.parts:
+            pos = part._at(value, pos)
+
+            if pos == FAIL:
+                return FAIL
+
+        return pos
+
+
+class LazyChoice(CompiledFnRegex):
+    """Forme compilée d'un Choice non déterministe : les
+    branches compilées sont essayées dans l'ordre
+    """
+
+    def __init__(self, pattern: FnRegex, branches: List[CompiledFnRegex]):
+        self.pattern = pattern
+        self.branches = branches
+
+    def _at(self, value: str, pos: int) -> int:
+        for branch in self.branches:
+            end = branch._at(value, pos)
+
+            if end != FAIL:
+                return end
+
+        return FAIL
+
+
+class LazyRepeat(CompiledFnRegex):
+    """Forme compilée d'une Repeat non déterministe : le corps
+    compilé est répété sans retour arrière, comme par Repeat
+    """
+
+    def __init__(self, pattern: Repeat, body: CompiledFnRegex):
+        self.pattern = pattern
+        self.body = body
+
+    def _at(self, value: str, pos: int) -> int:
+        body, stop = self.body, self.pattern.stop
+        count = 0
+
+        while count < stop:
+            end = body._at(value, pos)
+
+            if end == FAIL:
+                break
+            elif end == pos:
+                # une itération vide se répèterait à l'infini
+                count = stop
+            else:
+                count += 1
+
+            pos = end
+
+        return pos if count >= self.pattern.start else FAIL
+
+
+def _lazy(n: Node, cache_size: int) -> CompiledFnRegex:
+    """Compile n en un LazyDFA s'il est déterministe, sinon
+    compile ses sous-expressions déterministes en LazyDFA et les
+    enchaine selon le type de n
+    """
+
+    if is_deterministic(n):
+        return LazyDFA(n, build(n), cache_size)
+    elif isinstance(n, Seq):
+        # chaque partie est la plus longue suite d'éléments
+        # consécutifs qui reste déterministe
+        runs: List[List[Node]] = []
+
+        for item in n.items:
+            if runs and is_deterministic(Seq(tuple(runs[-1] + [item]))):
+                runs[-1].append(item)
+            else:
+                runs.append([item])
+
+        return LazySequence(n, [_lazy(run[0] if len(run) == 1
+                                      else Seq(tuple(run)), cache_size)
+                                for run in runs])
+    elif isinstance(n, Choice):
+        return LazyChoice(n, [_lazy(item, cache_size) for item in n.items])
+    elif isinstance(n, Repeat):
+        return LazyRepeat(n, _lazy(n.re, cache_size))
+    elif isinstance(n, Group):
+        return _lazy(n.re, cache_size)
+    else:
+        raise UnsupportedPatternError(f'{n!r} cannot be compiled to a DFA')
+
+
+def transitions_by_class(nfa: NFA, alphabet: Alphabet) \
+        -> List[Dict[int, List[int]]]:
+    """Indexe les transitions de chaque état du NFA par classe
+    de caractères
+
+    :param nfa: le NFA
+    :param alphabet: la partition des caractères
+    :return: pour chaque état, les cibles par classe
+    """
+
+    moves: List[Dict[int, List[int]]] = []
+
+    for edges in nfa.edges:
+        move: Dict[int, List[int]] = {}
+
+        for cls, rep in enumerate(alphabet.representatives):
+            targets = [t for lo, hi, t in edges if lo <= rep <= hi]
+
+            if targets:
+                move[cls] = targets
+
+        moves.append(move)
+
+    return moves
+
+
+def determinize(nfa: NFA, alphabet: Alphabet) \
+        -> Tuple[List[List[int]], List[bool]]:
+    """Construction par sous-ensembles du DFA équivalent au
+    NFA. L'état 0 est l'état initial.
+
+    :param nfa: le NFA à déterminiser
+    :param alphabet: la partition des caractères
+    :return: les transitions (par état et par classe) et les
+            états acceptants
+    """
+
+    moves = transitions_by_class(nfa, alphabet)
+    start = nfa.closure((nfa.start,))
+    ids = {start: 0}
+    todo = [start]
+    transitions: List[List[int]] = []
+    accepts: List[bool] = []
+
+    while todo:
+        current = todo.pop(0)
+        row = []
+
+        for cls in range(alphabet.size):
+            targets = [t for s in current for t in moves[s].get(cls, ())]
+            target = nfa.closure(targets)
+
+            if target not in ids:
+                ids[target] = len(ids)
+                todo.append(target)
+
+            row.append(ids[target])
+
+        transitions.append(row)
+        accepts.append(nfa.accept in current)
+
+    return transitions, accepts
+
+
+def minimize(transitions: List[List[int]], accepts: List[bool]) \
+        -> Tuple[int, List[List[int]], List[bool]]:
+    """Minimise un DFA par raffinement de partition puis
+    supprime les états ne pouvant plus mener à une acceptation
+
+    :param transitions: transitions par état et par classe
+    :param accepts: états acceptants
+    :return: l'état initial (-1 si l'automate ne reconnait
+            rien), les transitions et les états acceptants du
+            DFA minimal
+    """
+
+    blocks = [int(a) for a in accepts]
+    count = len(set(blocks))
+
+    while True:
+        signatures: Dict[Tuple, int] = {}
+        refined = [signatures.setdefault(
+            (blocks[s], tuple(blocks[t] for t in row)), len(signatures))
+            for s, row in enumerate(transitions)]
+
+        if len(signatures) == count:
+            break
+
+        blocks, count = refined, len(signatures)
+
+    rows: Dict[int, List[int]] = {}
+    finals: Dict[int, bool] = {}
+
+    for s, row in enumerate(transitions):
+        rows.setdefault(blocks[s], [blocks[t] for t in row])
+        finals[blocks[s]] = accepts[s]
+
+    productive = {b for b, final in finals.items() if final}
+    changed = True
+
+    while changed:
+        changed = False
+
+        for b, row in rows.items():
+            if b not in productive and any(t in productive for t in row):
+                productive.add(b)
+                changed = True
+
+    order: Dict[int, int] = {}
+    todo = [blocks[0]] if blocks[0] in productive else []
+
+    while todo:
+        b = todo.pop(0)
+
+        if b not in order:
+            order[b] = len(order)
+            todo.extend(t for t in rows[b] if t in productive)
+
+    return (0 if order else FAIL,
+            [[order.get(t, FAIL) for t in rows[b]] for b in order],
+            [finals[b] for b in order])
+
+
+def compile(fnrx: FnRegex, lazy: bool = False,
+            cache_size: int = DEFAULT_CACHE_SIZE) -> CompiledFnRegex:
+    """Compile une FnRegex en un DFA minimal, ou en un LazyDFA
+    construisant ses états à la demande
+
+    En mode lazy, une FnRegex non déterministe est compilée en
+    plusieurs LazyDFA, un par sous-expression déterministe (voir
+    LazySequence, LazyChoice et LazyRepeat) : seules ces
+    sous-expressions profitent de l'automate, leur enchainement
+    reste celui du matching des FnRegex.
+
+    :param fnrx: FnRegex à compiler, qui doit être déterministe
+                sauf en mode lazy
+    :param lazy: construit les états à la demande plutôt que
+                l'ensemble du DFA à la compilation
+    :param cache_size: nombre maximum d'états conservés par
+                      chaque LazyDFA
+    :return: un nouveau DFA, ou en mode lazy un LazyDFA ou
+            l'enchainement de plusieurs LazyDFA
+    :raise UnsupportedPatternError: si fnrx n'est pas
+            déterministe (hors mode lazy) ou contient des
+            FnRegex opaques
+    """
+
+    pattern = node(fnrx)
+
+    if lazy:
+        stack = [pattern]
+
+        while stack:
+            n = stack.pop()
+
+            if isinstance(n, Function):
+                raise UnsupportedPatternError(
+                    f'{n!r} cannot be compiled to a DFA')
+
+            stack.extend(children(n))
+
+        return _lazy(pattern, cache_size)
+    elif not is_deterministic(pattern):
+        raise UnsupportedPatternError(
+            'only deterministic patterns can be compiled to a DFA')
+
+    nfa = build(pattern)
+
+    alphabet = Alphabet(nfa)
+    start, transitions, accepts = minimize(*determinize(nfa, alphabet))
+    return DFA(pattern, alphabet, start, transitions, accepts)
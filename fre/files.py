@@ -0,0 +1,35 @@
+"""Le module files regroupe l'accès aux fichiers des caches
+disque de fre (code généré par fre.codegen, tables de
+fre.unicode).
+
+Plusieurs processus pouvant remplir le même cache, chaque
+fichier est écrit dans un fichier temporaire du même
+répertoire puis renommé : un lecteur voit soit l'ancien
+fichier, soit le nouveau, jamais un fichier incomplet.
+"""
+
+from __future__ import annotations
+
+import os
+from tempfile import mkstemp
+
+
+def store(path: str, data: bytes):
+    """Ecrit un fichier de manière atomique
+
+    :param path: chemin du fichier, dont le répertoire doit
+                exister
+    :param data: contenu du fichier
+    :raise OSError: si le fichier ne peut pas être écrit
+    """
+
+    fd, tmp = mkstemp(dir=os.path.dirname(path))
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -5,19 +5,91 @@ opérateurs python disponibles.
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Callable
+from bisect import bisect_right
+from dataclasses import dataclass, fields, FrozenInstanceError
+from typing import Callable, Iterator, List, Optional, Tuple, Union
 
+from fre import ranges as rg
+from fre.ranges import Ranges
 
-@dataclass(frozen=True)
-class MatchResult:
+FAIL = -1
+LATIN1_MAX = 0xFF
+
+Span = Tuple[int, int]
+
+# nature des noeuds pour le moteur d'exécution
+LEAF, SEQ, CHOICE, REPEAT, GROUP = range(5)
+
+# modes de matching : possessif (par défaut) ou avec retour
+# arrière (voir fre.backtrack)
+POSSESSIVE = 'possessive'
+BACKTRACK = 'backtrack'
+
+# profondeur au delà de laquelle un noeud composé est exécuté
+# avec une pile explicite plutôt que par récursion
+MAX_DEPTH = 32
+
+
+class _Frozen:
+    """Base des classes à __slots__ immuables : les attributs
+    sont fixés une fois pour toutes à la construction
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def _slots(cls) -> Tuple[str, ...]:
+        # attributs déclarés par la classe et ses bases
+        return tuple(name for klass in reversed(cls.__mro__)
+                     for name in klass.__dict__.get('__slots__', ()))
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f'cannot delete field {name!r}')
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self._slots())
+
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return self._fields() == other._fields()
+
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    def __reduce__(self):
+        # le __setstate__ par défaut affecterait les attributs
+        # un à un, ce que __setattr__ interdit
+        return self.__class__, self._fields()
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}'
+                           for name in self._slots())
+        return f'{self.__class__.__name__}({fields})'
+
+
+class MatchResult(_Frozen):
     """MatchResult représente un résultat de la fonction match
-    implémentée par les FnRegex
+    implémentée par les FnRegex. La correspondance s'étend de
+    start (0 sauf pour search et finditer) jusqu'à index.
     """
 
-    value: str
-    index: int = 0
-    match: bool = True
+    __slots__ = ('value', 'index', 'match', 'start')
+
+    # positions des groupes de capture, voir GroupMatchResult
+    spans: Tuple[Optional[Span], ...] = ()
+    names: Tuple[Tuple[str, Tuple[int, ...]], ...] = ()
+
+    def __init__(self, value: str, index: int = 0, match: bool = True,
+                 start: int = 0):
+        object.__setattr__(self, 'value', value)
+        object.__setattr__(self, 'index', index)
+        object.__setattr__(self, 'match', match)
+        object.__setattr__(self, 'start', start)
 
     def at_end(self) -> bool:
         """Retourne True si le parcourt de la value est
@@ -98,16 +170,99 @@ class MatchResult:
 
         return MatchResult(value)
 
+    def _number(self, g: Union[int, str]) -> int:
+        if isinstance(g, str):
+            for name, numbers in self.names:
+                if name == g:
+                    # le premier des groupes de ce nom ayant matché
+                    return next((i for i in numbers
+                                 if self.spans[i - 1] is not None),
+                                numbers[0])
+
+            raise IndexError(f'no such group {g!r}')
+        elif 0 <= g <= len(self.spans):
+            return g
+
+        raise IndexError(f'no such group {g!r}')
+
+    def span(self, g: Union[int, str] = 0) -> Optional[Span]:
+        """Donne les positions (début, fin) dans value de la
+        correspondance (g = 0) ou d'un groupe de capture
+
+        :param g: numéro ou nom du groupe
+        :return: les positions, ou None si le groupe n'a pas
+                participé à la correspondance
+        :raise IndexError: si le groupe n'existe pas
+        """
 
-@dataclass(frozen=True)
-class FullMatchResult:
+        number = self._number(g)
+
+        if not self.match:
+            return None
+
+        return (self.start, self.index) if number == 0 \
+            else self.spans[number - 1]
+
+    def group(self, g: Union[int, str] = 0):
+        """Extrait de value la sous-chaine d'un groupe de
+        capture. Elle n'est construite qu'à cet appel.
+
+        :param g: numéro ou nom du groupe, 0 pour la
+                 correspondance complète
+        :return: la sous-chaine, ou None si le groupe n'a pas
+                participé à la correspondance
+        :raise IndexError: si le groupe n'existe pas
+        """
+
+        span = self.span(g)
+        return None if span is None else self.value[span[0]:span[1]]
+
+    def groups(self) -> tuple:
+        """Extrait les sous-chaines de tous les groupes de
+        capture, dans l'ordre de leurs numéros
+
+        :return: un tuple de sous-chaines (None pour les
+                groupes n'ayant pas participé)
+        """
+
+        return tuple(self.group(i) for i in range(1, len(self.spans) + 1))
+
+    def groupdict(self) -> dict:
+        """Extrait les sous-chaines des groupes nommés
+
+        :return: un dictionnaire nom -> sous-chaine
+        """
+
+        return {name: self.group(name) for name, _ in self.names}
+
+
+class GroupMatchResult(MatchResult):
+    """Résultat du matching d'une FnRegex contenant des groupes
+    de capture. spans donne, pour chaque groupe numéroté à
+    partir de 1, ses positions (début, fin) dans value ou None,
+    et names les numéros des groupes de chaque nom.
+    """
+
+    __slots__ = ('spans', 'names')
+
+    def __init__(self, value: str, index: int = 0, match: bool = True,
+                 start: int = 0, spans: tuple = (), names: tuple = ()):
+        super().__init__(value, index, match, start)
+        object.__setattr__(self, 'spans', spans)
+        object.__setattr__(self, 'names', names)
+
+
+class FullMatchResult(_Frozen):
     """Un FullMatchResult représente un résultat de
     matching sur l'ensemble d'un string, au contraire
     de MatchResult qui représente un résultat de match
     partiel.
     """
 
-    mr: MatchResult
+    __slots__ = ('mr',)
+
+    def __init__(self, mr: MatchResult):
+        object.__setattr__(self, 'mr', mr)
 
     def matched(self) -> bool:
         """Si le dernier test de matching est True et
@@ -120,28 +275,847 @@ class FullMatchResult:
 
         return self.mr.at_end() and self.mr.matched()
 
+    def span(self, g: Union[int, str] = 0) -> Optional[Span]:
+        """Equivalent de MatchResult.span"""
+
+        return self.mr.span(g)
+
+    def group(self, g: Union[int, str] = 0):
+        """Equivalent de MatchResult.group"""
+
+        return self.mr.group(g)
+
+    def groups(self) -> tuple:
+        """Equivalent de MatchResult.groups"""
+
+        return self.mr.groups()
+
+    def groupdict(self) -> dict:
+        """Equivalent de MatchResult.groupdict"""
+
+        return self.mr.groupdict()
+
 
 FnRegex = Callable[[MatchResult], MatchResult]
 
 
-def seq(*fnrexs: FnRegex) -> FnRegex:
-    """ Un Sequence est une suite de FnRegex
-    qui doivent toutes matcher pour être validé.
+class UnsupportedPatternError(ValueError):
+    """Levée lorsqu'une passe travaillant sur l'arbre des
+    FnRegex (analyse, compilation, ...) rencontre une
+    expression qu'elle ne sait pas traiter
+    """
+
+
+class Node:
+    """Node est la classe de base de tous les noeuds de l'arbre
+    construit par les constructeurs de FnRegex (seq, repeat,
+    choice, charinterval et char).
+
+    Contrairement à une closure, un Node est immuable et
+    inspectable : ses attributs décrivent entièrement
+    l'expression, ce qui permet à d'autres passes (optimisation,
+    compilation, sérialisation) de travailler sur l'arbre. Un
+    Node reste appelable comme n'importe quelle FnRegex.
+
+    En interne, le matching ne manipule pas de MatchResult :
+    chaque noeud implémente _at qui, à partir de l'input et
+    d'une position, retourne la position atteinte ou FAIL.
+    """
+
+    _kind = LEAF
+    _depth = 1
+    # nombre d'occurrences de groupes de capture dans l'arbre
+    _groups = 0
+
+    # les noeuds composés (Seq, Repeat et Choice) calculent leur
+    # hash structurel une seule fois, à leur construction, à
+    # partir de celui de leurs enfants : le hash d'un arbre
+    # profond ne demande ainsi aucune récursion
+
+    def _at(self, value: str, pos: int) -> int:
+        raise NotImplementedError
+
+    def __call__(self, m: MatchResult) -> MatchResult:
+        """Execute le matching du noeud depuis l'index courant de m
+
+        :param m: MatchResult servant de point de départ
+        :return: un nouveau MatchResult
+        """
+
+        end = self._at(m.value, m.index)
+        return m.bad() if end == FAIL else MatchResult(m.value, end)
+
+    def __reduce__(self):
+        # l'arbre est transmis dans le format de fre.wire, compact
+        # et décodé sans récursion quelle que soit sa profondeur.
+        # Les arbres que ce format ne couvre pas (noeuds Function,
+        # ...) sont transmis attribut par attribut.
+        from fre import wire
+
+        try:
+            return wire.loads, (wire.dumps(self),)
+        except UnsupportedPatternError:
+            return self.__class__, tuple(getattr(self, f.name)
+                                         for f in fields(self))
+
+
+class _Single(Node):
+    """Base des noeuds consommant exactement un caractère
+    (Char, CharInterval et CharSet). L'attribut ranges donne
+    l'ensemble des code points matchés.
     """
 
-    def __current_or_origin(m, origin):
-        return m.current_ok() if m.matched() else origin.bad()
+    ranges: Ranges
+
+    def _span(self, value: str, pos: int, n: int) -> int:
+        """Consomme au plus n caractères consécutifs matchés
+        par le noeud à partir de pos
+
+        :return: la position atteinte
+        """
+
+        end = min(len(value), pos + n)
+        at = self._at
+
+        while pos < end and at(value, pos) != FAIL:
+            pos += 1
+
+        return pos
 
-    def __tr_seq(m, origin, first, *nexts):
-        if m.matched():
-            if not nexts:
-                return __current_or_origin(first(m), origin)
+
+def node(fnrx: FnRegex) -> Node:
+    """Retire les éventuels wrappers (OperatorFnRegex, ...)
+    autour d'une FnRegex afin d'obtenir le Node sous-jacent.
+
+    Une FnRegex qui n'est ni un Node ni un wrapper (une simple
+    fonction par exemple) est enveloppée dans un noeud Function
+    et reste opaque pour les passes travaillant sur l'arbre.
+
+    :param fnrx: FnRegex éventuellement wrappée
+    :return: le Node correspondant
+    """
+
+    while not isinstance(fnrx, Node) and hasattr(fnrx, 'fnrx'):
+        fnrx = fnrx.fnrx
+
+    return fnrx if isinstance(fnrx, Node) else Function(fnrx)
+
+
+def _execute(root: Node, value: str, pos: int) -> int:
+    """Moteur d'exécution des noeuds composés profonds (Seq,
+    Choice et Repeat).
+
+    Le parcours de l'arbre utilise une pile explicite plutôt
+    que la récursion : les sous-arbres de profondeur au plus
+    MAX_DEPTH sont exécutés directement par leur méthode _at,
+    les autres sont empilés. La profondeur de la pile d'appels
+    python reste donc bornée, quelles que soient la taille de
+    l'input et la profondeur de l'expression. Chaque cadre de
+    la pile est une liste [noeud, indice ou compteur, position
+    d'origine, position courante].
+
+    :param root: noeud à exécuter
+    :param value: input à tester
+    :param pos: position de départ
+    :return: la position atteinte ou FAIL
+    """
+
+    stack = []
+    n = root
+
+    while True:
+        # descente : exécute n à la position pos, jusqu'à
+        # obtenir un résultat r
+        kind = n._kind
+
+        if n._depth <= MAX_DEPTH:
+            r = n._at(value, pos)
+        elif kind == GROUP:
+            n = n.re
+            continue
+        elif kind == REPEAT:
+            if n.stop <= 0:
+                r = pos if n.start <= 0 else FAIL
+            else:
+                stack.append([n, 0, pos, pos])
+                n = n.re
+                continue
+        else:
+            stack.append([n, 0, pos, pos])
+            n = n.items[0]
+            continue
+
+        # remontée : transmet r aux cadres de la pile jusqu'à
+        # trouver le prochain noeud à exécuter
+        while stack:
+            frame = stack[-1]
+            parent = frame[0]
+            kind = parent._kind
+
+            if kind == SEQ:
+                items = parent.items
+                i = frame[1] + 1
+
+                while r != FAIL and i < len(items) and \
+                        items[i]._depth <= MAX_DEPTH:
+                    r = items[i]._at(value, r)
+                    i += 1
+
+                if r == FAIL or i == len(items):
+                    stack.pop()
+                    continue
+
+                frame[1] = i
+                pos = r
+                n = items[i]
+                break
+            elif kind == CHOICE:
+                items = parent.items
+                i = frame[1] + 1
+
+                if r != FAIL:
+                    stack.pop()
+                    continue
+                elif i == len(items):
+                    stack.pop()
+                    continue
+
+                frame[1] = i
+                pos = frame[2]
+                n = items[i]
+                break
+            else:
+                count, current = frame[1], frame[3]
+
+                if r == FAIL:
+                    stack.pop()
+                    r = current if count >= parent.start else FAIL
+                    continue
+                elif r == current:
+                    # une itération vide se répèterait à l'infini,
+                    # toutes les itérations restantes sont donc acquises
+                    stack.pop()
+                    r = r if parent.stop >= parent.start else FAIL
+                    continue
+
+                count += 1
+
+                if count >= parent.stop:
+                    stack.pop()
+                    r = r if count >= parent.start else FAIL
+                    continue
+
+                frame[1] = count
+                frame[3] = pos = r
+                n = parent.re
+                break
+        else:
+            return r
+
+
+def _capture(root: Node, value: str, pos: int,
+             spans: List[Optional[Span]]) -> int:
+    """Moteur d'exécution relevant les positions des groupes de
+    capture, utilisé uniquement pour les arbres contenant des
+    groupes. Les sous-arbres sans groupe sont exécutés par leur
+    méthode _at.
+
+    Comme pour _execute, l'arbre est parcouru avec une pile
+    explicite dont chaque cadre est une liste [noeud, numéro du
+    premier groupe de l'enfant courant, indice ou compteur,
+    position d'origine, position courante, positions des groupes
+    à restaurer]. Les groupes sont numérotés dans l'ordre de
+    leurs occurrences dans l'arbre, ce que reproduit le numéro
+    transmis aux enfants. Les positions relevées par une branche
+    de Choice ou une itération de Repeat qui échoue sont
+    restaurées.
+
+    :param root: noeud à exécuter
+    :param value: input à tester
+    :param pos: position de départ
+    :param spans: positions des groupes, complétées au fil du
+                 matching
+    :return: la position atteinte ou FAIL
+    """
+
+    stack = []
+    n, base = root, 0
+
+    while True:
+        kind = n._kind
+
+        if not n._groups:
+            r = n._at(value, pos)
+        elif kind == GROUP:
+            stack.append([n, base + 1, 0, pos, pos, None])
+            n, base = n.re, base + 1
+            continue
+        elif kind == REPEAT:
+            if n.stop <= 0:
+                r = pos if n.start <= 0 else FAIL
+            else:
+                stack.append([n, base, 0, pos, pos, spans[:]])
+                n = n.re
+                continue
+        else:
+            stack.append([n, base, 0, pos, pos,
+                          spans[:] if kind == CHOICE else None])
+            n = n.items[0]
+            continue
+
+        while stack:
+            frame = stack[-1]
+            parent = frame[0]
+            kind = parent._kind
+
+            if kind == GROUP:
+                stack.pop()
+
+                if r != FAIL:
+                    spans[frame[1] - 1] = (frame[3], r)
+            elif kind == SEQ:
+                items = parent.items
+                i = frame[2]
+
+                if r == FAIL or i + 1 == len(items):
+                    stack.pop()
+                    continue
+
+                frame[1] += items[i]._groups
+                frame[2] = i + 1
+                n, base, pos = items[i + 1], frame[1], r
+                break
+            elif kind == CHOICE:
+                items = parent.items
+                i = frame[2]
+
+                if r != FAIL:
+                    stack.pop()
+                    continue
+                elif items[i]._groups:
+                    spans[:] = frame[5]
+
+                if i + 1 == len(items):
+                    stack.pop()
+                    continue
+
+                frame[1] += items[i]._groups
+                frame[2] = i + 1
+                n, base, pos = items[i + 1], frame[1], frame[3]
+                break
+            else:
+                count, current = frame[2], frame[4]
+
+                if r == FAIL:
+                    # les groupes de l'itération échouée sont oubliés
+                    spans[:] = frame[5]
+                    stack.pop()
+                    r = current if count >= parent.start else FAIL
+                    continue
+                elif r == current:
+                    stack.pop()
+                    r = r if parent.stop >= parent.start else FAIL
+                    continue
+
+                count += 1
+
+                if count >= parent.stop:
+                    stack.pop()
+                    r = r if count >= parent.start else FAIL
+                    continue
+
+                frame[2] = count
+                frame[4] = pos = r
+                frame[5] = spans[:]
+                n, base = parent.re, frame[1]
+                break
+        else:
+            return r
+
+
+def _names(root: Node) -> Tuple[Tuple[str, Tuple[int, ...]], ...]:
+    """Numéros des groupes de chaque nom de l'arbre, dans l'ordre
+    des occurrences des groupes. Le résultat est conservé dans
+    le noeud racine.
+    """
+
+    names = root.__dict__.get('_names')
+
+    if names is None:
+        numbers = {}
+        count = 0
+        stack = [root]
+
+        # parcours préfixe des seuls sous-arbres contenant des
+        # groupes, chaque occurrence d'un sous-arbre partagé
+        # ayant ses propres numéros
+        while stack:
+            n = stack.pop()
+
+            if isinstance(n, Group):
+                count += 1
+
+                if n.name is not None:
+                    numbers.setdefault(n.name, []).append(count)
+
+                stack.append(n.re)
+            elif n._groups:
+                stack.extend(reversed(n.items) if n._kind in (SEQ, CHOICE)
+                             else (n.re,))
+
+        names = tuple((name, tuple(found)) for name, found in numbers.items())
+        object.__setattr__(root, '_names', names)
+
+    return names
+
+
+def _captured(tree: Node, value: str, pos: int, inp,
+              full: bool = False) -> GroupMatchResult:
+    """Exécute le matching de tree en relevant ses groupes
+
+    :param inp: value du résultat
+    :param full: exige la correspondance de value entière
+    """
+
+    spans = [None] * tree._groups
+    end = _capture(tree, value, pos, spans)
+
+    if end == FAIL or full and end != len(value):
+        return _failed(tree, inp, pos)
+
+    return GroupMatchResult(inp, end, True, pos, tuple(spans), _names(tree))
+
+
+def _failed(tree: Node, inp, pos: int) -> MatchResult:
+    """Résultat en échec du matching de tree à partir de pos,
+    un GroupMatchResult si tree contient des groupes
+    """
+
+    if tree._groups:
+        return GroupMatchResult(inp, pos, False, pos, (None,) * tree._groups,
+                                _names(tree))
+
+    return MatchResult(inp, pos, False, pos)
+
+
+def _guard(fnrx: FnRegex):
+    """Retourne le Guard de fnrx (voir fre.analysis), conservé
+    dans son noeud racine
+    """
+
+    root = node(fnrx)
+    guard = root.__dict__.get('_guard')
+
+    if guard is None:
+        # import local : fre.analysis dépend de ce module
+        from fre.analysis import Guard
+
+        guard = Guard(root)
+        object.__setattr__(root, '_guard', guard)
+
+    return guard
+
+
+def _depth(items: Tuple[Node, ...]) -> int:
+    return 1 + max((item._depth for item in items), default=0)
+
+
+@dataclass(frozen=True)
+class Function(Node):
+    """Noeud opaque enveloppant une FnRegex quelconque"""
+
+    fn: FnRegex
+
+    def _at(self, value: str, pos: int) -> int:
+        m = self.fn(MatchResult(value, pos))
+        return m.index if m.matched() else FAIL
+
+
+@dataclass(frozen=True)
+class Seq(Node):
+    """Noeud d'une Sequence de FnRegex"""
+
+    items: Tuple[Node, ...]
+    _kind = SEQ
+
+    def __post_init__(self):
+        object.__setattr__(self, '_depth', _depth(self.items))
+        object.__setattr__(self, '_groups',
+                           sum(item._groups for item in self.items))
+        object.__setattr__(self, '_hash', hash((Seq, self.items)))
+
+    def __hash__(self):
+        return self._hash
+
+    def _at(self, value: str, pos: int) -> int:
+        if self._depth > MAX_DEPTH:
+            return _execute(self, value, pos)
+
+        for item in self.items:
+            pos = item._at(value, pos)
+
+            if pos == FAIL:
+                return FAIL
+
+        return pos
+
+
+@dataclass(frozen=True)
+class Repeat(Node):
+    """Noeud d'une répétition bornée (bornes incluses) d'une FnRegex"""
+
+    re: Node
+    start: int
+    stop: int
+    _kind = REPEAT
+
+    def __post_init__(self):
+        object.__setattr__(self, '_depth', _depth((self.re,)))
+        object.__setattr__(self, '_groups', self.re._groups)
+        object.__setattr__(self, '_hash',
+                           hash((Repeat, self.re, self.start, self.stop)))
+
+    def __hash__(self):
+        return self._hash
+
+    def _at(self, value: str, pos: int) -> int:
+        re, stop = self.re, self.stop
+
+        if isinstance(re, _Single):
+            end = re._span(value, pos, stop)
+            return end if end - pos >= self.start else FAIL
+        elif self._depth > MAX_DEPTH:
+            return _execute(self, value, pos)
+
+        count = 0
+
+        while count < stop:
+            end = re._at(value, pos)
+
+            if end == FAIL:
+                break
+            elif end == pos:
+                # une itération vide se répèterait à l'infini,
+                # toutes les itérations restantes sont donc acquises
+                count = stop
             else:
-                return __tr_seq(first(m), origin, *nexts)
+                count += 1
+
+            pos = end
+
+        return pos if count >= self.start else FAIL
+
+
+@dataclass(frozen=True)
+class Choice(Node):
+    """Noeud d'un choix ordonné entre plusieurs FnRegex"""
+
+    items: Tuple[Node, ...]
+    _kind = CHOICE
+
+    def __post_init__(self):
+        object.__setattr__(self, '_depth', _depth(self.items))
+        object.__setattr__(self, '_groups',
+                           sum(item._groups for item in self.items))
+        object.__setattr__(self, '_hash', hash((Choice, self.items)))
+
+    def __hash__(self):
+        return self._hash
+
+    def _at(self, value: str, pos: int) -> int:
+        if self._depth > MAX_DEPTH:
+            return _execute(self, value, pos)
+
+        for item in self.items:
+            end = item._at(value, pos)
+
+            if end != FAIL:
+                return end
+
+        return FAIL
+
+
+@dataclass(frozen=True)
+class Group(Node):
+    """Noeud d'un groupe de capture, éventuellement nommé.
+
+    Le matching ne fait que traverser le groupe : ses positions
+    ne sont relevées (voir _capture) que pour les arbres
+    contenant des groupes, les autres n'en paient pas le coût.
+    """
+
+    re: Node
+    name: Optional[str] = None
+    _kind = GROUP
+
+    def __post_init__(self):
+        object.__setattr__(self, '_depth', _depth((self.re,)))
+        object.__setattr__(self, '_groups', self.re._groups + 1)
+        object.__setattr__(self, '_hash', hash((Group, self.re, self.name)))
+
+    def __hash__(self):
+        return self._hash
+
+    def _at(self, value: str, pos: int) -> int:
+        if self._depth > MAX_DEPTH:
+            return _execute(self, value, pos)
+
+        return self.re._at(value, pos)
+
+
+@dataclass(frozen=True)
+class CharInterval(_Single):
+    """Noeud d'un interval de caractères (bornes incluses)"""
+
+    first: chr
+    last: chr
+
+    @property
+    def ranges(self) -> Ranges:
+        return rg.normalize(((ord(self.first), ord(self.last)),))
+
+    def _at(self, value: str, pos: int) -> int:
+        if pos < len(value) and self.first <= value[pos] <= self.last:
+            return pos + 1
         else:
-            return origin.bad()
+            return FAIL
+
+    def _span(self, value: str, pos: int, n: int) -> int:
+        end = min(len(value), pos + n)
+        first, last = self.first, self.last
+
+        while pos < end and first <= value[pos] <= last:
+            pos += 1
+
+        return pos
+
+
+@dataclass(frozen=True)
+class Char(_Single):
+    """Noeud d'un unique caractère"""
+
+    c: chr
+
+    @property
+    def ranges(self) -> Ranges:
+        return (ord(self.c), ord(self.c)),
+
+    def _at(self, value: str, pos: int) -> int:
+        if pos < len(value) and value[pos] == self.c:
+            return pos + 1
+        else:
+            return FAIL
+
+    def _span(self, value: str, pos: int, n: int) -> int:
+        chunk = value[pos:pos + n]
+        return pos + len(chunk) - len(chunk.lstrip(self.c))
+
+
+@dataclass(frozen=True)
+class CharSet(_Single):
+    """Noeud d'un ensemble de caractères, représenté par des
+    intervalles de code points triés et disjoints (voir
+    fre.ranges).
+
+    L'appartenance d'un caractère Latin-1 se teste en temps
+    constant, celle des autres caractères par recherche
+    dichotomique dans les intervalles.
+    """
+
+    ranges: Ranges
+
+    def __post_init__(self):
+        latin1 = frozenset(chr(code) for lo, hi in self.ranges
+                           if lo <= LATIN1_MAX
+                           for code in range(lo, min(hi, LATIN1_MAX) + 1))
+        object.__setattr__(self, '_latin1', latin1)
+        object.__setattr__(self, '_wide', bool(self.ranges) and
+                           self.ranges[-1][1] > LATIN1_MAX)
+        # débuts des intervalles, la recherche dichotomique sur
+        # des entiers étant plus rapide que sur les intervalles
+        object.__setattr__(self, '_starts', tuple(
+            lo for lo, _ in self.ranges) if self._wide else ())
+
+    def __contains__(self, c: chr) -> bool:
+        if c in self._latin1:
+            return True
+        elif not self._wide:
+            return False
+
+        code = ord(c)
+        i = bisect_right(self._starts, code) - 1
+        return i >= 0 and self.ranges[i][1] >= code
+
+    def _at(self, value: str, pos: int) -> int:
+        if pos < len(value) and value[pos] in self:
+            return pos + 1
+        else:
+            return FAIL
+
+    def _span(self, value: str, pos: int, n: int) -> int:
+        end = min(len(value), pos + n)
+        latin1 = self._latin1
+
+        if self._wide:
+            while pos < end and value[pos] in self:
+                pos += 1
+        else:
+            while pos < end and value[pos] in latin1:
+                pos += 1
+
+        return pos
 
-    return lambda m: __tr_seq(m, m, *fnrexs)
+    def union(self, *others: FnRegex) -> CharSet:
+        """Union du CharSet avec d'autres ensembles de caractères
+
+        :param others: FnRegex ne consommant qu'un caractère
+        :return: un nouveau CharSet
+        """
+
+        return CharSet(rg.union(self.ranges, *(charset(o).ranges
+                                               for o in others)))
+
+    def intersection(self, other: FnRegex) -> CharSet:
+        """Intersection du CharSet avec un autre ensemble
+
+        :param other: FnRegex ne consommant qu'un caractère
+        :return: un nouveau CharSet
+        """
+
+        return CharSet(rg.intersection(self.ranges, charset(other).ranges))
+
+    def difference(self, other: FnRegex) -> CharSet:
+        """Caractères du CharSet absents d'un autre ensemble
+
+        :param other: FnRegex ne consommant qu'un caractère
+        :return: un nouveau CharSet
+        """
+
+        return CharSet(rg.difference(self.ranges, charset(other).ranges))
+
+    def negate(self) -> CharSet:
+        """Complémentaire du CharSet
+
+        :return: un nouveau CharSet contenant tous les
+                caractères absents de celui-ci
+        """
+
+        return CharSet(rg.complement(self.ranges))
+
+
+@dataclass(frozen=True)
+class Literal(Node):
+    """Noeud d'une chaine littérale, testée en un seul appel
+    à str.startswith
+    """
+
+    text: str
+
+    def _at(self, value: str, pos: int) -> int:
+        if value.startswith(self.text, pos):
+            return pos + len(self.text)
+        else:
+            return FAIL
+
+
+def children(n: Node) -> Tuple[Node, ...]:
+    """Enfants directs d'un noeud de l'arbre d'une FnRegex
+
+    :param n: noeud à parcourir
+    :return: les noeuds de n (Seq, Choice), son noeud répété
+            (Repeat) ou capturé (Group), aucun pour une feuille
+    """
+
+    if isinstance(n, (Seq, Choice)):
+        return n.items
+    elif isinstance(n, (Repeat, Group)):
+        return n.re,
+    else:
+        return ()
+
+
+def rebuild(n: Node, items: List[Node]) -> Node:
+    """Reconstruit un noeud avec de nouveaux enfants
+
+    :param n: noeud à reconstruire
+    :param items: nouveaux enfants, dans l'ordre de children(n)
+    :return: n si ses enfants sont inchangés, un nouveau noeud
+            de même type et de mêmes paramètres sinon
+    """
+
+    if all(a is b for a, b in zip(children(n), items)):
+        return n
+    elif isinstance(n, Seq):
+        return Seq(tuple(items))
+    elif isinstance(n, Choice):
+        return Choice(tuple(items))
+    elif isinstance(n, Repeat):
+        return Repeat(items[0], n.start, n.stop)
+    elif isinstance(n, Group):
+        return Group(items[0], n.name)
+    else:
+        return n
+
+
+class CompiledFnRegex:
+    """Base des formes compilées d'une FnRegex (automates, ...).
+
+    Une forme compilée s'utilise comme une FnRegex ou au travers
+    de ses méthodes match et fullmatch. Les sous-classes
+    implémentent _at qui, comme pour les Node, retourne à partir
+    d'une position de départ la position de fin de la
+    correspondance ou FAIL.
+    """
+
+    pattern: FnRegex
+    _groups = 0
+
+    def _at(self, value: str, pos: int) -> int:
+        raise NotImplementedError
+
+    def _full(self, value: str) -> bool:
+        return self._at(value, 0) == len(value)
+
+    def __call__(self, m: MatchResult) -> MatchResult:
+        """Execute le matching depuis l'index courant de m
+
+        :param m: MatchResult servant de point de départ
+        :return: un nouveau MatchResult
+        """
+
+        end = self._at(m.value, m.index)
+        return m.bad() if end == FAIL else MatchResult(m.value, end)
+
+    def match(self, inp: str) -> MatchResult:
+        """Equivalent compilé de la fonction match
+
+        :param inp: input à tester
+        :return: un nouveau MatchResult
+        """
+
+        end = self._at(inp, 0)
+        return MatchResult(inp, 0, False) if end == FAIL \
+            else MatchResult(inp, end)
+
+    def fullmatch(self, inp: str) -> FullMatchResult:
+        """Equivalent compilé de la fonction fullmatch
+
+        :param inp: input à tester
+        :return: un nouveau FullMatchResult
+        """
+
+        if self._full(inp):
+            return FullMatchResult(MatchResult(inp, len(inp)))
+        else:
+            return FullMatchResult(MatchResult(inp, 0, False))
+
+
+def seq(*fnrexs: FnRegex) -> FnRegex:
+    """ Un Sequence est une suite de FnRegex
+    qui doivent toutes matcher pour être validé.
+    """
+
+    return Seq(tuple(node(fnrx) for fnrx in fnrexs))
 
 
 def repeat(re: FnRegex, start: int, stop: int):
@@ -152,18 +1126,7 @@ def repeat(re: FnRegex, start: int, stop: int):
     max stop l'inspection
     """
 
-    def __repeat_tr(m: MatchResult, depth: int, origin: MatchResult):
-        if m.matched():
-            if depth > stop:
-                return m.current_ok()
-            else:
-                return __repeat_tr(re(m), depth + 1, origin)
-        elif start <= depth - 1 <= stop:
-            return m.current_ok()
-        else:
-            return origin.bad()
-
-    return lambda m: __repeat_tr(m, 0, m)
+    return Repeat(node(re), start, stop)
 
 
 def choice(*fnrxs) -> FnRegex:
@@ -171,44 +1134,134 @@ def choice(*fnrxs) -> FnRegex:
     de la Sequence à savoir un choix parmi n FnRegex
     """
 
-    def __tr_choice(m, first, *nexts):
-        firstm = first(m)
+    return Choice(tuple(node(fnrx) for fnrx in fnrxs))
 
-        if firstm.matched():
-            return firstm
-        elif nexts:
-            return __tr_choice(m, *nexts)
-        else:
-            return m.bad()
 
-    return lambda m: __tr_choice(m, *fnrxs)
+def _chr(c) -> str:
+    """Convertit un octet (bytes de longueur 1 ou entier) en
+    le caractère Latin-1 de même valeur
+    """
+
+    if isinstance(c, int):
+        return chr(c)
+    elif isinstance(c, (bytes, bytearray)):
+        return c.decode('latin-1')
+    else:
+        return c
 
 
 def charinterval(first: chr, last: chr) -> FnRegex:
     """Un CharInterval est un interval de deux
     FnRegex de type Char et permet donc de tester
-    si un contenu est entre ces deux Chars
+    si un contenu est entre ces deux Chars. Les bornes
+    peuvent être des octets (voir fre.binary).
     """
 
-    def __is_between_first_last(m):
-        return m.not_end() and first <= m.char() <= last
-
-    return lambda m: m.ok() if __is_between_first_last(m) else m.bad()
+    return CharInterval(_chr(first), _chr(last))
 
 
 def char(c: chr) -> FnRegex:
     """Un Char représente le FnRegex le plus simple,
     le fait de tester un contenu par rapport à un
-    unique caractère
+    unique caractère, éventuellement donné sous forme
+    d'octet (voir fre.binary)
+    """
+
+    return Char(_chr(c))
+
+
+def literal(text: str) -> FnRegex:
+    """Un Literal teste la présence d'une chaine complète,
+    équivalent plus rapide d'une Sequence de Char. text
+    peut être une suite d'octets (voir fre.binary).
+    """
+
+    return Literal(_chr(text))
+
+
+def group(fnrx: FnRegex, name: Optional[str] = None) -> FnRegex:
+    """Un Group capture les positions de la correspondance de
+    fnrx. Les groupes sont numérotés à partir de 1 dans l'ordre
+    de leurs occurrences dans l'expression et peuvent être
+    nommés. Ils ne sont relevés qu'en mode possessif.
+    """
+
+    return Group(node(fnrx), name)
+
+
+def charset(*items) -> CharSet:
+    """Un CharSet est un ensemble de caractères construit par
+    union de caractères (une str ou des bytes apportent
+    chacun de leurs caractères), de Char, de CharInterval ou
+    d'autres CharSet
+
+    :param items: les éléments de l'ensemble
+    :return: un nouveau CharSet
     """
 
-    def __is_same_c(m):
-        return m.not_end() and m.char() == c
+    ranges = []
+
+    for item in items:
+        if isinstance(item, (str, bytes, bytearray)):
+            ranges.extend((ord(c), ord(c)) for c in _chr(item))
+        else:
+            single = node(item)
+
+            if not isinstance(single, _Single):
+                raise UnsupportedPatternError(
+                    f'{single!r} does not match a single character')
+
+            ranges.extend(single.ranges)
 
-    return lambda m: m.ok() if __is_same_c(m) else m.bad()
+    return CharSet(rg.normalize(ranges))
 
 
-def match(fnrx: FnRegex, inp: str) -> MatchResult:
+def _matcher(fnrx: FnRegex, inp, backend: Optional[str],
+             endpos: Optional[int], mode: str = POSSESSIVE):
+    """Retourne l'objet exécutant le matching de fnrx (le Node
+    lui-même, sa traduction binaire ou sa forme compilée par
+    backend ou pour le mode) et la valeur à parcourir, bornée
+    par endpos
+    """
+
+    if mode == BACKTRACK:
+        if backend is not None:
+            raise ValueError(f'backend {backend!r} only supports the '
+                             f'{POSSESSIVE} mode')
+        elif not isinstance(inp, str):
+            raise TypeError(f'the {BACKTRACK} mode only matches str inputs')
+
+        from fre.backtrack import backtrack
+        return backtrack(fnrx), inp if endpos is None else inp[:endpos]
+    elif mode != POSSESSIVE:
+        raise ValueError(f'unknown mode {mode!r}, expected {POSSESSIVE!r} '
+                         f'or {BACKTRACK!r}')
+
+    if isinstance(inp, str):
+        value = inp if endpos is None else inp[:endpos]
+    elif backend is not None:
+        raise TypeError(f'backend {backend!r} only matches str inputs')
+    else:
+        # import local : fre.binary dépend de ce module
+        from fre.binary import binary
+
+        # la memoryview borne l'input sans le copier
+        value = inp if endpos is None else memoryview(inp)[:endpos]
+        return binary(fnrx), value
+
+    if backend is None:
+        return node(fnrx), value
+    elif node(fnrx)._groups:
+        # les groupes ne sont relevés que par l'arbre
+        return node(fnrx), value
+
+    from fre.backends import compile
+    return compile(fnrx, backend), value
+
+
+def match(fnrx: FnRegex, inp: str, backend: Optional[str] = None,
+          pos: int = 0, endpos: Optional[int] = None,
+          mode: str = POSSESSIVE) -> MatchResult:
     """Fonction générale permettant de tester inp
     par rapport à le FnRegex fnrx passée en paramètre
 
@@ -216,16 +1269,47 @@ def match(fnrx: FnRegex, inp: str) -> MatchResult:
     controler un matching total, il faut utiliser la
     méthode fullmatch
 
+    Les inputs que l'analyse de fnrx exclut (trop courts, de
+    premier caractère impossible ou ne contenant pas un
+    littéral requis, voir fre.analysis.Guard) sont rejetés sans
+    exécuter le matching.
+
     :param fnrx: FnRegex portant le test
-    :param inp: input à tester en fonction du FnRegex
+    :param inp: input à tester en fonction du FnRegex, str ou
+               input binaire (bytes, bytearray, memoryview)
+    :param backend: nom de la forme compilée à utiliser
+                   (voir fre.backends), None pour
+                   interpréter directement l'arbre
+    :param pos: position de départ du matching
+    :param endpos: position de fin de l'input, la fin de inp
+                  si None. La value du résultat est alors inp
+                  bornée par endpos (une memoryview pour un
+                  input binaire).
+    :param mode: POSSESSIVE, ou BACKTRACK pour revenir sur les
+                choix et les répétitions lorsque la suite de
+                l'expression échoue (voir fre.backtrack)
     :return: un nouveau MatchResult témoignant du
-            résultat final
+            résultat final, un GroupMatchResult si fnrx
+            contient des groupes de capture
+    :raise UnsupportedPatternError: en mode BACKTRACK, si
+            l'automate de fnrx dépasse fre.nfa.MAX_STATES états
     """
 
-    return fnrx(MatchResult.input(inp))
+    matcher, value = _matcher(fnrx, inp, backend, endpos, mode)
+
+    if _guard(fnrx).rejects(value, pos):
+        return _failed(matcher, value, pos)
+    elif matcher._groups:
+        return _captured(matcher, value, pos, value)
+
+    end = matcher._at(value, pos)
+    return MatchResult(value, pos, False, pos) if end == FAIL \
+        else MatchResult(value, end, True, pos)
 
 
-def fullmatch(fnrx: FnRegex, inp: str) -> FullMatchResult:
+def fullmatch(fnrx: FnRegex, inp: str, backend: Optional[str] = None,
+              pos: int = 0, endpos: Optional[int] = None,
+              mode: str = POSSESSIVE) -> FullMatchResult:
     """Fonction générale permettant de tester inp
     par rapport à le FnRegex fnrx passée en paramètre
 
@@ -233,10 +1317,134 @@ def fullmatch(fnrx: FnRegex, inp: str) -> FullMatchResult:
     controler un matching partiel, il faut utiliser
     la méthode match
 
+    Comme pour match, les inputs que l'analyse de fnrx exclut
+    (dont ceux de longueur hors des bornes de ses
+    correspondances) sont rejetés sans exécuter le matching.
+
     :param fnrx: FnRegex portant le test
-    :param inp: input à tester en fonction du FnRegex
+    :param inp: input à tester en fonction du FnRegex, str ou
+               input binaire (bytes, bytearray, memoryview)
+    :param backend: nom de la forme compilée à utiliser
+                   (voir fre.backends), None pour
+                   interpréter directement l'arbre
+    :param pos: position de départ du matching
+    :param endpos: position de fin de l'input, la fin de inp
+                  si None. La value du résultat est alors inp
+                  bornée par endpos (une memoryview pour un
+                  input binaire).
+    :param mode: POSSESSIVE, ou BACKTRACK pour revenir sur les
+                choix et les répétitions lorsque la suite de
+                l'expression échoue (voir fre.backtrack)
     :return: un nouveau FullMatchResult témoignant du
             résultat final
+    :raise UnsupportedPatternError: en mode BACKTRACK, si
+            l'automate de fnrx dépasse fre.nfa.MAX_STATES états
+    """
+
+    matcher, value = _matcher(fnrx, inp, backend, endpos, mode)
+
+    if _guard(fnrx).rejects(value, pos, True):
+        return FullMatchResult(_failed(matcher, value, pos))
+    elif matcher._groups:
+        return FullMatchResult(_captured(matcher, value, pos, value, True))
+    elif mode == BACKTRACK:
+        full = matcher._full(value, pos)
+    elif backend is not None and pos == 0:
+        full = matcher._full(value)
+    else:
+        full = matcher._at(value, pos) == len(value)
+
+    if full:
+        return FullMatchResult(MatchResult(value, len(value), True, pos))
+    else:
+        return FullMatchResult(MatchResult(value, pos, False, pos))
+
+
+def search(fnrx: FnRegex, inp: str, pos: int = 0,
+           endpos: Optional[int] = None) -> MatchResult:
+    """Fonction générale permettant de rechercher la première
+    correspondance de fnrx dans inp, à partir de pos
+
+    Seules les positions où une correspondance peut commencer
+    (d'après le préfixe littéral ou les premiers caractères
+    possibles de fnrx) sont vérifiées par le matching. La
+    recherche s'arrête dès que le reste de l'input est trop
+    court ou ne contient plus de littéral requis par fnrx.
+
+    :param fnrx: FnRegex portant le test
+    :param inp: input dans lequel chercher, str ou input
+               binaire (bytes, bytearray, memoryview)
+    :param pos: position à partir de laquelle chercher
+    :param endpos: position de fin de l'input, la fin de inp
+                  si None
+    :return: un nouveau MatchResult allant de start à index,
+            ou en échec si aucune correspondance n'est trouvée
+    """
+
+    for result in finditer(fnrx, inp, pos, endpos):
+        return result
+
+    return MatchResult(inp, 0, False)
+
+
+def finditer(fnrx: FnRegex, inp: str, pos: int = 0,
+             endpos: Optional[int] = None) -> Iterator[MatchResult]:
+    """Fonction générale permettant d'itérer sur les
+    correspondances successives et sans chevauchement de fnrx
+    dans inp
+
+    :param fnrx: FnRegex portant le test
+    :param inp: input dans lequel chercher, str ou input
+               binaire (bytes, bytearray, memoryview)
+    :param pos: position à partir de laquelle chercher
+    :param endpos: position de fin de l'input, la fin de inp
+                  si None
+    :return: un itérateur de MatchResult allant de start à index
+    """
+
+    # import local : fre.analysis dépend de ce module
+    from fre.analysis import Prefilter
+
+    rx, value = _matcher(fnrx, inp, None, endpos)
+    guard = _guard(fnrx)
+
+    if guard.absent(value, pos):
+        return
+
+    find = Prefilter(rx).finder(value)
+    pos = find(pos)
+
+    while pos >= 0:
+        if rx._groups:
+            result = _captured(rx, value, pos, inp)
+            end = result.index if result.match else FAIL
+        else:
+            end, result = rx._at(value, pos), None
+
+        if end == FAIL:
+            pos = find(pos + 1)
+        else:
+            yield result or MatchResult(inp, end, True, pos)
+
+            # toute correspondance suivante commence après end
+            if guard.absent(value, end):
+                return
+
+            pos = find(end if end > pos else end + 1)
+
+
+def findall(fnrx: FnRegex, inp: str, pos: int = 0,
+            endpos: Optional[int] = None) -> List[str]:
+    """Fonction générale retournant les sous-chaines de inp
+    correspondant à fnrx, sans chevauchement
+
+    :param fnrx: FnRegex portant le test
+    :param inp: input dans lequel chercher, str ou input
+               binaire (bytes, bytearray, memoryview)
+    :param pos: position à partir de laquelle chercher
+    :param endpos: position de fin de l'input, la fin de inp
+                  si None
+    :return: la liste des sous-chaines trouvées
     """
 
-    return FullMatchResult(match(fnrx, inp))
+    return [inp[m.start:m.index] for m in finditer(fnrx, inp, pos, endpos)]
@@ -0,0 +1,147 @@
+"""Le module interning met en place le hash-consing des noeuds
+de l'arbre des FnRegex : deux arbres de même structure sont
+ramenés à un seul et même arbre canonique.
+
+Les sous-arbres communs à plusieurs FnRegex sont ainsi partagés
+et l'égalité structurelle de deux arbres canoniques se réduit à
+leur identité. Les OperatorFnRegex internent leur arbre à la
+construction : reconstruire la même expression, par exemple à
+chaque requête d'un service, retourne le même arbre, et donc la
+même forme compilée dans le cache de fre.backends.
+
+La table des arbres canoniques ne conserve pas ses arbres en
+vie : un arbre qui n'est plus utilisé en est retiré.
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields, is_dataclass
+from threading import Lock
+from typing import Dict, Hashable, Optional
+from weakref import WeakValueDictionary
+
+from fre.fnregex import FnRegex, Node, Seq, Repeat, Choice, Group, \
+    children, node, rebuild
+
+_table: WeakValueDictionary = WeakValueDictionary()
+_lock = Lock()
+
+
+def _canonical(n: Node) -> bool:
+    return n.__dict__.get('_interned', False)
+
+
+def _key(n: Node) -> Optional[Hashable]:
+    """Clé d'un noeud dont les enfants sont canoniques : les
+    enfants y sont représentés par leur identité, ce qui évite
+    de parcourir l'arbre pour calculer la clé
+    """
+
+    if isinstance(n, (Seq, Choice)):
+        return type(n), tuple(map(id, n.items))
+    elif isinstance(n, Repeat):
+        return type(n), id(n.re), n.start, n.stop
+    elif isinstance(n, Group):
+        return type(n), id(n.re), n.name
+    elif is_dataclass(n):
+        key = (type(n),) + tuple(getattr(n, f.name) for f in fields(n))
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+    else:
+        return None
+
+
+def _share(n: Node) -> Node:
+    """Retourne le noeud canonique de même structure que n,
+    dont les enfants sont canoniques
+    """
+
+    key = _key(n)
+
+    if key is None:
+        # noeud non hashable, conservé tel quel
+        return n
+
+    shared = _table.get(key)
+
+    if shared is None:
+        object.__setattr__(n, '_interned', True)
+        _table[key] = shared = n
+
+    return shared
+
+
+def intern(fnrx: FnRegex) -> Node:
+    """Retourne l'arbre canonique de même structure que celui
+    de fnrx. Seuls les sous-arbres qui ne sont pas encore
+    canoniques sont parcourus, et seulement lors du premier
+    appel pour une même racine.
+
+    :param fnrx: FnRegex à interner
+    :return: la racine de l'arbre canonique
+    """
+
+    root = node(fnrx)
+
+    if _canonical(root):
+        return root
+
+    # l'arbre canonique d'une racine déjà internée est conservé
+    # sur celle-ci : les appels suivants ne le recalculent pas
+    shared = root.__dict__.get('_canon')
+
+    if shared is not None:
+        return shared
+
+    shared = _intern(root)
+
+    if shared is not root:
+        object.__setattr__(root, '_canon', shared)
+
+    return shared
+
+
+def _intern(root: Node) -> Node:
+    with _lock:
+        # cas courant des opérateurs : seule la racine est nouvelle
+        if all(map(_canonical, children(root))):
+            return _share(root)
+
+        canon: Dict[int, Node] = {}
+        stack = [root]
+
+        # parcours postfixe avec une pile explicite, l'arbre
+        # pouvant être très profond
+        while stack:
+            n = stack[-1]
+
+            if id(n) in canon:
+                stack.pop()
+            elif _canonical(n):
+                canon[id(n)] = n
+                stack.pop()
+            else:
+                pending = [c for c in children(n) if id(c) not in canon]
+
+                if pending:
+                    stack.extend(reversed(pending))
+                else:
+                    stack.pop()
+                    canon[id(n)] = _share(rebuild(
+                        n, [canon[id(c)] for c in children(n)]))
+
+        return canon[id(root)]
+
+
+def interned() -> int:
+    """Nombre d'arbres et de sous-arbres canoniques en vie
+
+    :return: la taille de la table des arbres canoniques
+    """
+
+    return len(_table)
@@ -0,0 +1,161 @@
+"""Le module lexer permet de découper un input en tokens à partir
+d'une liste ordonnée de règles (nom, FnRegex).
+
+Les règles sont réunies en un unique automate (voir
+fre.patternset) qui, à chaque position, calcule en un seul
+parcours la correspondance de toutes les règles. Le token retenu
+est le plus long, la première règle l'emportant en cas
+d'égalité. Les tokens sont produits à la demande sous forme de
+triplets (nom, début, fin) : l'input n'est jamais découpé en
+sous-chaines.
+
+Comme pour fre.stream, les règles doivent être déterministes :
+la correspondance d'une règle est alors la plus longue, et un
+flux peut être découpé morceau par morceau, un token à cheval
+sur deux morceaux étant terminé avec le morceau suivant.
+"""
+
+from __future__ import annotations
+
+import codecs
+from collections import namedtuple
+from typing import Iterable, Iterator, Optional, Tuple
+
+from fre.analysis import is_deterministic
+from fre.binary import BUFFERS
+from fre.fnregex import FnRegex, UnsupportedPatternError, FAIL, node
+from fre.patternset import PatternSet
+from fre.stream import CHUNK_SIZE, chunks
+
+Token = namedtuple('Token', ['name', 'start', 'end'])
+
+
+class LexError(ValueError):
+    """Levée lorsqu'aucune règle ne reconnait de token non vide
+    à une position de l'input
+    """
+
+    def __init__(self, pos: int):
+        super().__init__(f'no rule matches at position {pos}')
+        self.pos = pos
+
+
+class Lexer:
+    """Un Lexer découpe un input en tokens selon ses règles,
+    données par ordre de priorité. Les tokens des règles dont
+    le nom appartient à ignore (espaces, commentaires, ...) ne
+    sont pas produits.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, FnRegex]],
+                 ignore: Iterable[str] = ()):
+        self.rules = tuple((name, node(fnrx)) for name, fnrx in rules)
+        self.ignore = frozenset(ignore)
+
+        for name, fnrx in self.rules:
+            if not is_deterministic(fnrx):
+                raise UnsupportedPatternError(
+                    f'rule {name!r} is not deterministic')
+
+        self._names = [name for name, _ in self.rules]
+        self._set = PatternSet(fnrx for _, fnrx in self.rules)
+
+    def _token(self, value: str, pos: int,
+               endpos: Optional[int] = None) -> Tuple[int, int, bool]:
+        """Recherche le token commençant à pos
+
+        :return: le rang de la règle retenue (FAIL si aucune
+                règle ne reconnait de token non vide), la fin du
+                token et True si le parcours s'est arrêté avant
+                la fin de value, le token ne pouvant alors plus
+                s'étendre
+        """
+
+        rank, end, complete = self._set.longest(value, pos, endpos)
+
+        if rank is None or end == pos:
+            return FAIL, pos, complete
+
+        return rank, end, complete
+
+    def tokenize(self, inp: str, pos: int = 0,
+                 endpos: Optional[int] = None) -> Iterator[Token]:
+        """Découpe inp en tokens
+
+        :param inp: input à découper
+        :param pos: position du premier token
+        :param endpos: position de fin de l'input, la fin de inp
+                      si None
+        :return: un itérateur de Token (nom, début, fin)
+        :raise LexError: si aucune règle ne reconnait de token
+                à une position
+        """
+
+        size = len(inp) if endpos is None else min(endpos, len(inp))
+        names, ignore = self._names, self.ignore
+
+        while pos < size:
+            rank, end, _ = self._token(inp, pos, endpos)
+
+            if rank == FAIL:
+                raise LexError(pos)
+
+            if names[rank] not in ignore:
+                yield Token(names[rank], pos, end)
+
+            pos = end
+
+    def tokenize_stream(self, source, encoding: str = 'utf-8',
+                        chunk_size: int = CHUNK_SIZE) -> Iterator[Token]:
+        """Découpe un flux en tokens, sans le charger entièrement
+        en mémoire. Les positions sont comptées en caractères
+        depuis le début du flux.
+
+        :param source: flux à découper (voir fre.stream.chunks)
+        :param encoding: encodage des morceaux de type bytes
+        :param chunk_size: taille des morceaux lus
+        :return: un itérateur de Token (nom, début, fin)
+        :raise LexError: si aucune règle ne reconnait de token
+                à une position
+        """
+
+        names, ignore = self._names, self.ignore
+        decoder = None
+        # buffer contient les caractères du flux à partir de la
+        # position offset, pos est le début du prochain token
+        # dans buffer
+        buffer, offset, pos = '', 0, 0
+
+        def pending(final: bool) -> Iterator[Token]:
+            nonlocal pos
+
+            while pos < len(buffer):
+                rank, end, complete = self._token(buffer, pos)
+
+                if not complete and not final:
+                    # le token peut se poursuivre dans le morceau
+                    # suivant
+                    return
+                elif rank == FAIL:
+                    raise LexError(offset + pos)
+
+                if names[rank] not in ignore:
+                    yield Token(names[rank], offset + pos, offset + end)
+
+                pos = end
+
+        for chunk in chunks(source, chunk_size):
+            if isinstance(chunk, BUFFERS):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(encoding)()
+
+                chunk = decoder.decode(chunk)
+
+            buffer, offset, pos = buffer[pos:] + chunk, offset + pos, 0
+            yield from pending(False)
+
+        if decoder is not None:
+            buffer, offset, pos = buffer[pos:] + decoder.decode(b'', True), \
+                offset + pos, 0
+
+        yield from pending(True)
@@ -0,0 +1,230 @@
+"""Le module nfa construit, à partir de l'arbre d'une FnRegex,
+un automate fini non déterministe (construction de Thompson)
+dont les transitions portent sur des intervalles de code
+points.
+
+Cet automate sert de base à la compilation en DFA et au mode
+backtrack (voir fre.backtrack) : l'ordre des transitions vides
+d'un état y reflète la priorité des alternatives.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from sys import maxsize
+from typing import FrozenSet, Iterable, List, Tuple
+
+from fre.analysis import char_ranges
+from fre.fnregex import FnRegex, Seq, Repeat, Choice, Literal, Group, \
+    UnsupportedPatternError, node
+
+MAX_STATES = 100000
+
+Edge = Tuple[int, int, int]
+
+
+class NFA:
+    """Un NFA est un automate à un unique état initial et
+    un unique état final. Chaque état porte une liste de
+    transitions vides (eps) et une liste de transitions
+    (lo, hi, cible) sur un intervalle de code points.
+    """
+
+    def __init__(self):
+        self.eps: List[List[int]] = []
+        self.edges: List[List[Edge]] = []
+        self.start = 0
+        self.accept = 0
+
+    def state(self) -> int:
+        """Ajoute un nouvel état à l'automate
+
+        :return: l'identifiant du nouvel état
+        """
+
+        if len(self.eps) >= MAX_STATES:
+            raise UnsupportedPatternError('pattern too large for an automaton')
+
+        self.eps.append([])
+        self.edges.append([])
+        return len(self.eps) - 1
+
+    def closure(self, states: Iterable[int]) -> FrozenSet[int]:
+        """Calcule la fermeture par transitions vides
+        d'un ensemble d'états
+
+        :param states: les états de départ
+        :return: l'ensemble des états accessibles sans
+                consommer de caractère
+        """
+
+        eps = self.eps
+        seen = set(states)
+        todo = list(seen)
+
+        while todo:
+            for target in eps[todo.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    todo.append(target)
+
+        return frozenset(seen)
+
+    def step(self, states: Iterable[int], code: int) -> FrozenSet[int]:
+        """Calcule les états atteints depuis states en
+        consommant le caractère code
+
+        :param states: les états courants
+        :param code: le code point consommé
+        :return: la fermeture des états atteints
+        """
+
+        edges = self.edges
+        return self.closure([t for s in states for lo, hi, t in edges[s]
+                             if lo <= code <= hi])
+
+    def run(self, states: FrozenSet[int], value: str, pos: int,
+            last: int) -> int:
+        """Simule l'automate sur value à partir de pos et de
+        l'ensemble d'états courant, en retenant la fin de la
+        plus longue correspondance
+
+        :param states: ensemble d'états atteint à la position pos
+        :param value: input parcouru
+        :param pos: position courante dans value
+        :param last: fin de la plus longue correspondance déjà
+                    trouvée (-1 si aucune)
+        :return: la fin de la plus longue correspondance ou -1
+        """
+
+        for end, code in enumerate(map(ord, islice(value, pos, None)),
+                                   pos + 1):
+            states = self.step(states, code)
+
+            if not states:
+                break
+            elif self.accept in states:
+                last = end
+
+        return last
+
+
+class _Builder:
+    """Construit les fragments (entrée, sortie) de l'automate
+    pour chaque noeud de l'arbre
+    """
+
+    def __init__(self, nfa: NFA):
+        self.nfa = nfa
+
+    def build(self, n: FnRegex) -> Tuple[int, int]:
+        nfa = self.nfa
+        chars = char_ranges(n)
+
+        if chars is not None:
+            begin, end = nfa.state(), nfa.state()
+            nfa.edges[begin].extend((lo, hi, end) for lo, hi in chars)
+            return begin, end
+        elif isinstance(n, Literal):
+            begin = end = nfa.state()
+
+            for c in n.text:
+                state = nfa.state()
+                nfa.edges[end].append((ord(c), ord(c), state))
+                end = state
+
+            return begin, end
+        elif isinstance(n, Seq):
+            begin = end = nfa.state()
+
+            for item in n.items:
+                first, last = self.build(item)
+                nfa.eps[end].append(first)
+                end = last
+
+            return begin, end
+        elif isinstance(n, Choice):
+            begin, end = nfa.state(), nfa.state()
+
+            for item in n.items:
+                first, last = self.build(item)
+                nfa.eps[begin].append(first)
+                nfa.eps[last].append(end)
+
+            return begin, end
+        elif isinstance(n, Repeat):
+            return self.build_repeat(n)
+        elif isinstance(n, Group):
+            return self.build(n.re)
+        else:
+            raise UnsupportedPatternError(n)
+
+    def build_repeat(self, n: Repeat) -> Tuple[int, int]:
+        nfa = self.nfa
+        begin = end = nfa.state()
+
+        if n.start > n.stop:
+            return begin, nfa.state()
+
+        for _ in range(n.start):
+            first, last = self.build(n.re)
+            nfa.eps[end].append(first)
+            end = last
+
+        if n.stop >= maxsize:
+            first, last = self.build(n.re)
+            nfa.eps[end].append(first)
+            nfa.eps[last].append(end)
+        else:
+            exit_ = nfa.state()
+
+            # une itération supplémentaire est prioritaire sur la
+            # sortie (répétition gloutonne, voir fre.backtrack)
+            for _ in range(n.stop - n.start):
+                first, last = self.build(n.re)
+                nfa.eps[end].extend((first, exit_))
+                end = last
+
+            nfa.eps[end].append(exit_)
+            end = exit_
+
+        return begin, end
+
+
+def build(fnrx: FnRegex) -> NFA:
+    """Construit le NFA reconnaissant le même langage que fnrx
+
+    :param fnrx: FnRegex à traduire
+    :return: un nouveau NFA
+    """
+
+    nfa = NFA()
+    nfa.start, nfa.accept = _Builder(nfa).build(node(fnrx))
+    return nfa
+
+
+def build_union(fnrxs: Iterable[FnRegex]) \
+        -> Tuple[NFA, List[int], List[int]]:
+    """Construit le NFA reconnaissant l'union des langages des
+    fnrxs. Chaque FnRegex garde son propre état final : l'état
+    final du NFA, qui n'en a pas, vaut -1.
+
+    :param fnrxs: FnRegex à traduire
+    :return: le NFA, le rang de la FnRegex à laquelle appartient
+            chaque état (-1 pour l'état initial) et l'état final
+            de chaque FnRegex
+    """
+
+    nfa = NFA()
+    builder = _Builder(nfa)
+    nfa.start, nfa.accept = nfa.state(), -1
+    owners = [-1]
+    finals = []
+
+    for rank, fnrx in enumerate(fnrxs):
+        first, last = builder.build(node(fnrx))
+        nfa.eps[nfa.start].append(first)
+        owners.extend([rank] * (len(nfa.eps) - len(owners)))
+        finals.append(last)
+
+    return nfa, owners, finals
@@ -14,9 +14,25 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from sys import maxsize
+from typing import Optional
 
-from fre.fnregex import FnRegex, repeat, choice, charinterval, MatchResult, \
-    seq, char
+from fre.fnregex import FnRegex, Node, Group, repeat, choice, charinterval, \
+    MatchResult, seq, char, charset, node
+
+
+# fre.interning et fre.optimize (qui importe fre.analysis) ne
+# sont importés qu'à la construction de la première expression :
+# importer ce module reste peu coûteux
+def _intern(n: Node) -> Node:
+    from fre.interning import intern
+
+    return intern(n)
+
+
+def _simplify(fnrx: FnRegex) -> Node:
+    from fre.optimize import simplify
+
+    return simplify(fnrx)
 
 
 @dataclass(frozen=True)
@@ -33,6 +49,12 @@ class OperatorFnRegex(FnRegex):
 
     fnrx: FnRegex
 
+    def __post_init__(self):
+        # l'arbre est interné : construire deux fois la même
+        # expression retourne le même arbre (voir fre.interning)
+        if isinstance(self.fnrx, Node):
+            object.__setattr__(self, 'fnrx', _intern(self.fnrx))
+
     def __call__(self, mt: MatchResult) -> MatchResult:
         """Execute le matching de la FnRegex wrappée
 
@@ -43,16 +65,44 @@ class OperatorFnRegex(FnRegex):
 
         return self.fnrx(mt)
 
-        return OperatorFnRegex(charinterval(self.fnrx.char, other.fnrx.char))
+    def __sub__(self, other: OperatorFnRegex) -> OperatorFnRegex:
+        """Construit le CharSet différence de deux ensembles
+        de caractères
+
+        :param other: les caractères à retirer
+        :return: un nouveau CharSet
+        """
+
+        return OperatorFnRegex(charset(self).difference(other))
 
     def __or__(self, other: OperatorFnRegex) -> OperatorFnRegex:
-        """Construit un FnRegex de type Choice
+        """Construit un FnRegex de type Choice, ou un CharSet
+        si les deux choix ne consomment qu'un caractère
 
         :param other: l'autre choix
-        :return: un nouveau Choice
+        :return: un nouveau Choice ou CharSet
+        """
+
+        return _choice(self, other)
+
+    def __and__(self, other: OperatorFnRegex) -> OperatorFnRegex:
+        """Construit le CharSet intersection de deux ensembles
+        de caractères
+
+        :param other: l'autre ensemble
+        :return: un nouveau CharSet
+        """
+
+        return OperatorFnRegex(charset(self).intersection(other))
+
+    def __invert__(self) -> OperatorFnRegex:
+        """Construit le CharSet complémentaire d'un ensemble
+        de caractères
+
+        :return: un nouveau CharSet
         """
 
-        return OperatorFnRegex(choice(self.fnrx, other.fnrx))
+        return OperatorFnRegex(charset(self).negate())
 
     def __getitem__(self, sl: slice):
         """Construit un FnRegex de type Repeat
@@ -64,7 +114,7 @@ class OperatorFnRegex(FnRegex):
         if isinstance(sl, slice):
             start = sl.start or 0
             stop = sl.stop or maxsize
-            return OperatorFnRegex(repeat(self.fnrx, start, stop))
+            return OperatorFnRegex(_simplify(repeat(self, start, stop)))
         else:
             raise AttributeError('Only slice with two integers '
                                  'is implemented : \n'
@@ -79,18 +129,71 @@ class OperatorFnRegex(FnRegex):
         :return: une nouvelle Sequence
         """
 
-        return OperatorFnRegex(seq(self.fnrx, other.fnrx))
+        return OperatorFnRegex(_simplify(seq(self, other)))
+
+
+def _choice(left: FnRegex, right: FnRegex) -> OperatorFnRegex:
+    """Construit le choix entre left et right, sous forme de
+    CharSet lorsque les deux ne consomment qu'un caractère
+    """
+
+    return OperatorFnRegex(_simplify(choice(left, right)))
 
 
 def op(fnrx: FnRegex) -> OperatorFnRegex:
     """Construit un OperatorFnRegex à partir
-    d'un FnRegex
+    d'un FnRegex, dont l'arbre est au préalable optimisé
+    (voir fre.optimize)
 
     :param fnrx: à wrapper dans un OperatorFnRegex
     :return: un nouveau OperatorFnRegex
     """
 
-    return OperatorFnRegex(fnrx)
+    from fre.optimize import optimize
+
+    return OperatorFnRegex(optimize(fnrx))
+
+
+def group(fnrx: FnRegex, name: Optional[str] = None) -> OperatorFnRegex:
+    """Construit un groupe de capture autour de fnrx (voir
+    fre.fnregex.group)
+
+    :param fnrx: FnRegex dont la correspondance est capturée
+    :param name: nom éventuel du groupe
+    :return: un nouveau OperatorFnRegex
+    """
+
+    return OperatorFnRegex(Group(node(fnrx), name))
+
+
+def category(name: str) -> OperatorFnRegex:
+    """Construit la classe des caractères d'une catégorie
+    générale Unicode, L pour toutes les lettres, Nd pour les
+    chiffres décimaux, ... (voir fre.unicode)
+
+    :param name: nom de la catégorie
+    :return: un nouveau OperatorFnRegex
+    :raise ValueError: si la catégorie n'existe pas
+    """
+
+    # import local : importer le module ne charge aucune table
+    from fre import unicode
+
+    return OperatorFnRegex(unicode.category(name))
+
+
+def script(name: str) -> OperatorFnRegex:
+    """Construit la classe des caractères propres à une
+    écriture : Latin, Greek, Han, ... (voir fre.unicode)
+
+    :param name: nom de l'écriture
+    :return: un nouveau OperatorFnRegex
+    :raise ValueError: si l'écriture n'est pas connue
+    """
+
+    from fre import unicode
+
+    return OperatorFnRegex(unicode.script(name))
 
 
 @dataclass(frozen=True)
@@ -100,16 +203,23 @@ class CharOperatorFnRegex:
     c: chr
     fnrx: FnRegex
 
+    def __post_init__(self):
+        object.__setattr__(self, 'fnrx', _intern(self.fnrx))
+
     def __sub__(self, other: CharOperatorFnRegex) -> OperatorFnRegex:
         """Opérateur permettant de construire un
         CharInterval à partir de deux Char, le courant
-        et l'other
+        et l'other. Si other est un ensemble de caractères,
+        construit le CharSet différence.
 
         :param other: opérande de droite de l'opérateur
-        :return: un nouveau CharInterval
+        :return: un nouveau CharInterval ou CharSet
         """
 
-        return OperatorFnRegex(charinterval(self.c, other.c))
+        if isinstance(other, CharOperatorFnRegex):
+            return OperatorFnRegex(charinterval(self.c, other.c))
+        else:
+            return OperatorFnRegex(charset(self).difference(other))
 
     def __call__(self, mt: MatchResult) -> MatchResult:
         """Execute le matching de la FnRegex wrappée
@@ -119,16 +229,36 @@ class CharOperatorFnRegex:
         :return: le résultat de l'appel ```fnrx.match(m)```
         """
 
-        return char(self.c)(mt)
+        return self.fnrx(mt)
 
     def __or__(self, other: OperatorFnRegex) -> OperatorFnRegex:
-        """Construit un FnRegex de type Choice
+        """Construit un FnRegex de type Choice, ou un CharSet
+        si les deux choix ne consomment qu'un caractère
 
         :param other: l'autre choix
-        :return: un nouveau Choice
+        :return: un nouveau Choice ou CharSet
+        """
+
+        return _choice(self, other)
+
+    def __and__(self, other: OperatorFnRegex) -> OperatorFnRegex:
+        """Construit le CharSet intersection de deux ensembles
+        de caractères
+
+        :param other: l'autre ensemble
+        :return: un nouveau CharSet
+        """
+
+        return OperatorFnRegex(charset(self).intersection(other))
+
+    def __invert__(self) -> OperatorFnRegex:
+        """Construit le CharSet complémentaire d'un ensemble
+        de caractères
+
+        :return: un nouveau CharSet
         """
 
-        return OperatorFnRegex(choice(self.fnrx, other.fnrx))
+        return OperatorFnRegex(charset(self).negate())
 
     def __getitem__(self, sl: slice):
         """Construit un FnRegex de type Repeat
@@ -140,7 +270,7 @@ class CharOperatorFnRegex:
         if isinstance(sl, slice):
             start = sl.start or 0
             stop = sl.stop or maxsize
-            return OperatorFnRegex(repeat(self.fnrx, start, stop))
+            return OperatorFnRegex(_simplify(repeat(self, start, stop)))
         else:
             raise AttributeError('Only slice with two integers '
                                  'is implemented : \n'
@@ -155,7 +285,7 @@ class CharOperatorFnRegex:
         :return: une nouvelle Sequence
         """
 
-        return OperatorFnRegex(seq(self.fnrx, other.fnrx))
+        return OperatorFnRegex(_simplify(seq(self, other)))
 
 
 def charop(__c: chr):
@@ -167,89 +297,43 @@ def charop(__c: chr):
     return CharOperatorFnRegex(__c, char(__c))
 
 
-# lowers
-a = charop('a')
-b = charop('b')
-c = charop('c')
-d = charop('d')
-e = charop('e')
-f = charop('f')
-g = charop('g')
-h = charop('h')
-i = charop('i')
-j = charop('j')
-k = charop('k')
-l = charop('l')
-m = charop('m')
-n = charop('n')
-o = charop('o')
-p = charop('p')
-q = charop('q')
-r = charop('r')
-s = charop('s')
-t = charop('t')
-u = charop('u')
-v = charop('v')
-w = charop('w')
-x = charop('x')
-y = charop('y')
-z = charop('z')
-
-# uppers
-A = charop('A')
-B = charop('B')
-C = charop('C')
-D = charop('D')
-E = charop('E')
-F = charop('F')
-G = charop('G')
-H = charop('H')
-I = charop('I')
-J = charop('J')
-K = charop('K')
-L = charop('L')
-M = charop('M')
-N = charop('N')
-O = charop('O')
-P = charop('P')
-Q = charop('Q')
-R = charop('R')
-S = charop('S')
-T = charop('T')
-U = charop('U')
-V = charop('V')
-W = charop('W')
-X = charop('X')
-Y = charop('Y')
-Z = charop('Z')
-
-# digits
-_0 = charop('0')
-_1 = charop('1')
-_2 = charop('2')
-_3 = charop('3')
-_4 = charop('4')
-_5 = charop('5')
-_6 = charop('6')
-_7 = charop('7')
-_8 = charop('8')
-_9 = charop('9')
-
-# intevals
-lower = a - z
-upper = A - Z
-digit = _0 - _9
-
-# ascii
-__ = charop('_')
-dquote = charop('"')
-squote = charop('\'')
-_and = charop('&')
-_pipe = charop('|')
-eq = charop('=')
-colon = charop(':')
-scolon = charop(';')
-comma = charop(',')
-minus = charop('-')
-dot = charop('.')
-at = charop('@')
+# caractères prédéfinis, construits à leur premier accès (voir
+# __getattr__) : importer le module ne construit aucune FnRegex
+_LOWERS = 'abcdefghijklmnopqrstuvwxyz'
+_CHARS = dict({c: c for c in _LOWERS + _LOWERS.upper()},
+              **{'_' + c: c for c in '0123456789'},
+              __='_', dquote='"', squote='\'', _and='&', _pipe='|', eq='=',
+              colon=':', scolon=';', comma=',', minus='-', dot='.', at='@')
+
+# intervalles prédéfinis
+_INTERVALS = {'lower': ('a', 'z'), 'upper': ('A', 'Z'), 'digit': ('0', '9')}
+
+# les caractères et intervalles prédéfinis n'étant pas dans les
+# globales du module, __all__ les liste pour import *
+__all__ = ['OperatorFnRegex', 'CharOperatorFnRegex', 'op', 'group',
+           'category', 'script', 'charop', *_CHARS, *_INTERVALS]
+
+
+def __getattr__(name: str):
+    """Construit un caractère ou un intervalle prédéfini lors de
+    son premier accès, puis le conserve dans le module
+
+    :param name: nom du caractère ou de l'intervalle
+    :return: un CharOperatorFnRegex ou un OperatorFnRegex
+    :raise AttributeError: si name n'est pas prédéfini
+    """
+
+    if name in _CHARS:
+        value = charop(_CHARS[name])
+    elif name in _INTERVALS:
+        first, last = _INTERVALS[name]
+        value = OperatorFnRegex(charinterval(first, last))
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_CHARS) | set(_INTERVALS))
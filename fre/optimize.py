@@ -0,0 +1,243 @@
+"""Le module optimize réécrit l'arbre d'une FnRegex en un arbre
+équivalent (mêmes résultats de matching) mais plus rapide à
+exécuter :
+
+- les Sequence et les Choice imbriqués sont aplatis,
+- les suites de Char deviennent des Literal testés avec
+  str.startswith,
+- les choix adjacents d'un seul caractère sont fusionnés en
+  un CharSet,
+- les préfixes communs de choix adjacents sont factorisés,
+- les répétitions triviales ou imbriquées sont simplifiées.
+
+Toutes ces réécritures respectent la sémantique des FnRegex
+(choix ordonné, répétitions gloutonnes sans retour arrière)
+comme celle du mode backtrack (voir fre.backtrack), et
+conservent les groupes de capture, dont les numéros dépendent de
+leurs occurrences dans l'arbre.
+"""
+
+from __future__ import annotations
+
+from sys import maxsize
+from typing import Callable, Dict, List, Optional
+
+from fre.analysis import nullable
+from fre.fnregex import FnRegex, Node, Seq, Repeat, Choice, Char, Literal, \
+    Group, UnsupportedPatternError, _Single, charset, children, node, \
+    rebuild
+
+EPSILON = Seq(())
+
+
+def _always(n: Node) -> bool:
+    """Indique si n réussit toujours, ce qui est le cas des
+    noeuds pouvant matcher vide
+    """
+
+    try:
+        return nullable(n)
+    except UnsupportedPatternError:
+        return False
+
+
+def _one_way(n: Node) -> bool:
+    """Indique si n ne peut matcher que d'une seule façon (un
+    caractère), le retour arrière ne pouvant alors revenir sur
+    sa correspondance
+    """
+
+    return isinstance(n, _Single)
+
+
+def _text(n: Node) -> Optional[str]:
+    if isinstance(n, Char):
+        return n.c
+    elif isinstance(n, Literal):
+        return n.text
+    else:
+        return None
+
+
+def _atoms(n: Node) -> List[Node]:
+    """Décompose n en la suite de noeuds qui la composent,
+    les Literal étant découpés caractère par caractère
+    """
+
+    if isinstance(n, Seq):
+        return [atom for item in n.items for atom in _atoms(item)]
+    elif isinstance(n, Literal):
+        return [Char(c) for c in n.text]
+    else:
+        return [n]
+
+
+def _seq(items: List[Node]) -> Node:
+    flat: List[Node] = []
+
+    for item in items:
+        flat.extend(item.items if isinstance(item, Seq) else (item,))
+
+    merged: List[Node] = []
+
+    for item in flat:
+        text = _text(item)
+
+        if text == '':
+            continue
+        elif text is not None and merged and _text(merged[-1]) is not None:
+            merged[-1] = Literal(_text(merged[-1]) + text)
+        else:
+            merged.append(item)
+
+    return merged[0] if len(merged) == 1 else Seq(tuple(merged))
+
+
+def _choice(items: List[Node]) -> Node:
+    flat: List[Node] = []
+
+    for item in items:
+        flat.extend(item.items if isinstance(item, Choice) else (item,))
+
+    # les branches qui suivent une branche pouvant matcher vide
+    # ne sont jamais essayées en mode possessif, mais le sont en
+    # mode backtrack : elles sont conservées
+    merged: List[Node] = []
+
+    for item in flat:
+        if isinstance(item, _Single) and merged and \
+                isinstance(merged[-1], _Single):
+            merged[-1] = charset(merged[-1], item)
+        else:
+            merged.append(item)
+
+    factored: List[Node] = []
+    i = 0
+
+    while i < len(merged):
+        atoms = _atoms(merged[i])
+        j = i + 1
+
+        while j < len(merged) and atoms and _one_way(atoms[0]) and \
+                _atoms(merged[j])[:1] == atoms[:1]:
+            j += 1
+
+        # str.startswith sur chaque branche est plus rapide
+        # qu'un arbre factorisé lorsque les branches sont des
+        # chaines littérales
+        if j - i > 1 and any(_text(item) is None for item in merged[i:j]):
+            factored.append(_factor([_atoms(item) for item in merged[i:j]]))
+        else:
+            factored.extend(merged[i:j])
+
+        i = j
+
+    return factored[0] if len(factored) == 1 else Choice(tuple(factored))
+
+
+def _factor(branches: List[List[Node]]) -> Node:
+    """Factorise le plus long préfixe commun à des branches
+    consécutives d'un Choice : choice(x >> a, x >> b) est
+    équivalent à x >> choice(a, b) car x ne dépend que de sa
+    position de départ. En mode backtrack, cette équivalence
+    n'est vraie que si x ne peut matcher que d'une seule façon
+    (voir _one_way).
+    """
+
+    size = 0
+
+    while all(size < len(atoms) for atoms in branches) and \
+            _one_way(branches[0][size]) and \
+            all(atoms[size] == branches[0][size] for atoms in branches):
+        size += 1
+
+    rests = [_seq(atoms[size:]) if atoms[size:] else EPSILON
+             for atoms in branches]
+    return _seq(branches[0][:size] + [_choice(rests)])
+
+
+def _repeat(n: Repeat) -> Node:
+    re, start, stop = n.re, n.start, n.stop
+
+    if start == stop == 1:
+        return re
+    elif start == stop == 0 and not re._groups:
+        return EPSILON
+    elif isinstance(re, Repeat) and re.stop >= maxsize and \
+            0 < stop and start <= stop and not _always(re.re):
+        # la répétition interne consomme toutes les occurrences
+        # possibles : une seconde itération externe matche vide
+        # (re.start == 0) ou échoue
+        if re.start == 0:
+            return Repeat(re.re, 0, maxsize)
+        elif start == 1:
+            return re
+        elif start == 0 and re.start == 1:
+            return Repeat(re.re, 0, maxsize)
+
+    return n
+
+
+def simplify(fnrx: FnRegex) -> Node:
+    """Simplifie le noeud racine de fnrx en supposant que ses
+    enfants sont déjà optimisés. C'est la passe appliquée par
+    les opérateurs de fre.opregex à chaque construction.
+
+    :param fnrx: FnRegex à simplifier
+    :return: un Node équivalent
+    """
+
+    n = node(fnrx)
+
+    if isinstance(n, Seq):
+        return _seq(list(n.items))
+    elif isinstance(n, Choice):
+        return _choice(list(n.items))
+    elif isinstance(n, Repeat):
+        return _repeat(n)
+    else:
+        return n
+
+
+def rewrite(fnrx: FnRegex, fn: Callable[[Node], Node]) -> Node:
+    """Reconstruit l'arbre de fnrx des feuilles vers la racine
+    en appliquant fn à chaque noeud, dont les enfants ont déjà
+    été réécrits
+
+    :param fnrx: FnRegex à réécrire
+    :param fn: réécriture d'un noeud
+    :return: la racine du nouvel arbre
+    """
+
+    root = node(fnrx)
+    done: Dict[int, Node] = {}
+    stack = [root]
+
+    # parcours postfixe avec une pile explicite, l'arbre
+    # pouvant être très profond
+    while stack:
+        n = stack[-1]
+        items = children(n)
+        pending = [c for c in items if id(c) not in done]
+
+        if pending:
+            stack.extend(pending)
+            continue
+
+        stack.pop()
+
+        if id(n) not in done:
+            done[id(n)] = fn(rebuild(n, [done[id(c)] for c in items]))
+
+    return done[id(root)]
+
+
+def optimize(fnrx: FnRegex) -> Node:
+    """Optimise l'ensemble de l'arbre de fnrx, des feuilles
+    vers la racine
+
+    :param fnrx: FnRegex à optimiser
+    :return: un Node équivalent
+    """
+
+    return rewrite(fnrx, simplify)
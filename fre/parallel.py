@@ -0,0 +1,180 @@
+"""Le module parallel répartit le matching d'un grand nombre
+d'inputs (les lignes d'un fichier par exemple) sur plusieurs
+processus afin d'utiliser tous les coeurs disponibles.
+
+Les inputs sont découpés en gros morceaux de chunk_size inputs,
+chaque morceau étant testé par un processus du pool avec
+match_many ou fullmatch_many (voir fre.batch). La FnRegex n'est
+transmise qu'une fois à chaque processus, sérialisée dans le
+format de fre.wire, et les résultats sont retournés dans l'ordre
+des inputs. Seuls quelques morceaux sont en attente à un instant
+donné : les inputs sont lus au fur et à mesure de leur
+traitement.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from fre.batch import match_many, fullmatch_many
+from fre.fnregex import FnRegex, node
+
+CHUNK_SIZE = 1 << 14
+# nombre de morceaux en attente par processus
+PENDING = 2
+
+_pattern = None
+
+
+def lines(path: str, encoding: Optional[str] = 'utf-8') -> Iterator:
+    """Lit les lignes d'un fichier, sans leur fin de ligne
+
+    :param path: chemin du fichier
+    :param encoding: encodage du fichier, les lignes sont des
+                    bytes si None
+    :return: un itérateur sur les lignes
+    """
+
+    if encoding is None:
+        with open(path, 'rb') as f:
+            for line in f:
+                yield line.rstrip(b'\r\n')
+    else:
+        with open(path, encoding=encoding) as f:
+            for line in f:
+                yield line.rstrip('\n')
+
+
+def chunks(corpus: Iterable, chunk_size: int) -> Iterator[list]:
+    """Découpe les inputs en morceaux, lus au fur et à mesure
+
+    :param corpus: inputs à découper
+    :param chunk_size: nombre d'inputs de chaque morceau (le
+                      dernier pouvant être plus petit)
+    :return: un itérateur sur les morceaux
+    """
+
+    it = iter(corpus)
+    batch = list(islice(it, chunk_size))
+
+    while batch:
+        yield batch
+        batch = list(islice(it, chunk_size))
+
+
+def run_batch(pattern: FnRegex, batch: list, full: bool, count: bool):
+    """Teste un morceau d'inputs avec match_many ou
+    fullmatch_many
+
+    :param pattern: FnRegex à tester
+    :param batch: inputs du morceau
+    :param full: teste avec fullmatch_many si True
+    :param count: compte les inputs qui matchent si True
+    :return: le nombre d'inputs qui matchent si count, la liste
+            de leurs résultats sinon
+    """
+
+    results = (fullmatch_many if full else match_many)(pattern, batch)
+
+    if count:
+        return int(sum(results))
+
+    return results if isinstance(results, list) else results.tolist()
+
+
+def _init(pattern: FnRegex):
+    global _pattern
+    _pattern = pattern
+
+
+def _task(batch: list, full: bool, count: bool):
+    return run_batch(_pattern, batch, full, count)
+
+
+def ordered(executor: Executor, workers: int, fn: Callable,
+            batches: Iterator[list], *args) -> Iterator:
+    """Soumet fn(batch, *args) au pool pour chaque morceau et
+    retourne les résultats dans l'ordre des morceaux, au plus
+    workers * PENDING morceaux étant en attente
+
+    :param executor: pool de processus ou de threads
+    :param workers: nombre de workers du pool
+    :param fn: traitement d'un morceau
+    :param batches: morceaux à traiter
+    :return: un itérateur sur les résultats des morceaux
+    """
+
+    pending = deque()
+
+    for batch in batches:
+        pending.append(executor.submit(fn, batch, *args))
+
+        if len(pending) >= workers * PENDING:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _map(fnrx: FnRegex, corpus: Iterable, full: bool, count: bool,
+         processes: Optional[int], chunk_size: int) -> Iterator:
+    """Calcule dans l'ordre le résultat de chaque morceau"""
+
+    pattern = node(fnrx)
+    batches = chunks(corpus, chunk_size)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes <= 1:
+        for batch in batches:
+            yield run_batch(pattern, batch, full, count)
+
+        return
+
+    with ProcessPoolExecutor(processes, initializer=_init,
+                             initargs=(pattern,)) as executor:
+        yield from ordered(executor, processes, _task, batches, full, count)
+
+
+def match_all(fnrx: FnRegex, corpus: Iterable, full: bool = False,
+              processes: Optional[int] = None,
+              chunk_size: int = CHUNK_SIZE) -> List[bool]:
+    """Equivalent de match (fullmatch si full) sur chacun des
+    inputs du corpus, réparti sur plusieurs processus
+
+    :param fnrx: FnRegex portant le test, sérialisable par
+                pickle (voir fre.wire)
+    :param corpus: itérable de str ou de bytes (voir lines)
+    :param full: si True, les inputs doivent correspondre
+                entièrement à fnrx
+    :param processes: nombre de processus, le nombre de coeurs
+                     si None. Le matching a lieu dans le
+                     processus courant si processes vaut 1
+    :param chunk_size: nombre d'inputs par morceau
+    :return: la liste des résultats, dans l'ordre du corpus
+    """
+
+    results = []
+
+    for chunk in _map(fnrx, corpus, full, False, processes, chunk_size):
+        results.extend(chunk)
+
+    return results
+
+
+def count_matches(fnrx: FnRegex, corpus: Iterable, full: bool = False,
+                  processes: Optional[int] = None,
+                  chunk_size: int = CHUNK_SIZE) -> int:
+    """Compte les inputs du corpus correspondant à fnrx, seuls
+    les décomptes de chaque morceau étant transmis par les
+    processus (voir match_all)
+
+    :return: le nombre d'inputs correspondant à fnrx
+    """
+
+    return sum(_map(fnrx, corpus, full, True, processes, chunk_size))
@@ -0,0 +1,285 @@
+"""Le module patternset permet de tester un input contre un
+ensemble de FnRegex en un seul parcours.
+
+Un PatternSet réunit les FnRegex déterministes (voir
+fre.analysis) en un unique automate dont chaque état connait
+les FnRegex qui y acceptent. L'automate est déterminisé à la
+demande, comme un LazyDFA (voir fre.dfa) : un parcours coûte un
+accès à la table de transitions par caractère, quel que soit le
+nombre de FnRegex de l'ensemble. Pour une FnRegex déterministe,
+l'automate donne exactement le résultat de match et fullmatch.
+
+Les autres FnRegex de l'ensemble (non déterministes ou
+opaques) sont testées une à une par match et fullmatch.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from sys import maxsize
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from fre.analysis import is_deterministic
+from fre.dfa import Alphabet, transitions_by_class
+from fre.fnregex import FnRegex, match, fullmatch, node
+from fre.nfa import build_union
+
+DEFAULT_CACHE_SIZE = 10000
+
+
+class _State:
+    """Etat de l'automate d'un PatternSet : un ensemble d'états
+    du NFA, les FnRegex qui y acceptent (par rang croissant), le
+    plus petit rang des FnRegex pouvant encore y progresser et
+    les transitions déjà calculées
+    """
+
+    __slots__ = ('states', 'accepts', 'low', 'next')
+
+    def __init__(self, states: FrozenSet[int], accepts: Tuple[int, ...],
+                 low: int, ncls: int):
+        self.states = states
+        self.accepts = accepts
+        self.low = low
+        self.next: List[Optional[_State]] = [None] * ncls
+
+
+_DEAD = _State(frozenset(), (), maxsize, 0)
+
+
+def _size(value: str, endpos: Optional[int]) -> int:
+    return len(value) if endpos is None else min(endpos, len(value))
+
+
+class PatternSet:
+    """Un PatternSet teste un input contre plusieurs FnRegex à
+    la fois. Les FnRegex sont désignées par leur rang dans
+    l'ensemble, qui est aussi leur ordre de priorité.
+
+    Les états de l'automate sont conservés dans un cache de
+    cache_size états, vidé lorsqu'il est plein.
+    """
+
+    def __init__(self, patterns: Iterable[FnRegex],
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.patterns = tuple(node(p) for p in patterns)
+        self.cache_size = max(cache_size, 1)
+        self.flushes = 0
+        # rangs des FnRegex de l'automate et des autres
+        self._ranks = [i for i, p in enumerate(self.patterns)
+                       if is_deterministic(p)]
+        self._others = [i for i, p in enumerate(self.patterns)
+                        if not is_deterministic(p)]
+        nfa, owners, finals = build_union(self.patterns[i]
+                                          for i in self._ranks)
+        self.nfa = nfa
+        self.alphabet = Alphabet(nfa)
+        self._owners = [self._ranks[o] if o >= 0 else maxsize
+                        for o in owners]
+        self._finals = {state: self._ranks[o]
+                        for o, state in enumerate(finals)}
+        self._moves = transitions_by_class(nfa, self.alphabet)
+        self._cache: Dict[FrozenSet[int], _State] = {}
+        self._start = nfa.closure((nfa.start,))
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    @property
+    def states(self) -> int:
+        """Nombre d'états actuellement présents dans le cache"""
+
+        return len(self._cache)
+
+    def _state(self, states: FrozenSet[int]) -> _State:
+        state = self._cache.get(states)
+
+        if state is None:
+            if len(self._cache) >= self.cache_size:
+                self._cache = {}
+                self.flushes += 1
+
+            finals, owners = self._finals, self._owners
+            state = _State(states,
+                           tuple(sorted(finals[s] for s in states
+                                        if s in finals)),
+                           min((owners[s] for s in states), default=maxsize),
+                           self.alphabet.size)
+            self._cache[states] = state
+
+        return state
+
+    def _transition(self, state: _State, cls: int) -> _State:
+        moves = self._moves
+        targets = [t for s in state.states for t in moves[s].get(cls, ())]
+        target = self._state(self.nfa.closure(targets)) if targets else _DEAD
+        state.next[cls] = target
+        return target
+
+    def _run(self, value: str, pos: int, endpos: Optional[int],
+             first: bool) -> Tuple[Dict[int, int], _State, int]:
+        """Parcourt value depuis pos avec l'automate. Si first
+        est vrai, le parcours s'arrête dès que plus aucune
+        FnRegex de rang inférieur à celui des FnRegex déjà
+        acceptées ne peut progresser.
+
+        :return: la fin de la plus longue correspondance de
+                chaque FnRegex acceptée, l'état atteint et la
+                position atteinte
+        """
+
+        state = self._state(self._start)
+        alphabet = self.alphabet
+        lookup, limit, classof = alphabet.lookup, alphabet.limit, \
+            alphabet.classof
+        ends = dict.fromkeys(state.accepts, pos)
+        end = pos
+        bound = state.accepts[0] if first and state.accepts else maxsize
+
+        for end, code in enumerate(map(ord, islice(value, pos, endpos)),
+                                   pos + 1):
+            if state.low >= bound:
+                return ends, state, end - 1
+
+            cls = lookup[code] if code < limit else classof(code)
+            target = state.next[cls] or self._transition(state, cls)
+
+            if target is _DEAD:
+                return ends, _DEAD, end
+
+            state = target
+
+            for rank in state.accepts:
+                ends[rank] = end
+
+            if first and state.accepts:
+                bound = min(bound, state.accepts[0])
+
+        return ends, state, end
+
+    def ends(self, inp: str, pos: int = 0,
+             endpos: Optional[int] = None) -> Dict[int, int]:
+        """Equivalent de match pour chaque FnRegex de l'ensemble
+
+        :param inp: input à tester
+        :param pos: position de départ du matching
+        :param endpos: position de fin de l'input, la fin de inp
+                      si None
+        :return: pour chaque FnRegex qui correspond, par rang
+                croissant, la fin de sa correspondance
+        """
+
+        ends, _ = self._ends(inp, pos, endpos)
+        return dict(sorted(ends.items()))
+
+    def _ends(self, inp: str, pos: int, endpos: Optional[int]) \
+            -> Tuple[Dict[int, int], _State]:
+        ends, state, _ = self._run(inp, pos, endpos, False)
+
+        for rank in self._others:
+            result = match(self.patterns[rank], inp, pos=pos, endpos=endpos)
+
+            if result.matched():
+                ends[rank] = result.index
+
+        return ends, state
+
+    def longest(self, inp: str, pos: int = 0, endpos: Optional[int] = None) \
+            -> Tuple[Optional[int], int, bool]:
+        """Recherche la plus longue correspondance parmi celles
+        des FnRegex de l'ensemble, la FnRegex de plus petit rang
+        l'emportant en cas d'égalité
+
+        :param inp: input à tester
+        :param pos: position de départ du matching
+        :param endpos: position de fin de l'input, la fin de inp
+                      si None
+        :return: le rang de la FnRegex retenue (None si aucune ne
+                correspond), la fin de sa correspondance et True
+                si le parcours s'est arrêté avant endpos, aucune
+                correspondance ne pouvant alors plus s'étendre
+                au delà
+        """
+
+        ends, state = self._ends(inp, pos, endpos)
+        rank = min(ends, key=lambda r: (-ends[r], r), default=None)
+        return rank, pos if rank is None else ends[rank], state is _DEAD
+
+    def matches(self, inp: str, pos: int = 0, endpos: Optional[int] = None,
+                full: bool = False) -> List[int]:
+        """Recherche les FnRegex de l'ensemble qui correspondent
+        à inp, en un seul parcours de inp
+
+        :param inp: input à tester
+        :param pos: position de départ du matching
+        :param endpos: position de fin de l'input, la fin de inp
+                      si None
+        :param full: exige la correspondance de l'input entier,
+                    comme fullmatch
+        :return: les rangs des FnRegex qui correspondent, par
+                ordre croissant
+        """
+
+        if not full:
+            return list(self.ends(inp, pos, endpos))
+
+        _, state, end = self._run(inp, pos, endpos, False)
+        found = list(state.accepts) \
+            if end == _size(inp, endpos) else []
+
+        for rank in self._others:
+            if fullmatch(self.patterns[rank], inp, pos=pos,
+                         endpos=endpos).matched():
+                found.append(rank)
+
+        return sorted(found)
+
+    def first(self, inp: str, pos: int = 0, endpos: Optional[int] = None,
+              full: bool = False) -> Optional[int]:
+        """Recherche la FnRegex de plus petit rang qui correspond
+        à inp. Le parcours s'arrête dès que plus aucune FnRegex
+        de rang inférieur ne peut correspondre.
+
+        :param inp: input à tester
+        :param pos: position de départ du matching
+        :param endpos: position de fin de l'input, la fin de inp
+                      si None
+        :param full: exige la correspondance de l'input entier,
+                    comme fullmatch
+        :return: le rang de la FnRegex, ou None si aucune ne
+                correspond
+        """
+
+        ends, state, end = self._run(inp, pos, endpos, not full)
+
+        if full:
+            accepts = state.accepts if end == _size(inp, endpos) else ()
+            found = accepts[0] if accepts else maxsize
+        else:
+            found = min(ends, default=maxsize)
+
+        test = fullmatch if full else match
+
+        for rank in self._others:
+            if rank > found:
+                break
+            elif test(self.patterns[rank], inp, pos=pos,
+                      endpos=endpos).matched():
+                found = rank
+                break
+
+        return None if found == maxsize else found
+
+
+def compile(patterns: Iterable[FnRegex],
+            cache_size: int = DEFAULT_CACHE_SIZE) -> PatternSet:
+    """Construit le PatternSet des patterns
+
+    :param patterns: FnRegex de l'ensemble, par ordre de priorité
+    :param cache_size: nombre maximum d'états conservés
+    :return: un nouveau PatternSet
+    :raise UnsupportedPatternError: si l'automate de l'ensemble
+            dépasse le nombre maximal d'états (voir fre.nfa)
+    """
+
+    return PatternSet(patterns, cache_size)
@@ -0,0 +1,235 @@
+"""Le module profiling permet de savoir quelle sous-expression
+d'une FnRegex coûte le plus cher au matching.
+
+Un Profiler exécute le matching sur une copie instrumentée de
+l'arbre de la FnRegex : chaque occurrence d'un noeud y est
+enveloppée d'une sonde qui compte ses appels, ses succès et
+ses échecs, les caractères qu'il consomme et le temps cumulé
+passé dans le noeud et ses enfants. Ces statistiques sont
+disponibles sous forme d'un arbre de NodeStats, d'un rapport
+texte (report) ou de dictionnaires imbriqués (tree), et
+peuvent être transmises à chaque appel d'un noeud à une
+fonction hook.
+
+L'instrumentation n'existe que dans la copie de l'arbre : les
+fonctions match et fullmatch, et l'arbre de la FnRegex, ne sont
+pas modifiés et n'en paient pas le coût.
+"""
+
+from __future__ import annotations
+
+from sys import maxsize
+from time import perf_counter_ns
+from typing import Callable, List, Optional
+
+from fre.fnregex import FnRegex, Node, Seq, Repeat, Choice, Literal, \
+    Group, MatchResult, FullMatchResult, FAIL, _Single, children, node, \
+    rebuild
+
+Hook = Callable[['NodeStats', int, int], None]
+
+
+class NodeStats:
+    """Statistiques d'une occurrence d'un noeud dans l'arbre.
+    time est le temps cumulé, en nanosecondes, passé dans le
+    noeud et ses enfants.
+    """
+
+    def __init__(self, n: Node, children: List[NodeStats]):
+        self.node = n
+        self.children = children
+        self.calls = 0
+        self.successes = 0
+        self.consumed = 0
+        self.time = 0
+
+    @property
+    def failures(self) -> int:
+        """Nombre d'appels du noeud ayant échoué"""
+
+        return self.calls - self.successes
+
+    @property
+    def self_time(self) -> int:
+        """Temps passé dans le noeud hors de ses enfants, en
+        nanosecondes
+        """
+
+        return self.time - sum(child.time for child in self.children)
+
+    def label(self) -> str:
+        """Description courte du noeud
+
+        :return: le nom du noeud et ses paramètres
+        """
+
+        n = self.node
+
+        if isinstance(n, Repeat):
+            stop = '' if n.stop >= maxsize else n.stop
+            return f'Repeat[{n.start}:{stop}]'
+        elif isinstance(n, (Seq, Choice)):
+            return f'{type(n).__name__}({len(n.items)})'
+        elif isinstance(n, Group):
+            return 'Group' if n.name is None else f'Group({n.name!r})'
+        elif isinstance(n, (_Single, Literal)):
+            return repr(n)
+        else:
+            return type(n).__name__
+
+    def reset(self):
+        self.calls = self.successes = self.consumed = self.time = 0
+
+
+class _Probe(Node):
+    """Sonde enveloppant une occurrence d'un noeud"""
+
+    def __init__(self, inner: Node, stats: NodeStats, hook: Optional[Hook]):
+        self.inner = inner
+        self.stats = stats
+        self.hook = hook
+        self._depth = inner._depth
+
+    def _at(self, value: str, pos: int) -> int:
+        start = perf_counter_ns()
+        end = self.inner._at(value, pos)
+        elapsed = perf_counter_ns() - start
+        stats = self.stats
+        stats.calls += 1
+        stats.time += elapsed
+
+        if end != FAIL:
+            stats.successes += 1
+            stats.consumed += end - pos
+
+        if self.hook is not None:
+            self.hook(stats, pos, end)
+
+        return end
+
+
+def _walk(root: NodeStats):
+    """Parcours préfixe des statistiques avec leur profondeur"""
+
+    stack = [(root, 0)]
+
+    while stack:
+        stats, depth = stack.pop()
+        yield stats, depth
+        stack.extend((child, depth + 1) for child in reversed(stats.children))
+
+
+class Profiler:
+    """Un Profiler exécute match et fullmatch sur la copie
+    instrumentée de l'arbre de fnrx et cumule les statistiques
+    de chaque noeud d'un appel à l'autre.
+
+    Le hook éventuel est appelé après chaque appel d'un noeud
+    avec ses statistiques, la position de départ et la position
+    atteinte (FAIL en cas d'échec).
+    """
+
+    def __init__(self, fnrx: FnRegex, hook: Optional[Hook] = None):
+        self.pattern = node(fnrx)
+        self.hook = hook
+        self._tree, self.root = self._instrument(self.pattern)
+
+    def _instrument(self, root: Node):
+        # chaque occurrence d'un sous-arbre partagé reçoit sa
+        # propre sonde, l'arbre instrumenté est construit avec une
+        # pile explicite
+        probes: List[_Probe] = []
+        stack = [(root, False)]
+
+        while stack:
+            n, ready = stack.pop()
+            items = children(n)
+
+            if not ready:
+                stack.append((n, True))
+                stack.extend((c, False) for c in reversed(items))
+                continue
+
+            inner = probes[len(probes) - len(items):]
+            del probes[len(probes) - len(items):]
+            stats = NodeStats(n, [probe.stats for probe in inner])
+            probes.append(_Probe(rebuild(n, inner), stats, self.hook))
+
+        return probes[0], probes[0].stats
+
+    def match(self, inp: str, pos: int = 0) -> MatchResult:
+        """Equivalent instrumenté de la fonction match
+
+        :param inp: input à tester
+        :param pos: position de départ du matching
+        :return: un nouveau MatchResult
+        """
+
+        end = self._tree._at(inp, pos)
+        return MatchResult(inp, pos, False, pos) if end == FAIL \
+            else MatchResult(inp, end, True, pos)
+
+    def fullmatch(self, inp: str) -> FullMatchResult:
+        """Equivalent instrumenté de la fonction fullmatch
+
+        :param inp: input à tester
+        :return: un nouveau FullMatchResult
+        """
+
+        if self._tree._at(inp, 0) == len(inp):
+            return FullMatchResult(MatchResult(inp, len(inp)))
+        else:
+            return FullMatchResult(MatchResult(inp, 0, False))
+
+    def reset(self):
+        """Remet à zéro les statistiques de tous les noeuds"""
+
+        for stats, _ in _walk(self.root):
+            stats.reset()
+
+    def tree(self) -> dict:
+        """Exporte les statistiques sous forme de dictionnaires
+        imbriqués, sérialisables en JSON
+
+        :return: le dictionnaire du noeud racine
+        """
+
+        exported = {}
+
+        for stats, _ in _walk(self.root):
+            exported[id(stats)] = {
+                'node': stats.label(),
+                'calls': stats.calls,
+                'successes': stats.successes,
+                'failures': stats.failures,
+                'consumed': stats.consumed,
+                'time_ns': stats.time,
+                'self_time_ns': stats.self_time,
+                'children': [],
+            }
+
+        for stats, _ in _walk(self.root):
+            exported[id(stats)]['children'] = [exported[id(child)]
+                                               for child in stats.children]
+
+        return exported[id(self.root)]
+
+    def report(self) -> str:
+        """Construit le rapport texte des statistiques, un noeud
+        par ligne indenté selon sa profondeur
+
+        :return: le rapport
+        """
+
+        lines = ['%10s %10s %10s %10s %12s %12s  %s'
+                 % ('calls', 'ok', 'fail', 'chars', 'time(us)', 'self(us)',
+                    'node')]
+
+        for stats, depth in _walk(self.root):
+            lines.append('%10d %10d %10d %10d %12.1f %12.1f  %s%s'
+                         % (stats.calls, stats.successes, stats.failures,
+                            stats.consumed, stats.time / 1e3,
+                            stats.self_time / 1e3, '  ' * depth,
+                            stats.label()))
+
+        return '\n'.join(lines)
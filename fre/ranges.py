@@ -0,0 +1,132 @@
+"""Le module ranges regroupe l'arithmétique sur les ensembles
+de caractères représentés sous forme d'intervalles de code
+points triés, disjoints et non contigus :
+
+    ((lo1, hi1), (lo2, hi2), ...) avec hi1 + 1 < lo2
+
+Cette représentation compacte sert de base aux passes
+travaillant sur l'arbre des FnRegex (analyse, compilation
+en automates, ...).
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Iterable, Tuple
+
+Ranges = Tuple[Tuple[int, int], ...]
+
+MAX_CODE = 0x10FFFF
+EMPTY: Ranges = ()
+ANY: Ranges = ((0, MAX_CODE),)
+
+
+def normalize(ranges: Iterable[Tuple[int, int]]) -> Ranges:
+    """Trie et fusionne des intervalles quelconques afin
+    d'obtenir des Ranges normalisées
+
+    :param ranges: intervalles (bornes incluses) dans le désordre
+    :return: les Ranges normalisées correspondantes
+    """
+
+    merged = []
+
+    for lo, hi in sorted(r for r in ranges if r[0] <= r[1]):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+
+    return tuple(merged)
+
+
+def union(*rs: Ranges) -> Ranges:
+    """Union de plusieurs Ranges
+
+    :param rs: les Ranges à réunir
+    :return: les Ranges contenant tous les caractères de rs
+    """
+
+    return normalize(r for ranges in rs for r in ranges)
+
+
+def complement(ranges: Ranges) -> Ranges:
+    """Complémentaire de ranges sur l'ensemble des code points
+
+    :param ranges: les Ranges à inverser
+    :return: les Ranges des caractères absents de ranges
+    """
+
+    result = []
+    lo = 0
+
+    for first, last in ranges:
+        if first > lo:
+            result.append((lo, first - 1))
+        lo = last + 1
+
+    if lo <= MAX_CODE:
+        result.append((lo, MAX_CODE))
+
+    return tuple(result)
+
+
+def intersection(left: Ranges, right: Ranges) -> Ranges:
+    """Intersection de deux Ranges
+
+    :param left: premier ensemble
+    :param right: second ensemble
+    :return: les Ranges des caractères présents dans les deux
+    """
+
+    result = []
+    i = j = 0
+
+    while i < len(left) and j < len(right):
+        lo = max(left[i][0], right[j][0])
+        hi = min(left[i][1], right[j][1])
+
+        if lo <= hi:
+            result.append((lo, hi))
+
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+
+    return tuple(result)
+
+
+def difference(left: Ranges, right: Ranges) -> Ranges:
+    """Différence de deux Ranges
+
+    :param left: ensemble de départ
+    :param right: caractères à retirer
+    :return: les Ranges des caractères de left absents de right
+    """
+
+    return intersection(left, complement(right))
+
+
+def contains(ranges: Ranges, code: int) -> bool:
+    """Teste l'appartenance d'un code point à ranges par
+    recherche dichotomique
+
+    :param ranges: les Ranges à interroger
+    :param code: le code point à tester
+    :return: True si code appartient à ranges
+    """
+
+    i = bisect_right(ranges, (code, MAX_CODE + 1)) - 1
+    return i >= 0 and ranges[i][1] >= code
+
+
+def size(ranges: Ranges) -> int:
+    """Nombre de code points contenus dans ranges
+
+    :param ranges: les Ranges à mesurer
+    :return: le nombre de caractères
+    """
+
+    return sum(hi - lo + 1 for lo, hi in ranges)
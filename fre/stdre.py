@@ -0,0 +1,137 @@
+"""Le module stdre traduit l'arbre d'une FnRegex en une
+expression régulière du module re de la bibliothèque
+standard, afin d'exécuter le matching dans le moteur C de re.
+
+La sémantique des FnRegex (choix ordonné qui s'engage sur la
+première branche qui réussit, répétitions gloutonnes sans
+retour arrière) est reproduite exactement grâce aux groupes
+atomiques et aux quantificateurs possessifs, disponibles à
+partir de python 3.11. Avec les versions précédentes, seules
+les FnRegex déterministes (voir fre.analysis), pour lesquelles
+les deux sémantiques coïncident, peuvent être traduites.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from sys import maxsize
+
+from fre.analysis import is_deterministic
+from fre.fnregex import FnRegex, CompiledFnRegex, Node, Seq, Repeat, Choice, \
+    Literal, Group, UnsupportedPatternError, FAIL, _Single, node
+
+ATOMIC = sys.version_info >= (3, 11)
+NEVER = '(?!)'
+
+
+class _Translator:
+    """Traduit les noeuds de l'arbre en source d'expression
+    régulière
+    """
+
+    def __init__(self, atomic: bool):
+        self.atomic = atomic
+
+    def group(self, source: str) -> str:
+        return ('(?>%s)' if self.atomic else '(?:%s)') % source
+
+    def charclass(self, n: _Single) -> str:
+        if not n.ranges:
+            return NEVER
+        elif len(n.ranges) == 1 and n.ranges[0][0] == n.ranges[0][1]:
+            return re.escape(chr(n.ranges[0][0]))
+
+        return '[%s]' % ''.join(re.escape(chr(lo)) if lo == hi else
+                                '%s-%s' % (re.escape(chr(lo)),
+                                           re.escape(chr(hi)))
+                                for lo, hi in n.ranges)
+
+    def translate(self, n: Node) -> str:
+        if isinstance(n, _Single):
+            return self.charclass(n)
+        elif isinstance(n, Literal):
+            return re.escape(n.text)
+        elif isinstance(n, Seq):
+            return ''.join(self.translate(item) for item in n.items)
+        elif isinstance(n, Choice):
+            if not n.items:
+                return NEVER
+
+            return self.group('|'.join(self.translate(item)
+                                       for item in n.items))
+        elif isinstance(n, Repeat):
+            if n.start > n.stop:
+                return NEVER
+            elif n.stop <= 0:
+                return ''
+
+            bounds = '{%d,}' % n.start if n.stop >= maxsize \
+                else '{%d,%d}' % (n.start, n.stop)
+            source = self.translate(n.re)
+
+            if not isinstance(n.re, _Single):
+                source = '(?:%s)' % source
+
+            return source + bounds + ('+' if self.atomic else '')
+        elif isinstance(n, Group):
+            return '(?:%s)' % self.translate(n.re)
+        else:
+            raise UnsupportedPatternError(n)
+
+
+def translate(fnrx: FnRegex, atomic: bool = ATOMIC) -> str:
+    """Traduit fnrx en source d'expression régulière
+
+    :param fnrx: FnRegex à traduire
+    :param atomic: utilise les groupes atomiques et les
+                  quantificateurs possessifs (python >= 3.11)
+    :return: le source de l'expression régulière
+    :raise UnsupportedPatternError: si fnrx contient des
+            FnRegex opaques, ou si fnrx n'est pas déterministe
+            alors que atomic est faux
+    """
+
+    pattern = node(fnrx)
+
+    if not atomic and not is_deterministic(pattern):
+        raise UnsupportedPatternError(
+            'only deterministic patterns can be translated without '
+            'atomic groups')
+
+    return _Translator(atomic).translate(pattern)
+
+
+class ReFnRegex(CompiledFnRegex):
+    """Forme compilée d'une FnRegex sous forme d'un re.Pattern,
+    disponible dans l'attribut regex
+    """
+
+    def __init__(self, pattern: FnRegex, regex: re.Pattern):
+        self.pattern = pattern
+        self.regex = regex
+
+    def _at(self, value: str, pos: int) -> int:
+        m = self.regex.match(value, pos)
+        return FAIL if m is None else m.end()
+
+    def _full(self, value: str) -> bool:
+        return self.regex.fullmatch(value) is not None
+
+
+def compile(fnrx: FnRegex) -> ReFnRegex:
+    """Compile une FnRegex en un re.Pattern
+
+    :param fnrx: FnRegex à compiler
+    :return: un nouveau ReFnRegex
+    :raise UnsupportedPatternError: si fnrx ne peut pas être
+            traduite (voir translate) ou dépasse les limites du
+            module re
+    """
+
+    pattern = node(fnrx)
+
+    try:
+        return ReFnRegex(pattern, re.compile(translate(pattern)))
+    except (re.error, OverflowError, RecursionError) as e:
+        raise UnsupportedPatternError(e) from e
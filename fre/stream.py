@@ -0,0 +1,209 @@
+"""Le module stream permet le matching d'un input découpé en
+morceaux (itérateur de str ou de bytes, fichier, mmap) sans
+jamais le charger entièrement en mémoire.
+
+Le matching est effectué par le DFA de la FnRegex (voir
+fre.dfa), dont l'état est conservé d'un morceau à l'autre :
+la mémoire utilisée ne dépend donc pas de la taille de
+l'input, et seules les FnRegex déterministes sont supportées.
+Le résultat est décidé dès que possible, sans lire la suite
+de l'input : lorsque l'automate atteint l'état puits ou un état
+final à partir duquel la correspondance ne peut plus s'étendre.
+
+Les morceaux de type bytes sont décodés au fil de l'eau, les
+positions retournées étant toujours comptées en caractères.
+"""
+
+from __future__ import annotations
+
+import codecs
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+
+from fre.binary import BUFFERS
+from fre.dfa import DFA, compile
+from fre.fnregex import FnRegex, FAIL
+
+CHUNK_SIZE = 1 << 16
+
+Chunk = Union[str, bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class StreamResult:
+    """Résultat du matching d'un flux : index est la fin de la
+    correspondance, comptée en caractères depuis le début du
+    flux
+    """
+
+    index: int
+    match: bool
+
+    def matched(self) -> bool:
+        """Indique si le flux correspond à la FnRegex
+
+        :return: True si le matching est valide
+        """
+
+        return self.match
+
+
+class StreamMatcher:
+    """Un StreamMatcher reçoit les morceaux successifs d'un input
+    par sa méthode feed, puis close lorsque l'input est épuisé.
+    L'attribut result vaut None tant que le résultat n'est pas
+    décidé.
+
+    En mode full, le flux doit correspondre entièrement à la
+    FnRegex (équivalent de fullmatch), sinon une correspondance
+    partielle depuis le début du flux suffit (équivalent de
+    match).
+    """
+
+    def __init__(self, fnrx: FnRegex, full: bool = False,
+                 encoding: str = 'utf-8'):
+        self.dfa = fnrx if isinstance(fnrx, DFA) else compile(fnrx)
+        self.full = full
+        self.encoding = encoding
+        self.result: Optional[StreamResult] = None
+        self._decoder = None
+        self._state = self.dfa.start
+        self._offset = 0
+        self._last = 0 if self.dfa.accepts(self._state) else FAIL
+
+        if self._state < 0:
+            self._decide(False)
+        elif not full and self.dfa.final(self._state):
+            self._decide(False)
+
+    def _decide(self, accept: bool):
+        """Fixe le résultat. En mode full, accept indique si le
+        flux lu jusqu'ici est reconnu. Sinon, le résultat est la
+        dernière acceptation de l'automate.
+        """
+
+        if self.full:
+            self.result = StreamResult(self._offset if accept else 0, accept)
+        else:
+            self.result = StreamResult(max(self._last, 0), self._last >= 0)
+
+    def _decode(self, chunk: Chunk, final: bool = False) -> str:
+        if self._decoder is None:
+            self._decoder = codecs.getincrementaldecoder(self.encoding)()
+
+        return self._decoder.decode(chunk, final)
+
+    def feed(self, chunk: Chunk) -> bool:
+        """Consomme un morceau de l'input
+
+        :param chunk: morceau de type str ou bytes
+        :return: True si le résultat est décidé
+        """
+
+        if self.result is not None:
+            return True
+
+        if isinstance(chunk, BUFFERS):
+            chunk = self._decode(chunk)
+
+        dfa = self.dfa
+        state, consumed, last = dfa.feed(self._state, chunk)
+
+        if last >= 0:
+            self._last = self._offset + last
+
+        self._state = state
+        self._offset += consumed
+
+        # l'automate est bloqué, ou ne peut plus progresser alors
+        # que le mode full exige de consommer le reste du flux
+        if state < 0 or dfa.final(state) and \
+                (not self.full or consumed < len(chunk)):
+            self._decide(False)
+
+        return self.result is not None
+
+    def close(self) -> StreamResult:
+        """Signale la fin de l'input
+
+        :return: le résultat du matching
+        """
+
+        if self._decoder is not None:
+            self.feed(self._decode(b'', True))
+
+        if self.result is None:
+            self._decide(self.dfa.accepts(self._state))
+
+        return self.result
+
+
+def chunks(source, chunk_size: int = CHUNK_SIZE) -> Iterator[Chunk]:
+    """Découpe une source en morceaux
+
+    :param source: str, bytes, memoryview, objet possédant une
+                  méthode read (fichier, mmap) ou itérable de
+                  morceaux
+    :param chunk_size: taille des morceaux lus
+    :return: un itérateur sur les morceaux
+    """
+
+    if isinstance(source, str):
+        yield source
+    elif isinstance(source, BUFFERS):
+        view = memoryview(source)
+
+        for i in range(0, len(view), chunk_size):
+            yield view[i:i + chunk_size]
+    elif hasattr(source, 'read'):
+        chunk = source.read(chunk_size)
+
+        while chunk:
+            yield chunk
+            chunk = source.read(chunk_size)
+    else:
+        yield from source
+
+
+def _run(matcher: StreamMatcher, source, chunk_size: int) -> StreamResult:
+    for chunk in chunks(source, chunk_size):
+        if matcher.feed(chunk):
+            return matcher.result
+
+    return matcher.close()
+
+
+def match_stream(fnrx: FnRegex, source, encoding: str = 'utf-8',
+                 chunk_size: int = CHUNK_SIZE) -> StreamResult:
+    """Equivalent de match sur un flux : une correspondance
+    partielle depuis le début du flux suffit. La lecture de la
+    source s'arrête dès que le résultat est décidé.
+
+    :param fnrx: FnRegex déterministe portant le test
+    :param source: flux à tester (voir chunks)
+    :param encoding: encodage des morceaux de type bytes
+    :param chunk_size: taille des morceaux lus
+    :return: un nouveau StreamResult
+    :raise UnsupportedPatternError: si fnrx n'est pas
+            déterministe
+    """
+
+    return _run(StreamMatcher(fnrx, False, encoding), source, chunk_size)
+
+
+def fullmatch_stream(fnrx: FnRegex, source, encoding: str = 'utf-8',
+                     chunk_size: int = CHUNK_SIZE) -> StreamResult:
+    """Equivalent de fullmatch sur un flux : le flux doit
+    correspondre entièrement à fnrx. La lecture de la source
+    s'arrête dès qu'un échec est décidé.
+
+    :param fnrx: FnRegex déterministe portant le test
+    :param source: flux à tester (voir chunks)
+    :param encoding: encodage des morceaux de type bytes
+    :param chunk_size: taille des morceaux lus
+    :return: un nouveau StreamResult
+    :raise UnsupportedPatternError: si fnrx n'est pas
+            déterministe
+    """
+
+    return _run(StreamMatcher(fnrx, True, encoding), source, chunk_size)
@@ -0,0 +1,99 @@
+"""Le module threads répartit le matching d'un grand nombre
+d'inputs sur un pool de threads. Il s'adresse aux builds de
+CPython sans GIL et aux évaluations qui relâchent le GIL
+(l'évaluation vectorisée de fre.batch avec NumPy).
+
+Contrairement à fre.parallel, la FnRegex n'est pas copiée :
+tous les threads partagent son arbre et sa forme compilée,
+tous deux immuables. L'état du matching (positions, piles,
+tableaux de fre.batch) est propre à chaque appel et donc à
+chaque thread.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+from fre import backends
+from fre.binary import binary
+from fre.fnregex import FnRegex, Node, UnsupportedPatternError, node
+from fre.parallel import CHUNK_SIZE, chunks, ordered, run_batch
+
+
+def _prepare(fnrx: FnRegex) -> Node:
+    """Construit une fois pour toutes, avant le démarrage des
+    threads, les formes dérivées de l'arbre utilisées par
+    fre.batch
+    """
+
+    pattern = node(fnrx)
+
+    try:
+        backends.compile(pattern, 'codegen')
+    except UnsupportedPatternError:
+        pass
+
+    binary(pattern)
+    return pattern
+
+
+def _task(batch: list, pattern: Node, full: bool, count: bool):
+    return run_batch(pattern, batch, full, count)
+
+
+def _map(fnrx: FnRegex, corpus: Iterable, full: bool, count: bool,
+         threads: Optional[int], chunk_size: int) -> Iterator:
+    pattern = _prepare(fnrx)
+    batches = chunks(corpus, chunk_size)
+
+    if threads is None:
+        threads = os.cpu_count() or 1
+
+    if threads <= 1:
+        for batch in batches:
+            yield run_batch(pattern, batch, full, count)
+
+        return
+
+    with ThreadPoolExecutor(threads) as executor:
+        yield from ordered(executor, threads, _task, batches,
+                           pattern, full, count)
+
+
+def match_all(fnrx: FnRegex, corpus: Iterable, full: bool = False,
+              threads: Optional[int] = None,
+              chunk_size: int = CHUNK_SIZE) -> List[bool]:
+    """Equivalent de match (fullmatch si full) sur chacun des
+    inputs du corpus, réparti sur plusieurs threads
+
+    :param fnrx: FnRegex portant le test
+    :param corpus: itérable de str ou de bytes
+    :param full: si True, les inputs doivent correspondre
+                entièrement à fnrx
+    :param threads: nombre de threads, le nombre de coeurs si
+                   None. Le matching a lieu dans le thread
+                   courant si threads vaut 1
+    :param chunk_size: nombre d'inputs par morceau
+    :return: la liste des résultats, dans l'ordre du corpus
+    """
+
+    results = []
+
+    for chunk in _map(fnrx, corpus, full, False, threads, chunk_size):
+        results.extend(chunk)
+
+    return results
+
+
+def count_matches(fnrx: FnRegex, corpus: Iterable, full: bool = False,
+                  threads: Optional[int] = None,
+                  chunk_size: int = CHUNK_SIZE) -> int:
+    """Compte les inputs du corpus correspondant à fnrx (voir
+    match_all)
+
+    :return: le nombre d'inputs correspondant à fnrx
+    """
+
+    return sum(_map(fnrx, corpus, full, True, threads, chunk_size))
@@ -0,0 +1,222 @@
+"""Le module unicode fournit les classes de caractères Unicode :
+catégories générales (Lu, Nd, ... ou la catégorie majeure L,
+N, ...) et écritures (Latin, Greek, Han, ...), sous forme de
+CharSet utilisables partout où une FnRegex l'est.
+
+Les tables de ces classes sont des intervalles de code points
+triés, construits en un seul parcours de unicodedata puis
+conservés dans un cache disque (voir CACHE_DIR) sous forme de
+tableaux d'entiers compacts. Elles ne sont chargées (ou
+construites) qu'à la première demande d'une classe, et
+l'appartenance d'un caractère se teste par recherche
+dichotomique dans les intervalles (voir CharSet).
+
+unicodedata ne donnant pas l'écriture des caractères, celle-ci
+est déduite du préfixe de leur nom (LATIN SMALL LETTER A,
+CJK UNIFIED IDEOGRAPH-4E00, ...) : seuls les caractères
+propres à une écriture lui sont attribués, les caractères
+communs à plusieurs écritures (chiffres, ponctuation, ...)
+n'appartiennent à aucune.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+from array import array
+from typing import Dict, Optional, Tuple
+
+from fre import ranges as rg
+from fre.files import store
+from fre.fnregex import CharSet
+
+# version du format des tables, incluse dans le nom du cache
+VERSION = 1
+
+# répertoire du cache disque des tables, aucun cache si None
+CACHE_DIR: Optional[str] = os.environ.get('FRE_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'fre')
+
+# catégories générales (les catégories majeures et LC étant
+# l'union de plusieurs d'entre elles)
+CATEGORIES = ('Lu', 'Ll', 'Lt', 'Lm', 'Lo', 'Mn', 'Mc', 'Me', 'Nd', 'Nl',
+              'No', 'Pc', 'Pd', 'Ps', 'Pe', 'Pi', 'Pf', 'Po', 'Sm', 'Sc',
+              'Sk', 'So', 'Zs', 'Zl', 'Zp', 'Cc', 'Cf', 'Cs', 'Co', 'Cn')
+_UNIONS = dict({major: tuple(c for c in CATEGORIES if c[0] == major)
+                for major in 'LMNPSZC'}, LC=('Lu', 'Ll', 'Lt'))
+
+# écriture des caractères selon le premier ou les deux premiers
+# mots de leur nom
+_PREFIXES = dict(
+    {word.upper(): word for word in (
+        'Latin', 'Greek', 'Coptic', 'Cyrillic', 'Armenian', 'Hebrew',
+        'Arabic', 'Syriac', 'Thaana', 'Nko', 'Devanagari', 'Bengali',
+        'Gurmukhi', 'Gujarati', 'Oriya', 'Tamil', 'Telugu', 'Kannada',
+        'Malayalam', 'Sinhala', 'Thai', 'Lao', 'Tibetan', 'Myanmar',
+        'Georgian', 'Hangul', 'Ethiopic', 'Cherokee', 'Ogham', 'Runic',
+        'Khmer', 'Mongolian', 'Hiragana', 'Katakana', 'Bopomofo', 'Yi',
+        'Tifinagh', 'Gothic', 'Glagolitic', 'Javanese', 'Balinese')},
+    **{'FULLWIDTH LATIN': 'Latin', 'HALFWIDTH HANGUL': 'Hangul',
+       'HALFWIDTH KATAKANA': 'Katakana', 'CJK UNIFIED': 'Han',
+       'CJK COMPATIBILITY': 'Han', 'CJK RADICAL': 'Han',
+       'KANGXI RADICAL': 'Han', 'ARABIC-INDIC DIGIT': 'Arabic',
+       'EXTENDED ARABIC-INDIC': 'Arabic', 'NKO': 'Nko'})
+SCRIPTS = tuple(sorted(set(_PREFIXES.values())))
+
+# tableaux [lo1, hi1, lo2, hi2, ...] de chaque catégorie et
+# écriture, chargés à la première demande d'une classe
+_tables: Optional[Dict[str, array]] = None
+_classes: Dict[str, CharSet] = {}
+
+
+def _script(name: str) -> Optional[str]:
+    words = name.split(' ', 2)
+    return _PREFIXES.get(' '.join(words[:2])) or _PREFIXES.get(words[0])
+
+
+def _build() -> Dict[str, array]:
+    """Construit les tables de toutes les classes en un seul
+    parcours des code points
+    """
+
+    import unicodedata
+
+    tables = {name: array('I') for name in CATEGORIES + SCRIPTS}
+    ranges = [None, None]
+
+    for code in range(rg.MAX_CODE + 1):
+        c = chr(code)
+        category = unicodedata.category(c)
+        script = _script(unicodedata.name(c, '')) \
+            if category != 'Cn' else None
+
+        # ranges donne la table courante de la catégorie et de
+        # l'écriture : un intervalle est prolongé tant que les
+        # code points successifs restent dans la même table
+        for i, name in enumerate((category, script)):
+            if name is None:
+                continue
+
+            table = tables[name]
+
+            if ranges[i] is table and table[-1] == code - 1:
+                table[-1] = code
+            else:
+                table.extend((code, code))
+
+            ranges[i] = table
+
+    return tables
+
+
+def _path(cache_dir: str) -> str:
+    import unicodedata
+
+    return os.path.join(cache_dir, 'unicode-%d-%s-%d%s.tables' % (
+        VERSION, unicodedata.unidata_version, array('I').itemsize,
+        sys.byteorder[0]))
+
+
+def _load(path: str) -> Optional[Dict[str, array]]:
+    """Relit les tables du cache disque
+
+    :param path: chemin du cache
+    :return: les tables, None si le cache est absent ou corrompu
+            (il est alors reconstruit)
+    """
+
+    try:
+        with open(path, 'rb') as f:
+            data = marshal.loads(f.read())
+
+        tables = {}
+
+        for name in CATEGORIES + SCRIPTS:
+            tables[name] = array('I')
+            tables[name].frombytes(data[name])
+
+            if len(tables[name]) % 2:
+                return None
+    except (OSError, EOFError, ValueError, TypeError, AttributeError,
+            KeyError):
+        return None
+
+    return tables
+
+
+def tables() -> Dict[str, array]:
+    """Charge les tables des classes depuis le cache disque, ou
+    les construit (et les y conserve) lors du premier appel
+
+    :return: pour chaque catégorie et écriture, le tableau
+            [lo1, hi1, lo2, hi2, ...] de ses intervalles
+    """
+
+    global _tables
+
+    if _tables is None:
+        path = None if CACHE_DIR is None else _path(CACHE_DIR)
+        loaded = None if path is None else _load(path)
+
+        if loaded is None:
+            loaded = _build()
+
+            if path is not None:
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    store(path, marshal.dumps(
+                        {name: table.tobytes()
+                         for name, table in loaded.items()}))
+                except OSError:
+                    # un cache inaccessible en écriture n'empêche
+                    # pas d'utiliser les tables
+                    pass
+
+        _tables = loaded
+
+    return _tables
+
+
+def _charset(names: Tuple[str, ...]) -> CharSet:
+    table = tables()
+    return CharSet(rg.union(*(tuple(zip(table[name][0::2],
+                                        table[name][1::2]))
+                              for name in names)))
+
+
+def category(name: str) -> CharSet:
+    """Construit la classe des caractères d'une catégorie
+    générale Unicode
+
+    :param name: catégorie (Lu, Nd, ...), catégorie majeure
+                (L, N, ...) ou LC (lettres à casse)
+    :return: le CharSet des caractères de la catégorie
+    :raise ValueError: si la catégorie n'existe pas
+    """
+
+    if name not in CATEGORIES and name not in _UNIONS:
+        raise ValueError(f'unknown unicode category {name!r}')
+
+    if name not in _classes:
+        _classes[name] = _charset(_UNIONS.get(name, (name,)))
+
+    return _classes[name]
+
+
+def script(name: str) -> CharSet:
+    """Construit la classe des caractères propres à une
+    écriture (voir SCRIPTS)
+
+    :param name: écriture (Latin, Greek, Han, ...)
+    :return: le CharSet des caractères de l'écriture
+    :raise ValueError: si l'écriture n'est pas connue
+    """
+
+    if name not in SCRIPTS:
+        raise ValueError(f'unknown unicode script {name!r}')
+
+    if name not in _classes:
+        _classes[name] = _charset((name,))
+
+    return _classes[name]
@@ -0,0 +1,225 @@
+"""Le module wire définit un format binaire compact et stable
+pour sérialiser l'arbre d'une FnRegex, indépendant de la
+version de python et de l'implémentation des noeuds. C'est
+aussi le format utilisé par pickle pour les noeuds de l'arbre.
+
+Le format commence par MAGIC et le numéro de VERSION, suivis
+des noeuds dans l'ordre postfixe : chaque noeud est un tag
+suivi de ses attributs, les enfants étant désignés par leur
+rang dans la suite des noeuds déjà décodés. Le dernier noeud
+est la racine. Les entiers sont codés en varint (zigzag pour
+les entiers signés) et les chaines en UTF-8.
+
+Un sous-arbre partagé (le même objet à plusieurs endroits de
+l'arbre) n'est écrit qu'une fois.
+"""
+
+from __future__ import annotations
+
+from sys import maxsize
+from typing import Dict, List
+
+from fre.fnregex import FnRegex, Node, Seq, Repeat, Choice, CharInterval, \
+    Char, CharSet, Literal, Group, UnsupportedPatternError, children, node
+
+MAGIC = b'FRE'
+VERSION = 1
+
+CHAR, INTERVAL, SET, LITERAL, SEQ, CHOICE, REPEAT, GROUP = range(8)
+
+_TAGS = {Char: CHAR, CharInterval: INTERVAL, CharSet: SET, Literal: LITERAL,
+         Seq: SEQ, Choice: CHOICE, Repeat: REPEAT, Group: GROUP}
+
+
+def _varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+
+    out.append(value)
+
+
+def _signed(out: bytearray, value: int):
+    _varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def _string(out: bytearray, text: str):
+    data = text.encode('utf-8', 'surrogatepass')
+    _varint(out, len(data))
+    out += data
+
+
+def dumps(fnrx: FnRegex) -> bytes:
+    """Sérialise l'arbre de fnrx
+
+    :param fnrx: FnRegex à sérialiser
+    :return: la représentation binaire de l'arbre
+    :raise UnsupportedPatternError: si l'arbre contient des
+            noeuds autres que ceux de fre.fnregex (FnRegex
+            opaques, formes compilées, ...)
+    """
+
+    root = node(fnrx)
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    ranks: Dict[int, int] = {}
+    stack = [root]
+
+    # parcours postfixe avec une pile explicite, l'arbre
+    # pouvant être très profond
+    while stack:
+        n = stack[-1]
+        pending = [c for c in children(n) if id(c) not in ranks]
+
+        if pending:
+            stack.extend(reversed(pending))
+            continue
+
+        stack.pop()
+
+        if id(n) in ranks:
+            continue
+
+        tag = _TAGS.get(type(n))
+
+        if tag is None:
+            raise UnsupportedPatternError(f'{n!r} cannot be serialized')
+
+        out.append(tag)
+
+        if tag == CHAR:
+            _varint(out, ord(n.c))
+        elif tag == INTERVAL:
+            _varint(out, ord(n.first))
+            _varint(out, ord(n.last))
+        elif tag == SET:
+            _varint(out, len(n.ranges))
+
+            for lo, hi in n.ranges:
+                _varint(out, lo)
+                _varint(out, hi)
+        elif tag == LITERAL:
+            _string(out, n.text)
+        elif tag == REPEAT:
+            _varint(out, ranks[id(n.re)])
+            _signed(out, n.start)
+            # 0 représente une répétition sans borne supérieure
+            _varint(out, 0 if n.stop >= maxsize else
+                    (n.stop << 1 if n.stop >= 0 else (-n.stop << 1) - 1) + 1)
+        elif tag == GROUP:
+            _varint(out, ranks[id(n.re)])
+            # un groupe sans nom est suivi de 0, un groupe nommé
+            # de 1 et de son nom
+            _varint(out, 0 if n.name is None else 1)
+
+            if n.name is not None:
+                _string(out, n.name)
+        else:
+            _varint(out, len(n.items))
+
+            for item in n.items:
+                _varint(out, ranks[id(item)])
+
+        ranks[id(n)] = len(ranks)
+
+    return bytes(out)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.data):
+            raise ValueError('truncated fre wire data')
+
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def varint(self) -> int:
+        value = shift = 0
+
+        while True:
+            b = self.byte()
+            value |= (b & 0x7F) << shift
+            shift += 7
+
+            if b < 0x80:
+                return value
+
+    def string(self) -> str:
+        return self.bytes(self.varint()).decode('utf-8', 'surrogatepass')
+
+    def signed(self) -> int:
+        value = self.varint()
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+    def bytes(self, size: int) -> bytes:
+        if self.pos + size > len(self.data):
+            raise ValueError('truncated fre wire data')
+
+        self.pos += size
+        return self.data[self.pos - size:self.pos]
+
+
+def loads(data: bytes) -> Node:
+    """Reconstruit un arbre sérialisé par dumps
+
+    :param data: représentation binaire de l'arbre
+    :return: la racine de l'arbre
+    :raise ValueError: si data n'est pas au format attendu
+    """
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('not a fre wire data')
+
+    reader = _Reader(bytes(data))
+    reader.pos = len(MAGIC)
+    version = reader.byte()
+
+    if version != VERSION:
+        raise ValueError(f'unsupported fre wire version {version}')
+
+    nodes: List[Node] = []
+
+    def child() -> Node:
+        rank = reader.varint()
+
+        if rank >= len(nodes):
+            raise ValueError('invalid node reference in fre wire data')
+
+        return nodes[rank]
+
+    while reader.pos < len(reader.data):
+        tag = reader.byte()
+
+        if tag == CHAR:
+            nodes.append(Char(chr(reader.varint())))
+        elif tag == INTERVAL:
+            nodes.append(CharInterval(chr(reader.varint()),
+                                      chr(reader.varint())))
+        elif tag == SET:
+            nodes.append(CharSet(tuple((reader.varint(), reader.varint())
+                                       for _ in range(reader.varint()))))
+        elif tag == LITERAL:
+            nodes.append(Literal(reader.string()))
+        elif tag == REPEAT:
+            re, start, stop = child(), reader.signed(), reader.varint()
+            nodes.append(Repeat(re, start, maxsize if stop == 0 else
+                                (stop - 1 >> 1 if not stop - 1 & 1
+                                 else -(stop >> 1))))
+        elif tag == GROUP:
+            re = child()
+            nodes.append(Group(re, reader.string() if reader.varint()
+                               else None))
+        elif tag in (SEQ, CHOICE):
+            items = tuple(child() for _ in range(reader.varint()))
+            nodes.append(Seq(items) if tag == SEQ else Choice(items))
+        else:
+            raise ValueError(f'unknown tag {tag} in fre wire data')
+
+    if not nodes:
+        raise ValueError('empty fre wire data')
+
+    return nodes[-1]
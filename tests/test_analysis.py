@@ -0,0 +1,199 @@
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.analysis import first, nullable, is_deterministic, literal_prefix, \
+    length_bounds, required_literals, Prefilter, Guard
+from fre.fnregex import char, charinterval, charset, seq, choice, repeat, \
+    literal, group, node, match, fullmatch, finditer, \
+    UnsupportedPatternError, FAIL
+from test_fnregex import random_pattern
+
+date = op.digit[4:4] >> op.minus >> op.digit[2:2]
+
+
+class FirstTest(TestCase):
+
+    def test_first(self):
+        """Teste le calcul des premiers caractères possibles"""
+
+        self.assertEqual(((97, 97),), first(char('a')))
+        self.assertEqual(((97, 122),), first(charinterval('a', 'z')))
+        self.assertEqual(((97, 98),), first(seq(repeat(char('a'), 0, 2),
+                                                char('b'))))
+        self.assertEqual(((48, 57), (97, 97)),
+                         first(choice(char('a'), op.digit)))
+
+    def test_nullable(self):
+        """Teste la détection des FnRegex pouvant matcher vide"""
+
+        self.assertFalse(nullable(char('a')))
+        self.assertTrue(nullable(repeat(char('a'), 0, 2)))
+        self.assertTrue(nullable(op.a[:3] >> op.b[:2]))
+        self.assertFalse(nullable(op.a[:3] >> op.b))
+        self.assertTrue(nullable(op.a | op.b[0:1]))
+
+
+class PrefixTest(TestCase):
+
+    def test_literal_prefix(self):
+        """Teste le calcul du préfixe littéral commun"""
+
+        self.assertEqual('id=', literal_prefix(op.i >> op.d >> op.eq >>
+                                               op.digit[1:]))
+        self.assertEqual('aa', literal_prefix(op.a[2:4] >> op.b))
+        self.assertEqual('aab', literal_prefix(op.a[2:2] >> op.b))
+        self.assertEqual('aa', literal_prefix(op.a[2:4] >> op.a))
+        self.assertEqual('ab', literal_prefix((op.a >> op.b >> op.c) |
+                                              (op.a >> op.b >> op.d)))
+        self.assertEqual('', literal_prefix(op.lower[1:]))
+        self.assertEqual('a', literal_prefix(seq(char('a'), lambda m: m)))
+
+    def test_prefilter(self):
+        """Teste la recherche des positions candidates"""
+
+        find = Prefilter(op.i >> op.d).finder('xid id')
+        self.assertEqual([1, 4, -1], [find(0), find(2), find(5)])
+        find = Prefilter(op.a | op.b >> op.c).finder('xxbxa')
+        self.assertEqual([2, 4, -1], [find(0), find(3), find(5)])
+        find = Prefilter(op.lower).finder('12c4e')
+        self.assertEqual([2, 4, -1], [find(0), find(3), find(5)])
+        find = Prefilter(op.a[0:1]).finder('xx')
+        self.assertEqual([0, 2, -1], [find(0), find(2), find(3)])
+
+
+class LengthTest(TestCase):
+
+    def test_length_bounds(self):
+        """Teste le calcul des bornes de la longueur des
+        correspondances
+        """
+
+        self.assertEqual((7, 7), length_bounds(date))
+        self.assertEqual((1, None), length_bounds(op.lower[1:]))
+        self.assertEqual((0, 6), length_bounds(op.a[:3] >> op.b[:3]))
+        self.assertEqual((1, 3), length_bounds(op.a | literal('abc')))
+        self.assertEqual((2, 2), length_bounds(group(op.a >> op.b)))
+        self.assertEqual((0, 0), length_bounds(repeat(charset(), 0, 3)))
+        low, high = length_bounds(op.a >> repeat(op.b, 2, 1))
+        self.assertGreater(low, high)
+
+        with self.assertRaises(UnsupportedPatternError):
+            length_bounds(seq(char('a'), lambda m: m))
+
+    def test_required_literals(self):
+        """Teste le calcul des sous-chaines littérales requises"""
+
+        self.assertEqual(('-',), required_literals(date))
+        self.assertEqual(('@example.com',), required_literals(
+            op.lower[1:] >> op.op(literal('@example.com'))))
+        self.assertEqual(('key=', 'x'), required_literals(
+            op.lower[0:] >> op.op(literal('key=')) >> op.digit >> op.x))
+        self.assertEqual(('ab',), required_literals(
+            (op.x >> op.a >> op.b) | (op.a >> op.b >> op.y)))
+        self.assertEqual(('aa',), required_literals(op.a[2:5]))
+        self.assertEqual((), required_literals(op.a | op.b))
+        self.assertEqual((), required_literals(op.a[0:3]))
+        self.assertEqual((), required_literals(seq(lambda m: m)))
+
+
+class GuardTest(TestCase):
+
+    def test_rejects(self):
+        """Teste le rejet des inputs avant le matching"""
+
+        guard = Guard(date)
+        self.assertTrue(guard.rejects('2024-1', 0, True))
+        self.assertTrue(guard.rejects('2024-100', 0, True))
+        self.assertFalse(guard.rejects('2024-100', 0))
+        self.assertFalse(guard.rejects('x2024-10', 1, True))
+        self.assertTrue(guard.rejects('x2024-10', 0))
+        self.assertTrue(guard.rejects('2024+10', 0))
+        self.assertTrue(guard.rejects(b'2024+10', 0))
+        self.assertFalse(guard.rejects(b'2024-10', 0, True))
+        self.assertTrue(guard.absent('2024-10', 1))
+        self.assertFalse(guard.absent('x2024-10', 0))
+        summer = op.op(literal('\u00e9t\u00e9'))
+        self.assertTrue(Guard(summer).absent(b'ete', 0))
+        self.assertFalse(Guard(seq(lambda m: m)).rejects('', 0, True))
+
+    def test_random(self):
+        """Vérifie sur des FnRegex aléatoires que les bornes et
+        les littéraux requis valent pour toutes les
+        correspondances, et que le rejet préalable ne change
+        aucun résultat
+        """
+
+        rnd = Random(24)
+
+        for _ in range(500):
+            fnrx = seq(random_pattern(rnd, 3),
+                       literal(rnd.choice(['', 'ab', 'ca'])),
+                       random_pattern(rnd, 3))
+            low, high = length_bounds(fnrx)
+            literals = required_literals(fnrx)
+            rx = node(fnrx)
+
+            for _ in range(10):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 12)))
+                end = rx._at(inp, 0)
+
+                if end != FAIL:
+                    self.assertLessEqual(low, end)
+                    self.assertLessEqual(end, end if high is None else high)
+                    self.assertTrue(all(text in inp[:end]
+                                        for text in literals))
+
+                self.assertEqual(end, match(fnrx, inp).index
+                                 if match(fnrx, inp).matched() else FAIL)
+                self.assertEqual(end == len(inp),
+                                 fullmatch(fnrx, inp).matched())
+                self.assertEqual(end != FAIL, match(fnrx, inp.encode(
+                    'latin-1')).matched())
+
+                found, pos = [], 0
+
+                while pos <= len(inp):
+                    end = rx._at(inp, pos)
+
+                    if end == FAIL:
+                        pos += 1
+                    else:
+                        found.append((pos, end))
+                        pos = end if end > pos else end + 1
+
+                self.assertEqual(found, [(m.start, m.index)
+                                         for m in finditer(fnrx, inp)])
+
+
+class DeterministicTest(TestCase):
+
+    def test_deterministic(self):
+        """Teste des expressions décidables au vu du seul
+        caractère courant
+        """
+
+        name = op.lower[1:10]
+        self.assertTrue(is_deterministic(
+            name >> op.dot >> name >> op.at >> name >> op.dot >> name))
+        self.assertTrue(is_deterministic(op.digit[4:4] >> op.minus >>
+                                         op.digit[2:2]))
+        self.assertTrue(is_deterministic(op.a | op.b >> op.c))
+
+    def test_not_deterministic(self):
+        """Teste des expressions dont la sémantique gloutonne
+        diffère de celle d'une expression régulière classique
+        """
+
+        self.assertFalse(is_deterministic(op.a[1:] >> op.a))
+        self.assertFalse(is_deterministic(choice(char('a'),
+                                                 seq(char('a'), char('b')))))
+        self.assertFalse(is_deterministic(choice(repeat(char('a'), 0, 1),
+                                                 char('b'))))
+        self.assertFalse(is_deterministic(op.digit[1:3] >> op.digit[1:3]))
+        self.assertFalse(is_deterministic(seq(char('a'), lambda m: m)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.analysis import is_deterministic
+from fre.backends import BACKENDS, compile, cache_info, cache_clear
+from fre.fnregex import match, fullmatch, literal, choice, seq, char
+from test_fnregex import random_pattern
+
+
+class BackendsTest(TestCase):
+
+    def test_backend(self):
+        """Teste la sélection d'un backend par son nom"""
+
+        name = op.lower[1:10]
+        email = name >> op.dot >> name >> op.at >> name >> op.dot >> name
+
+        for backend in BACKENDS:
+            self.assertEqual(match(email, 'padget.pro@gmail.com!'),
+                             match(email, 'padget.pro@gmail.com!', backend))
+            self.assertTrue(fullmatch(email, 'padget.pro@gmail.com',
+                                      backend).matched())
+            self.assertFalse(fullmatch(email, 'padget.pro@gmail.com!',
+                                       backend).matched())
+
+    def test_cache(self):
+        """Teste que les formes compilées sont réutilisées"""
+
+        digits = op.digit[1:]
+        self.assertIs(compile(digits, 're'), compile(digits, 're'))
+
+    def test_structure(self):
+        """Teste le partage d'une forme compilée entre FnRegex égales
+        et les statistiques du cache
+        """
+
+        cache_clear()
+        email = op.lower[1:] >> op.at >> op.lower[1:]
+        compiled = compile(email, 'codegen')
+        self.assertIs(compiled, compile(op.lower[1:] >> op.at >> op.lower[1:],
+                                        'codegen'))
+        self.assertIs(compiled, compile(seq(op.lower[1:], char('@'),
+                                            op.lower[1:]), 'codegen'))
+        info = cache_info()
+        self.assertEqual((2, 1, 1), (info.hits, info.misses, info.currsize))
+
+    def test_unknown(self):
+        """Teste le refus d'un backend inconnu"""
+
+        with self.assertRaises(ValueError):
+            match(op.a, 'a', 'unknown')
+
+
+class DifferentialTest(TestCase):
+
+    def check(self, backend: str, deterministic: bool):
+        rnd = Random(10)
+
+        for _ in range(300):
+            pattern = random_pattern(rnd, 4)
+
+            if rnd.random() < 0.2:
+                pattern = choice(literal('ab'), pattern, literal('abc'))
+
+            if deterministic and not is_deterministic(pattern):
+                continue
+
+            for _ in range(20):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                self.assertEqual(match(pattern, inp),
+                                 match(pattern, inp, backend),
+                                 (pattern, inp))
+                self.assertEqual(fullmatch(pattern, inp),
+                                 fullmatch(pattern, inp, backend),
+                                 (pattern, inp))
+
+    def test_re(self):
+        """Compare le backend re au matching des FnRegex"""
+
+        self.check('re', False)
+
+    def test_codegen(self):
+        """Compare le backend codegen au matching des FnRegex"""
+
+        self.check('codegen', False)
+
+    def test_dfa(self):
+        """Compare les backends automates au matching des
+        FnRegex déterministes
+        """
+
+        self.check('dfa', True)
+        self.check('lazydfa', True)
+
+
+if __name__ == '__main__':
+    main()
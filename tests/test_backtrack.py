@@ -0,0 +1,175 @@
+import re
+from random import Random
+from time import perf_counter
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.analysis import nullable
+from fre.backtrack import compile, backtrack
+from fre.fnregex import match, fullmatch, node, Repeat, BACKTRACK, \
+    POSSESSIVE, seq, choice, repeat, char, children, \
+    UnsupportedPatternError
+from fre.optimize import optimize
+from fre.stdre import _Translator
+from test_fnregex import random_pattern
+
+
+def _empty_loop(n) -> bool:
+    """Vrai si n contient une répétition dont le corps peut
+    correspondre à la chaîne vide
+    """
+
+    stack = [n]
+
+    while stack:
+        n = stack.pop()
+
+        if isinstance(n, Repeat) and nullable(n.re):
+            return True
+
+        stack.extend(children(n))
+
+    return False
+
+
+class BacktrackTest(TestCase):
+
+    def test_repeat(self):
+        """Teste le retour arrière sur une répétition"""
+
+        rx = op.a[1:] >> op.a
+        self.assertFalse(match(rx, 'aaa').matched())
+        self.assertFalse(match(rx, 'aaa', mode=POSSESSIVE).matched())
+        result = match(rx, 'aaab', mode=BACKTRACK)
+        self.assertTrue(result.matched())
+        self.assertEqual(3, result.index)
+        self.assertTrue(fullmatch(rx, 'aa', mode=BACKTRACK).matched())
+        self.assertFalse(fullmatch(rx, 'a', mode=BACKTRACK).matched())
+
+    def test_choice(self):
+        """Teste le retour arrière sur un choice"""
+
+        rx = (op.a | op.a >> op.b) >> op.c
+        self.assertFalse(match(rx, 'abc').matched())
+        self.assertEqual(3, match(rx, 'abc', mode=BACKTRACK).index)
+        # la première alternative reste prioritaire
+        self.assertEqual(1, match(op.a | op.a >> op.b, 'ab',
+                                  mode=BACKTRACK).index)
+        # fullmatch essaie les chemins plus longs
+        self.assertTrue(fullmatch(op.a | op.a >> op.b, 'ab',
+                                  mode=BACKTRACK).matched())
+
+    def test_optimized(self):
+        """Teste que les réécritures des opérateurs (voir
+        fre.optimize) ne changent pas le matching en mode
+        backtrack
+        """
+
+        rx = (op.a[0:1] | op.b) >> op.c
+        raw = seq(choice(repeat(char('a'), 0, 1), char('b')), char('c'))
+        self.assertEqual(2, match(rx, 'bc', mode=BACKTRACK).index)
+        self.assertEqual(2, match(raw, 'bc', mode=BACKTRACK).index)
+        self.assertEqual(2, re.match('(?:a?|b)c', 'bc').end())
+
+        rx = (op.a[1:] >> op.a) | (op.a[1:] >> op.b)
+        self.assertEqual(2, match(rx, 'aab', mode=BACKTRACK).index)
+        self.assertEqual(2, re.match('a+a|a+b', 'aab').end())
+
+        rnd = Random(119)
+
+        for _ in range(300):
+            pattern = random_pattern(rnd, 4)
+            optimized = optimize(pattern)
+
+            for _ in range(5):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randrange(8)))
+                self.assertEqual(match(pattern, inp, mode=BACKTRACK),
+                                 match(optimized, inp, mode=BACKTRACK))
+
+    def test_position(self):
+        """Teste pos et endpos en mode backtrack"""
+
+        rx = op.a[1:] >> op.a
+        self.assertEqual(4, match(rx, 'baaa', pos=1, mode=BACKTRACK).index)
+        self.assertFalse(match(rx, 'aaa', endpos=1, mode=BACKTRACK).matched())
+        self.assertIs(backtrack(rx), backtrack(rx))
+
+    def test_re(self):
+        """Compare le mode backtrack au module re"""
+
+        rnd = Random(19)
+
+        for _ in range(500):
+            pattern = node(random_pattern(rnd, 4))
+
+            if _empty_loop(pattern):
+                continue
+
+            regex = re.compile(_Translator(False).translate(pattern))
+            bounded = compile(pattern, memo_size=8)
+
+            for _ in range(5):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randrange(8)))
+                expected = regex.match(inp)
+                result = match(pattern, inp, mode=BACKTRACK)
+                self.assertEqual(expected is not None, result.matched(),
+                                 (regex.pattern, inp))
+
+                if expected is not None:
+                    self.assertEqual(expected.end(), result.index)
+
+                self.assertEqual(regex.fullmatch(inp) is not None,
+                                 fullmatch(pattern, inp,
+                                           mode=BACKTRACK).matched())
+                # une table de mémorisation minuscule donne le même
+                # résultat
+                self.assertEqual(expected.end() if expected else -1,
+                                 bounded._at(inp, 0))
+
+    def test_pathological(self):
+        """Teste que les choix ambigus ne rendent pas le matching
+        exponentiel
+        """
+
+        rx = (op.a | op.a >> op.a)[0:] >> op.b
+        inp = 'a' * 2000
+        start = perf_counter()
+        self.assertFalse(match(rx, inp, mode=BACKTRACK).matched())
+        self.assertFalse(compile(rx, memo_size=16)._at(inp, 0) >= 0)
+        self.assertTrue(fullmatch(rx, inp + 'b', mode=BACKTRACK).matched())
+        self.assertLess(perf_counter() - start, 5)
+
+    def test_errors(self):
+        """Teste les combinaisons de paramètres invalides"""
+
+        with self.assertRaises(ValueError):
+            match(op.a, 'a', backend='dfa', mode=BACKTRACK)
+
+        with self.assertRaises(ValueError):
+            match(op.a, 'a', mode='lazy')
+
+        with self.assertRaises(TypeError):
+            fullmatch(op.a, b'a', mode=BACKTRACK)
+
+    def test_limit(self):
+        """Teste la limite de taille de l'automate : une
+        répétition bornée y est développée, pas une répétition
+        non bornée
+        """
+
+        rx = repeat(char('x'), 1, 10 ** 9)
+        self.assertEqual(3, match(rx, 'xxx').index)
+
+        with self.assertRaises(UnsupportedPatternError):
+            match(rx, 'xxx', mode=BACKTRACK)
+
+        with self.assertRaises(UnsupportedPatternError):
+            fullmatch(rx, 'xxx', mode=BACKTRACK)
+
+        self.assertEqual(3, match(op.x[1:], 'xxx', mode=BACKTRACK).index)
+
+
+if __name__ == '__main__':
+    main()
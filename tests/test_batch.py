@@ -0,0 +1,91 @@
+from random import Random
+from unittest import TestCase, main, skipIf
+from unittest.mock import patch
+
+import fre.batch
+import fre.opregex as op
+from fre.batch import match_many, fullmatch_many
+from fre.fnregex import match, fullmatch, literal, choice
+from test_fnregex import random_pattern
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+code = op.upper[2:2] >> op.minus >> op.digit[4:4]
+inputs = ['AB-1234', 'AB-123', 'ab-1234', 'XY-98765', '']
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class VectorTest(TestCase):
+
+    def test_many(self):
+        """Teste le matching vectorisé de champs à largeur fixe"""
+
+        self.assertEqual([True, False, False, False, False],
+                         fullmatch_many(code, inputs).tolist())
+        self.assertEqual([True, False, False, True, False],
+                         match_many(code, inputs).tolist())
+        self.assertEqual([True, False, False, True, False],
+                         match_many(code, iter(inputs)).tolist())
+
+    def test_arrays(self):
+        """Teste les tableaux NumPy de type U et S"""
+
+        self.assertEqual([True, False, False, False, False],
+                         fullmatch_many(code, np.array(inputs)).tolist())
+        data = np.array([s.encode() for s in inputs])
+        self.assertEqual(data.dtype.kind, 'S')
+        self.assertEqual([True, False, False, True, False],
+                         match_many(code, data).tolist())
+        grid = np.array([['AB-1234', 'x'], ['AB-12', 'CD-0000']])
+        self.assertEqual([[True, False], [False, True]],
+                         fullmatch_many(code, grid).tolist())
+
+    def test_fallback(self):
+        """Teste les FnRegex opaques, testées une à une"""
+
+        opaque = op.op(lambda m: m.ok() if m.not_end() else m.bad())
+        self.assertEqual([True, False],
+                         match_many(opaque >> op.a, ['xa', 'xb']).tolist())
+        self.assertEqual([True, False],
+                         fullmatch_many(code, [b'AB-1234', 'AB']).tolist())
+        self.assertEqual([True, False],
+                         fullmatch_many(code, ['AB-1234', 'AB-1234\0'])
+                         .tolist())
+
+    def test_random(self):
+        """Compare l'évaluation vectorisée au matching des FnRegex"""
+
+        rnd = Random(13)
+
+        for _ in range(200):
+            pattern = random_pattern(rnd, 4)
+
+            if rnd.random() < 0.2:
+                pattern = choice(literal('ab'), pattern, literal('abc'))
+
+            words = [''.join(rnd.choice('abcd')
+                             for _ in range(rnd.randint(0, 8)))
+                     for _ in range(30)]
+            self.assertEqual([match(pattern, w).matched() for w in words],
+                             match_many(pattern, words).tolist(), pattern)
+            self.assertEqual([fullmatch(pattern, w).matched() for w in words],
+                             fullmatch_many(pattern, words).tolist(), pattern)
+
+
+class ScalarTest(TestCase):
+
+    def test_without_numpy(self):
+        """Teste le repli sur des listes sans NumPy"""
+
+        with patch.object(fre.batch, 'np', None):
+            self.assertEqual([True, False, False, False, False],
+                             fullmatch_many(code, inputs))
+            self.assertEqual([True, True],
+                             match_many(code, [b'AB-1234', 'XY-98765']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.binary import binary, ByteSet, ByteLiteral
+from fre.fnregex import char, charinterval, charset, literal, match, \
+    fullmatch, search, findall, Char, CharInterval, Literal, FAIL
+from test_fnregex import random_pattern
+
+name = op.lower[1:10]
+email = name >> op.dot >> name >> op.at >> name >> op.dot >> name
+
+
+class ConstructorTest(TestCase):
+
+    def test_bytes(self):
+        """Teste la construction de FnRegex à partir d'octets"""
+
+        self.assertEqual(Char('a'), char(b'a'))
+        self.assertEqual(Char('a'), char(0x61))
+        self.assertEqual(CharInterval('\x00', '\x7f'),
+                         charinterval(b'\x00', b'\x7f'))
+        self.assertEqual(Literal('ab\xff'), literal(b'ab\xff'))
+        self.assertEqual(charset('abc'), charset(b'abc'))
+
+    def test_binary(self):
+        """Teste la traduction de l'arbre et sa mémorisation"""
+
+        tree = binary(email)
+        self.assertIs(tree, binary(email))
+        self.assertIs(tree, binary(tree))
+        self.assertIsInstance(binary(op.a), ByteSet)
+        self.assertIsInstance(binary(literal('ab')), ByteLiteral)
+
+
+class BinaryMatchTest(TestCase):
+
+    def test_match(self):
+        """Teste le matching de bytes, bytearray et memoryview"""
+
+        for data in (b'padget.pro@gmail.com!',
+                     bytearray(b'padget.pro@gmail.com!'),
+                     memoryview(b'padget.pro@gmail.com!')):
+            result = match(email, data)
+            self.assertEqual(20, result.index)
+            self.assertIs(data, result.value)
+            self.assertFalse(fullmatch(email, data).matched())
+            self.assertTrue(fullmatch(email, data, endpos=20).matched())
+
+    def test_latin1(self):
+        """Teste la correspondance entre octets et caractères
+        Latin-1
+        """
+
+        self.assertTrue(match(char('é'), 'é'.encode('latin-1')).matched())
+        self.assertFalse(match(char('é'), 'é'.encode('utf-8')).matched())
+        self.assertFalse(match(char('中'), b'\xe4').matched())
+        self.assertFalse(match(literal('中'), b'\xe4').matched())
+        self.assertEqual(2, match(~op.digit, b'\xff\x80', pos=1).index)
+
+    def test_slice(self):
+        """Teste le matching d'une partie d'un buffer avec des
+        indices dans le buffer d'origine
+        """
+
+        data = bytearray(b'id=12 code=345')
+        result = match(op.digit[1:], data, pos=3)
+        self.assertEqual((3, 5), (result.start, result.index))
+        self.assertEqual(4, match(op.digit[1:], data, pos=3, endpos=4).index)
+        self.assertEqual(14, search(op.digit[1:], data, 6).index)
+        self.assertFalse(search(op.digit[1:], data, 6, 10).matched())
+        self.assertEqual([b'12', b'345'], findall(op.digit[1:], data))
+        self.assertEqual([b'12', b'345'],
+                         [bytes(m) for m in findall(op.digit[1:],
+                                                    memoryview(data))])
+        self.assertEqual(11, search(literal(b'345'), memoryview(data)).start)
+
+    def test_literal(self):
+        """Teste le matching d'un littéral sans découpage de
+        l'input
+        """
+
+        class Unsliced(bytes):
+            def __getitem__(self, key):
+                if isinstance(key, slice):
+                    raise AssertionError('input sliced')
+
+                return super().__getitem__(key)
+
+        tree = binary(literal('345'))
+
+        for data in (Unsliced(b'id=12 code=345'),
+                     bytearray(b'id=12 code=345'),
+                     memoryview(b'id=12 code=345')):
+            self.assertEqual(14, tree._at(data, 11))
+            self.assertEqual(FAIL, tree._at(data, 12))
+            self.assertEqual(FAIL, tree._at(data, 14))
+            self.assertEqual(FAIL, tree._at(data, 20))
+
+        self.assertEqual(14, match(op.op(literal('code=')) >> op.digit[1:],
+                                   Unsliced(b'id=12 code=345'), pos=6).index)
+
+    def test_backend(self):
+        """Teste le refus des inputs binaires par les backends"""
+
+        with self.assertRaises(TypeError):
+            match(op.a, b'a', 'dfa')
+
+    def test_random(self):
+        """Compare le matching d'un input binaire à celui de la
+        str correspondante
+        """
+
+        rnd = Random(12)
+
+        for _ in range(300):
+            pattern = random_pattern(rnd, 4)
+
+            for _ in range(10):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                data = inp.encode('latin-1')
+                self.assertEqual(match(pattern, inp).index,
+                                 match(pattern, data).index)
+                self.assertEqual(match(pattern, inp).matched(),
+                                 match(pattern, memoryview(data)).matched())
+                self.assertEqual(fullmatch(pattern, inp).matched(),
+                                 fullmatch(pattern, data).matched())
+                self.assertEqual(findall(pattern, inp),
+                                 [m.decode('latin-1')
+                                  for m in findall(pattern, data)])
+
+
+if __name__ == '__main__':
+    main()
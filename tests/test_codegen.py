@@ -0,0 +1,125 @@
+from functools import reduce
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import fre.opregex as op
+from fre.codegen import compile, generate, key
+from fre.fnregex import char, charinterval, charset, literal, seq, choice, \
+    repeat, match, fullmatch, MatchResult, UnsupportedPatternError
+from test_fnregex import random_pattern
+
+
+class CodegenTest(TestCase):
+
+    def test_email(self):
+        """Teste la compilation d'une regex d'email"""
+
+        name = op.lower[1:10]
+        email = compile(name >> ((op.dot >> name)[0:1]) >> op.at >> name >>
+                        op.dot >> name)
+        self.assertEqual(20, email.match('padget.pro@gmail.com!').index)
+        self.assertTrue(email.match('padget@gmail.com').matched())
+        self.assertFalse(email.match('padget.pro!gmail.com').matched())
+        self.assertTrue(email.fullmatch('padget.pro@gmail.com').matched())
+        self.assertFalse(email.fullmatch('padget.pro@gmail.com!').matched())
+        self.assertIn('def ', email.source)
+
+    def test_fnregex(self):
+        """Teste qu'une forme générée s'utilise comme une FnRegex"""
+
+        digits = compile(op.digit[1:3])
+        self.assertEqual(3, digits(MatchResult.input('1234')).index)
+        self.assertEqual(4, (op.op(digits) >> op.a)(
+            MatchResult('x12a', 1)).index)
+        self.assertFalse(digits(MatchResult.input('a')).matched())
+
+    def test_nodes(self):
+        """Teste la génération de chaque type de noeud"""
+
+        self.assertEqual(3, compile(literal('abc')).match('abcd').index)
+        self.assertEqual(0, compile(literal('')).match('abc').index)
+        self.assertFalse(compile(choice()).match('abc').matched())
+        self.assertEqual(0, compile(seq()).match('abc').index)
+        wide = charset(charinterval('a', 'z'), charinterval('à', '中'),
+                       charinterval('0', '9'))
+        self.assertEqual(3, compile(op.op(wide)[0:]).match('a一é!').index)
+        self.assertEqual(2, compile(op.op(charset('aeiouy'))[1:])
+                         .match('ay!').index)
+        self.assertFalse(compile(repeat(char('a'), 3, 2)).match('aaa')
+                         .matched())
+
+    def test_deep(self):
+        """Teste la génération d'un arbre très profond"""
+
+        deep = reduce(lambda acc, _: choice(seq(char('a'), acc), char('b')),
+                      range(500), char('z'))
+        self.assertEqual(match(deep, 'a' * 500 + 'z'),
+                         compile(deep).match('a' * 500 + 'z'))
+        self.assertEqual(match(deep, 'a' * 300 + 'b'),
+                         compile(deep).match('a' * 300 + 'b'))
+
+        deeper = reduce(lambda acc, _: seq(char('a'), choice(acc, char('b'))),
+                        range(3000), char('z'))
+
+        inp = 'a' * 3000 + 'z'
+
+        with TemporaryDirectory() as cache_dir:
+            self.assertEqual(match(deeper, inp),
+                             compile(deeper, cache_dir).match(inp))
+            self.assertEqual(match(deeper, inp),
+                             compile(deeper, cache_dir).match(inp))
+
+    def test_unsupported(self):
+        """Teste le refus des FnRegex opaques"""
+
+        with self.assertRaises(UnsupportedPatternError):
+            generate(seq(char('a'), lambda m: m))
+
+    def test_random(self):
+        """Compare le code généré au matching des FnRegex sur
+        des expressions aléatoires
+        """
+
+        rnd = Random(9)
+
+        for _ in range(300):
+            pattern = random_pattern(rnd, 4)
+            generated = compile(pattern)
+
+            for _ in range(20):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                self.assertEqual(match(pattern, inp), generated.match(inp),
+                                 (pattern, inp))
+                self.assertEqual(fullmatch(pattern, inp),
+                                 generated.fullmatch(inp))
+
+
+class CacheTest(TestCase):
+
+    def test_cache(self):
+        """Teste que le cache disque évite une seconde génération"""
+
+        pattern = op.lower[1:] >> op.digit[0:3]
+
+        with TemporaryDirectory() as cache_dir:
+            first = compile(pattern, cache_dir)
+
+            with patch('fre.codegen.generate',
+                       side_effect=AssertionError('not cached')):
+                second = compile(pattern, cache_dir)
+
+            self.assertEqual(first.source, second.source)
+            self.assertEqual(4, second.match('abc1!').index)
+
+    def test_key(self):
+        """Teste que la clé du cache dépend de l'arbre"""
+
+        self.assertEqual(key(op.a >> op.b), key(literal('ab')))
+        self.assertNotEqual(key(op.a[1:3]), key(op.a[1:4]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.analysis import is_deterministic
+from fre.dfa import compile
+from fre.fnregex import char, charinterval, seq, repeat, match, \
+    fullmatch, MatchResult, UnsupportedPatternError
+from test_fnregex import random_pattern
+
+
+class DFATest(TestCase):
+
+    def test_email(self):
+        """Teste la compilation d'une regex d'email"""
+
+        name = op.lower[1:10]
+        email = compile(name >> op.dot >> name >> op.at >> name >>
+                        op.dot >> name)
+        self.assertTrue(email.match('padget.pro@gmail.com').matched())
+        self.assertEqual(20, email.match('padget.pro@gmail.com!').index)
+        self.assertFalse(email.match('padget.pro!gmail.com').matched())
+        self.assertTrue(email.fullmatch('padget.pro@gmail.com').matched())
+        self.assertFalse(email.fullmatch('padget.pro@gmail.com!').matched())
+        self.assertFalse(email.fullmatch('').matched())
+
+    def test_fnregex(self):
+        """Teste qu'un DFA s'utilise comme une FnRegex"""
+
+        dfa = compile(op.digit[1:3])
+        self.assertEqual(3, dfa(MatchResult.input('1234')).index)
+        self.assertEqual(4, (op.op(dfa) >> op.a)(
+            MatchResult('x12a', 1)).index)
+        self.assertFalse(dfa(MatchResult.input('a')).matched())
+
+    def test_empty(self):
+        """Teste les expressions vides ou ne matchant jamais"""
+
+        self.assertTrue(compile(op.a[0:3]).match('').matched())
+        self.assertTrue(compile(op.a[0:3]).fullmatch('').matched())
+        self.assertFalse(compile(repeat(op.a, 3, 2)).match('aaa').matched())
+        self.assertFalse(compile(charinterval('z', 'a')).match('m').matched())
+
+    def test_unicode(self):
+        """Teste les caractères au delà de la table d'indexation"""
+
+        dfa = compile(op.op(charinterval('à', '\U0001f600'))[1:] >> op.a)
+        self.assertTrue(dfa.fullmatch('é\U0001f600中a').matched())
+        self.assertFalse(dfa.fullmatch('\U0001f601a').matched())
+        self.assertTrue(compile(op.a[1:]).fullmatch('aaa').matched())
+        self.assertFalse(compile(op.a[1:]).fullmatch('aa中').matched())
+
+    def test_unsupported(self):
+        """Teste le refus des expressions non déterministes"""
+
+        with self.assertRaises(UnsupportedPatternError):
+            compile(op.a[1:] >> op.a)
+
+        with self.assertRaises(UnsupportedPatternError):
+            compile(seq(char('a'), lambda m: m))
+
+    def test_same_as_fnregex(self):
+        """Compare le DFA au matching des FnRegex sur des
+        expressions et des inputs aléatoires
+        """
+
+        rnd = Random(42)
+        tested = 0
+
+        while tested < 300:
+            pattern = random_pattern(rnd, 4)
+
+            if not is_deterministic(pattern):
+                continue
+
+            tested += 1
+            dfa = compile(pattern)
+
+            for _ in range(10):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                expected = match(pattern, inp)
+                self.assertEqual(expected.matched(),
+                                 dfa.match(inp).matched(), (pattern, inp))
+
+                if expected.matched():
+                    self.assertEqual(expected.index, dfa.match(inp).index,
+                                     (pattern, inp))
+
+                self.assertEqual(fullmatch(pattern, inp).matched(),
+                                 dfa.fullmatch(inp).matched(), (pattern, inp))
+
+
+class LazyDFATest(TestCase):
+
+    def test_large_pattern(self):
+        """Teste une expression dont le DFA complet serait gros"""
+
+        block = op.digit[1:64]
+        rx = block >> op.minus >> block >> op.minus >> block
+        dfa = compile(rx, lazy=True)
+        inp = '1' * 64 + '-' + '2' * 30 + '-' + '3'
+        self.assertTrue(dfa.fullmatch(inp).matched())
+        self.assertFalse(dfa.fullmatch('1' * 65 + '-2-3').matched())
+        self.assertEqual(match(rx, inp + 'x').index,
+                         dfa.match(inp + 'x').index)
+        self.assertLessEqual(dfa.states, dfa.cache_size)
+
+    def test_bounded_cache(self):
+        """Teste que le cache reste borné et que le matching
+        reste correct lorsqu'il est vidé ou abandonné
+        """
+
+        rx = (op.a >> op.b[0:1] >> op.c[0:1])[1:]
+        dfa = compile(rx, lazy=True, cache_size=2)
+        inp = 'abcacab' * 20
+        self.assertEqual(match(rx, inp).index, dfa.match(inp).index)
+        self.assertTrue(dfa.fullmatch(inp).matched())
+        self.assertLessEqual(dfa.states, 2)
+        self.assertGreater(dfa.flushes, 0)
+        self.assertGreater(dfa.fallbacks, 0)
+
+    def test_same_as_fnregex(self):
+        """Compare le LazyDFA au matching des FnRegex sur des
+        expressions et des inputs aléatoires
+        """
+
+        rnd = Random(7)
+        tested = 0
+
+        while tested < 200:
+            pattern = random_pattern(rnd, 4)
+
+            if not is_deterministic(pattern):
+                continue
+
+            tested += 1
+            dfa = compile(pattern, lazy=True, cache_size=rnd.randint(1, 8))
+
+            for _ in range(10):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                expected = match(pattern, inp)
+                self.assertEqual(expected.matched(),
+                                 dfa.match(inp).matched(), (pattern, inp))
+
+                if expected.matched():
+                    self.assertEqual(expected.index, dfa.match(inp).index,
+                                     (pattern, inp))
+
+                self.assertEqual(fullmatch(pattern, inp).matched(),
+                                 dfa.fullmatch(inp).matched(), (pattern, inp))
+
+    def test_nondeterministic(self):
+        """Teste une suite de digit[1:64], qui n'est pas
+        déterministe, et la compare au matching des FnRegex
+        """
+
+        rx = op.digit[1:64] >> op.digit[1:64]
+        self.assertFalse(is_deterministic(rx))
+        self.assertEqual(match(rx, '1234'), match(rx, '1234',
+                                                  backend='lazydfa'))
+        rx = op.digit[1:3] >> op.digit[1:64] >> op.minus >> op.digit[1:64]
+        dfa = compile(rx, lazy=True)
+        self.assertEqual(2, len(dfa.parts))
+        self.assertEqual(match(rx, '12345-6789x'), dfa.match('12345-6789x'))
+        self.assertTrue(dfa.fullmatch('1' * 60 + '-2').matched())
+        self.assertFalse(dfa.fullmatch('123').matched())
+
+        with self.assertRaises(UnsupportedPatternError):
+            compile(rx)
+
+        with self.assertRaises(UnsupportedPatternError):
+            compile(seq(char('a'), lambda m: m), lazy=True)
+
+    def test_random_nondeterministic(self):
+        """Compare l'enchainement de LazyDFA au matching des
+        FnRegex sur des expressions aléatoires non déterministes
+        """
+
+        rnd = Random(11)
+        tested = 0
+
+        while tested < 200:
+            pattern = random_pattern(rnd, 4)
+
+            if is_deterministic(pattern):
+                continue
+
+            tested += 1
+            dfa = compile(pattern, lazy=True, cache_size=rnd.randint(1, 8))
+
+            for _ in range(10):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                self.assertEqual(match(pattern, inp).index,
+                                 dfa.match(inp).index, (pattern, inp))
+                self.assertEqual(fullmatch(pattern, inp).matched(),
+                                 dfa.fullmatch(inp).matched(), (pattern, inp))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from fre.files import store
+
+
+class FilesTest(TestCase):
+
+    def test_store(self):
+        """Teste l'écriture et le remplacement d'un fichier"""
+
+        with TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, 'data')
+            store(path, b'first')
+            store(path, b'second')
+
+            with open(path, 'rb') as f:
+                self.assertEqual(b'second', f.read())
+
+            self.assertEqual(['data'], os.listdir(cache_dir))
+
+    def test_failure(self):
+        """Teste qu'une écriture interrompue ne laisse ni fichier
+        temporaire ni fichier incomplet
+        """
+
+        with TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, 'data')
+            store(path, b'first')
+
+            with patch('fre.files.os.replace', side_effect=OSError):
+                with self.assertRaises(OSError):
+                    store(path, b'second')
+
+            with open(path, 'rb') as f:
+                self.assertEqual(b'first', f.read())
+
+            self.assertEqual(['data'], os.listdir(cache_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,15 @@
+from dataclasses import FrozenInstanceError
+from functools import reduce
+from random import Random
+from sys import maxsize
 from unittest import TestCase, main
 
-from fre.fnregex import repeat, char, MatchResult, charinterval, seq, choice
+import fre.fnregex
+from fre.fnregex import repeat, char, MatchResult, charinterval, seq, choice, \
+    Seq, Repeat, Choice, CharInterval, Char, Function, FullMatchResult, \
+    match, fullmatch, charset, CharSet, UnsupportedPatternError, search, \
+    finditer, findall, group, Group, GroupMatchResult
+from fre.optimize import rewrite
 
 
 def initial(inp: str) -> MatchResult:
@@ -46,6 +55,18 @@ class RepeatTest(TestCase):
                         'on teste le cas on l\'on est sur le max')
         self.assertTrue(rep(initial('aaaaa')).matched(),
                         'on teste le cas d\'un depassement d\'interval')
+        self.assertEqual(4, rep(initial('aaaaa')).index,
+                         'on teste que le max est bien inclus et respecté')
+
+    def test_repeat_empty_case(self):
+        """Teste qu'une répétition d'une FnRegex pouvant matcher
+        vide ne boucle pas indéfiniment
+        """
+
+        rep = repeat(repeat(char('a'), 0, 2), 0, 10)
+        self.assertTrue(rep(initial('b')).matched())
+        self.assertEqual(0, rep(initial('b')).index)
+        self.assertEqual(3, rep(initial('aaab')).index)
 
     def test_repeat_complex_case(self):
         """Teste si une simple répétition de CharInterval
@@ -121,5 +142,327 @@ class ChoiceTest(TestCase):
         self.assertFalse(cho(initial('')).matched())
 
 
+class CharSetTest(TestCase):
+
+    def test_charset(self):
+        """Teste l'appartenance à un ensemble de caractères"""
+
+        cs = charset('xyz', charinterval('a', 'f'), char('\u4e2d'))
+        self.assertEqual(CharSet(((97, 102), (120, 122), (0x4e2d, 0x4e2d))),
+                         cs)
+        self.assertTrue(cs(initial('c')).matched())
+        self.assertTrue(cs(initial('\u4e2d')).matched())
+        self.assertFalse(cs(initial('g')).matched())
+        self.assertFalse(cs(initial('\u4e2e')).matched())
+        self.assertFalse(cs(initial('')).matched())
+        self.assertEqual(5, match(repeat(cs, 1, maxsize), 'ax\u4e2dfbg').index)
+        self.assertEqual(3, match(repeat(charset('ab'), 0, 3), 'abab').index)
+
+    def test_operations(self):
+        """Teste les opérations ensemblistes"""
+
+        letters = charset(charinterval('a', 'z'))
+        vowels = charset('aeiouy')
+        self.assertEqual(charset('abcdefghijklmnopqrstuvwxyz'),
+                         vowels.union(letters))
+        self.assertEqual(vowels, letters.intersection(vowels))
+        self.assertNotIn('a', letters.difference(vowels))
+        self.assertIn('b', letters.difference(vowels))
+        self.assertNotIn('a', letters.negate())
+        self.assertIn('\U0001f600', letters.negate())
+        self.assertEqual(letters, letters.negate().negate())
+        self.assertEqual(CharSet(()), letters.difference(letters))
+
+        with self.assertRaises(UnsupportedPatternError):
+            charset(seq(char('a'), char('b')))
+
+
+class SearchTest(TestCase):
+
+    def test_search(self):
+        """Teste la recherche d'une correspondance dans un input"""
+
+        rx = seq(char('i'), char('d'), char('='),
+                 repeat(charinterval('0', '9'), 1, maxsize))
+        found = search(rx, 'user=bob id=42 ok')
+        self.assertTrue(found.matched())
+        self.assertEqual((9, 14), (found.start, found.index))
+        self.assertFalse(search(rx, 'user=bob id=x').matched())
+        self.assertFalse(search(rx, '').matched())
+        self.assertEqual(13, search(rx, 'id=1 id=x ok id=3', 4).start)
+
+    def test_finditer(self):
+        """Teste l'itération sur les correspondances successives"""
+
+        number = repeat(charinterval('0', '9'), 1, maxsize)
+        self.assertEqual([(0, 2), (3, 6), (10, 11)],
+                         [(m.start, m.index)
+                          for m in finditer(number, '12 345 ab 6')])
+        word = repeat(choice(char('a'), char('b'), char('c')), 1, 2)
+        self.assertEqual(['ab', 'ca', 'b', 'c'], findall(word, 'abcab-c'))
+
+    def test_empty_matches(self):
+        """Teste les correspondances vides, comme pour re.findall"""
+
+        self.assertEqual(['aa', '', 'a', ''],
+                         findall(repeat(char('a'), 0, maxsize), 'aaba'))
+        self.assertEqual([''], findall(repeat(char('a'), 0, 3), ''))
+
+    def test_opaque(self):
+        """Teste la recherche avec une FnRegex opaque"""
+
+        digit = lambda m: m.ok() if m.not_end() and m.char().isdigit() \
+            else m.bad()
+        self.assertEqual(['1', '2'], findall(seq(digit), 'a1b2'))
+
+
+class NodeTest(TestCase):
+
+    def test_tree(self):
+        """Teste que les constructeurs produisent un arbre
+        inspectable et comparable
+        """
+
+        rx = seq(char('a'), repeat(charinterval('0', '9'), 1, 3),
+                 choice(char('b'), char('c')))
+        self.assertEqual(Seq((Char('a'),
+                              Repeat(CharInterval('0', '9'), 1, 3),
+                              Choice((Char('b'), Char('c'))))), rx)
+        same = seq(char('a'), repeat(charinterval('0', '9'), 1, 3),
+                   choice(char('b'), char('c')))
+        self.assertEqual(rx, same)
+        self.assertEqual(hash(rx), hash(same))
+        self.assertEqual(3, rx.items[1].stop)
+
+    def test_immutable(self):
+        """Teste qu'un noeud ne peut pas être modifié"""
+
+        with self.assertRaises(FrozenInstanceError):
+            char('a').c = 'b'
+
+    def test_opaque_fnregex(self):
+        """Teste qu'une FnRegex quelconque peut toujours être
+        composée avec les noeuds
+        """
+
+        any_char = lambda m: m.ok() if m.not_end() else m.bad()
+        rx = seq(char('a'), any_char, char('c'))
+        self.assertEqual(Function(any_char), rx.items[1])
+        self.assertTrue(rx(initial('abc')).matched())
+        self.assertFalse(rx(initial('ab')).matched())
+        self.assertTrue(fullmatch(any_char, 'a').matched())
+
+
+class MatchResultTest(TestCase):
+
+    def test_match(self):
+        """Teste les résultats construits par match et fullmatch"""
+
+        rx = repeat(charinterval('a', 'z'), 1, 3)
+        self.assertEqual(MatchResult('abcd', 3), match(rx, 'abcd'))
+        self.assertEqual(MatchResult('1', 0, False), match(rx, '1'))
+        self.assertTrue(fullmatch(rx, 'abc').matched())
+        self.assertFalse(fullmatch(rx, 'abcd').matched())
+        self.assertEqual(FullMatchResult(MatchResult('ab', 2)),
+                         fullmatch(rx, 'ab'))
+
+    def test_slots(self):
+        """Teste que les résultats sont des objets compacts
+        et immuables
+        """
+
+        mr = MatchResult('abc', 1)
+        self.assertFalse(hasattr(mr, '__dict__'))
+        self.assertFalse(hasattr(FullMatchResult(mr), '__dict__'))
+        self.assertEqual("MatchResult(value='abc', index=1, match=True, "
+                         "start=0)", repr(mr))
+        self.assertEqual(hash(MatchResult('abc', 1)), hash(mr))
+
+        with self.assertRaises(FrozenInstanceError):
+            mr.index = 2
+
+
+class GroupTest(TestCase):
+
+    date = seq(group(repeat(charinterval('0', '9'), 4, 4), 'year'), char('-'),
+               group(repeat(charinterval('0', '9'), 2, 2), 'month'),
+               repeat(group(seq(char('-'), group(
+                   repeat(charinterval('0', '9'), 2, 2)))), 0, 1))
+
+    def test_spans(self):
+        """Teste les positions et sous-chaines des groupes"""
+
+        m = match(self.date, '2024-05-17xx')
+        self.assertEqual(((0, 4), (5, 7), (7, 10), (8, 10)), m.spans)
+        self.assertEqual((0, 10), m.span())
+        self.assertEqual('2024-05-17', m.group())
+        self.assertEqual(('2024', '05', '-17', '17'), m.groups())
+        self.assertEqual({'year': '2024', 'month': '05'}, m.groupdict())
+        self.assertEqual((5, 7), m.span('month'))
+        self.assertEqual(('2024', '05', None, None),
+                         fullmatch(self.date, '2024-05').groups())
+        self.assertIsNone(fullmatch(self.date, '2024-05-1').group(1))
+
+        with self.assertRaises(IndexError):
+            m.group(5)
+
+        with self.assertRaises(IndexError):
+            m.group('day')
+
+    def test_rollback(self):
+        """Teste que les groupes d'une branche ou d'une itération
+        qui échoue sont oubliés
+        """
+
+        rx = choice(seq(group(char('a')), char('b')), char('a'))
+        self.assertEqual((None,), match(rx, 'ac').groups())
+        rx = repeat(seq(group(char('a')), char('b')), 0, maxsize)
+        self.assertEqual((2, 3), match(rx, 'ababa').span(1))
+        # les groupes d'un même nom désignent celui qui a matché
+        rx = choice(group(char('a'), 'x'), group(char('b'), 'x'))
+        self.assertEqual('b', match(rx, 'b').group('x'))
+        self.assertEqual((None, 'b'), match(rx, 'b').groups())
+
+    def test_numbering(self):
+        """Teste la numérotation des occurrences d'un groupe
+        partagé
+        """
+
+        digits = group(repeat(charinterval('0', '9'), 1, maxsize))
+        rx = seq(digits, char('.'), digits)
+        self.assertEqual(('12', '345'), match(rx, '12.345').groups())
+        self.assertEqual(['1', '22'], [m.group(1) for m in
+                                       finditer(digits, 'a1b22')])
+
+    def test_no_copy(self):
+        """Teste que les groupes d'un input binaire sont des vues"""
+
+        data = bytearray(b'2024-05')
+        m = match(self.date, memoryview(data))
+        self.assertEqual(b'05', bytes(m.group('month')))
+        self.assertIsInstance(m, GroupMatchResult)
+        self.assertEqual(type(match(char('a'), 'a')), MatchResult)
+
+    def test_random(self):
+        """Compare les groupes au matching de leur contenu"""
+
+        rnd = Random(20)
+
+        for _ in range(300):
+            rx = rewrite(random_pattern(rnd, 4), lambda n: Group(n)
+                         if rnd.random() < 0.3 else n)
+
+            for _ in range(5):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                m = match(rx, inp)
+                self.assertEqual(rx._at(inp, 0), m.index if m.matched()
+                                 else -1)
+
+                for n, span in zip(_groups(rx), m.spans):
+                    if span is not None:
+                        self.assertEqual(span[1], n._at(inp, span[0]))
+
+
+def _groups(n):
+    """Groupes de n dans l'ordre de leurs numéros"""
+
+    found = []
+    stack = [n]
+
+    while stack:
+        n = stack.pop()
+
+        if isinstance(n, Group):
+            found.append(n.re)
+            stack.append(n.re)
+        elif isinstance(n, (Seq, Choice)):
+            stack.extend(reversed(n.items))
+        elif isinstance(n, Repeat):
+            stack.append(n.re)
+
+    return found
+
+
+class LongInputTest(TestCase):
+    """Teste que le matching ne dépend pas de la profondeur de
+    la pile d'appels python
+    """
+
+    size = 10 ** 6
+
+    def test_repeat_char(self):
+        rep = repeat(charinterval('a', 'z'), 1, maxsize)
+        self.assertEqual(self.size, match(rep, 'a' * self.size).index)
+        self.assertEqual(self.size, match(repeat(char('a'), 0, maxsize),
+                                          'a' * self.size + 'b').index)
+
+    def test_repeat_seq(self):
+        rep = repeat(seq(char('a'), char('b')), 1, maxsize)
+        self.assertEqual(self.size, match(rep, 'ab' * (self.size // 2)).index)
+
+    def test_repeat_choice(self):
+        rep = repeat(choice(char('a'), char('b')), 1, maxsize)
+        self.assertTrue(fullmatch(rep, 'ab' * (self.size // 2)).matched())
+
+    def test_deep_seq(self):
+        rx = reduce(seq, (char(c) for c in 'ab' * 5000))
+        self.assertTrue(fullmatch(rx, 'ab' * 5000).matched())
+        self.assertFalse(fullmatch(rx, 'ab' * 4999 + 'aa').matched())
+
+    def test_deep_choice(self):
+        rx = reduce(lambda acc, c: choice(char(chr(c)), acc),
+                    range(0x100, 0x100 + 5000), char('z'))
+        self.assertTrue(match(rx, chr(0x100)).matched())
+        self.assertFalse(match(rx, 'a').matched())
+
+    def test_deep_repeat(self):
+        rx = reduce(lambda acc, _: repeat(acc, 0, 2), range(1500), char('a'))
+        rx = seq(rx, char('b'))
+        self.assertEqual(4, match(rx, 'aaab').index)
+
+    def test_explicit_stack(self):
+        """Compare l'exécution avec pile explicite à l'exécution
+        récursive sur des expressions aléatoires
+        """
+
+        rnd = Random(3)
+        patterns = [random_pattern(rnd, 4) for _ in range(300)]
+        inputs = [''.join(rnd.choice('abcd') for _ in range(rnd.randint(0, 8)))
+                  for _ in range(20)]
+        expected = [[match(p, inp) for inp in inputs] for p in patterns]
+        depth = fre.fnregex.MAX_DEPTH
+
+        try:
+            fre.fnregex.MAX_DEPTH = 1
+            self.assertEqual(expected, [[match(p, inp) for inp in inputs]
+                                        for p in patterns])
+        finally:
+            fre.fnregex.MAX_DEPTH = depth
+
+
+def random_pattern(rnd: Random, depth: int):
+    """Construit aléatoirement une FnRegex sur l'alphabet abcd"""
+
+    if depth == 0 or rnd.random() < 0.3:
+        if rnd.random() < 0.7:
+            return char(rnd.choice('abc'))
+
+        first, last = sorted(rnd.sample('abcd', 2))
+        return charinterval(first, last)
+
+    kind = rnd.random()
+    items = [random_pattern(rnd, depth - 1) for _ in range(rnd.randint(1, 3))]
+
+    if kind < 0.35:
+        return seq(*items)
+    elif kind < 0.7:
+        return choice(*items)
+    else:
+        start = rnd.randint(0, 2)
+        stop = rnd.choice([start, start + 1, start + 2, maxsize])
+        return repeat(items[0], start, stop)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,67 @@
+import gc
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import fre.opregex as op
+from fre.fnregex import node, seq, repeat, choice, char, literal
+from fre.interning import intern, interned
+
+
+class InterningTest(TestCase):
+
+    def test_intern(self):
+        """Teste le partage des arbres de même structure"""
+
+        left = seq(repeat(char('a'), 1, 3), choice(literal('xy'), char('z')))
+        right = seq(repeat(char('a'), 1, 3), choice(literal('xy'), char('z')))
+        self.assertIsNot(left, right)
+        self.assertIs(intern(left), intern(right))
+        self.assertIs(intern(left).items[0], intern(repeat(char('a'), 1, 3)))
+        self.assertIsNot(intern(left), intern(seq(repeat(char('a'), 1, 4),
+                                                  char('z'))))
+
+    def test_cached(self):
+        """Teste que l'arbre canonique d'une racine n'est calculé
+        qu'au premier appel
+        """
+
+        canonical = intern(seq(char('a'), literal('bc')))
+        other = seq(char('a'), literal('bc'))
+        self.assertIs(canonical, intern(other))
+
+        with patch('fre.interning._intern',
+                   side_effect=AssertionError('not cached')):
+            self.assertIs(canonical, intern(other))
+            self.assertIs(canonical, intern(canonical))
+
+    def test_operators(self):
+        """Teste l'internement des arbres construits par opérateurs"""
+
+        self.assertIs(node(op.lower[1:] >> op.at >> op.lower[1:]),
+                      node(op.lower[1:] >> op.at >> op.lower[1:]))
+
+    def test_hash(self):
+        """Teste le hash structurel, calculé sans récursion"""
+
+        deep = char('a')
+
+        for _ in range(5000):
+            deep = seq(char('b'), deep)
+
+        self.assertEqual(hash(seq(char('b'), deep)),
+                         hash(seq(char('b'), deep)))
+        self.assertIs(intern(deep).items[1].items[1], intern(deep.items[1]
+                                                             .items[1]))
+
+    def test_weak(self):
+        """Teste le retrait des arbres qui ne sont plus utilisés"""
+
+        gc.collect()
+        size = interned()
+        intern(seq(literal('unused'), repeat(literal('tree'), 0, 9)))
+        gc.collect()
+        self.assertEqual(size, interned())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import io
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.analysis import is_deterministic
+from fre.fnregex import match, literal, charset, UnsupportedPatternError
+from fre.lexer import Lexer, LexError, Token
+from test_fnregex import random_pattern
+
+rules = [('if', op.op(literal('if'))), ('name', op.lower[1:]),
+         ('number', op.digit[1:]), ('eq', op.eq),
+         ('space', op.op(charset(' \n'))[1:])]
+source = 'if x = 12\nifx=3'
+tokens = [Token('if', 0, 2), Token('name', 3, 4), Token('eq', 5, 6),
+          Token('number', 7, 9), Token('name', 10, 13), Token('eq', 13, 14),
+          Token('number', 14, 15)]
+
+
+def reference(lexer_rules, inp: str) -> list:
+    """Découpage naïf : chaque règle est testée à chaque position"""
+
+    found, pos = [], 0
+
+    while pos < len(inp):
+        ends = [match(fnrx, inp, pos=pos) for _, fnrx in lexer_rules]
+        end = max((m.index for m in ends if m.matched()), default=pos)
+
+        if end == pos:
+            return found + [pos]
+
+        rank = next(i for i, m in enumerate(ends)
+                    if m.matched() and m.index == end)
+        found.append(Token(lexer_rules[rank][0], pos, end))
+        pos = end
+
+    return found
+
+
+class LexerTest(TestCase):
+
+    def test_tokenize(self):
+        """Teste le découpage le plus long et la priorité des
+        règles
+        """
+
+        lexer = Lexer(rules, ignore=['space'])
+        self.assertEqual(tokens, list(lexer.tokenize(source)))
+        self.assertEqual([Token('name', 3, 4)],
+                         list(lexer.tokenize(source, 3, 4)))
+        self.assertEqual(3, len(list(Lexer(rules).tokenize('if x'))))
+
+    def test_errors(self):
+        """Teste les positions sans token et les règles non
+        déterministes
+        """
+
+        with self.assertRaises(LexError) as error:
+            list(Lexer(rules).tokenize('if ?'))
+
+        self.assertEqual(3, error.exception.pos)
+
+        with self.assertRaises(UnsupportedPatternError):
+            Lexer([('bad', op.a[1:] >> op.a)])
+
+    def test_stream(self):
+        """Teste le découpage d'un flux, les tokens étant à
+        cheval sur plusieurs morceaux
+        """
+
+        lexer = Lexer(rules, ignore=['space'])
+
+        for size in (1, 2, 5, 100):
+            self.assertEqual(tokens, list(lexer.tokenize_stream(
+                io.StringIO(source), chunk_size=size)))
+            self.assertEqual(tokens, list(lexer.tokenize_stream(
+                source.encode('utf-8'), chunk_size=size)))
+
+        with self.assertRaises(LexError) as error:
+            list(lexer.tokenize_stream(['if x', ' ?'], chunk_size=1))
+
+        self.assertEqual(5, error.exception.pos)
+
+    def test_random(self):
+        """Compare le Lexer au découpage naïf"""
+
+        rnd = Random(22)
+
+        for _ in range(200):
+            lexer_rules, count = [], rnd.randint(1, 5)
+
+            while len(lexer_rules) < count:
+                fnrx = random_pattern(rnd, 3)
+
+                if is_deterministic(fnrx):
+                    lexer_rules.append((str(len(lexer_rules)), fnrx))
+
+            lexer = Lexer(lexer_rules)
+
+            for _ in range(5):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 10)))
+                expected = reference(lexer_rules, inp)
+                found = []
+
+                try:
+                    found.extend(lexer.tokenize(inp))
+                except LexError as error:
+                    found.append(error.pos)
+
+                self.assertEqual(expected, found)
+
+
+if __name__ == '__main__':
+    main()
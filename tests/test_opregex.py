@@ -1,7 +1,9 @@
 from unittest import TestCase, main
 
 import fre.opregex as op
-from fre.fnregex import MatchResult
+from fre.fnregex import MatchResult, seq, char, choice, repeat, \
+    charinterval, charset, literal, CharSet, Choice, UnsupportedPatternError, \
+    match, fullmatch
 
 
 def initial(inp: str) -> MatchResult:
@@ -92,6 +94,99 @@ class OperatorFnRegexTest(TestCase):
         self.assertTrue(email_cpx(initial('padget@gmail.com')).matched())
         self.assertFalse(email_cpx(initial('padget!gmail.com')).matched())
 
+    def test_tree(self):
+        """Teste que les opérateurs construisent le même arbre
+        que les constructeurs de fnregex
+        """
+
+        self.assertEqual(charinterval('a', 'z'), (op.a - op.z).fnrx)
+        self.assertEqual(literal('ab'), (op.a >> op.b).fnrx)
+        self.assertEqual(charset('ab'), (op.a | op.b).fnrx)
+        self.assertEqual(choice(literal('ab'), char('c')),
+                         (op.a >> op.b | op.c).fnrx)
+        self.assertEqual(repeat(char('a'), 1, 5), op.a[1:5].fnrx)
+        self.assertEqual(literal('abc'), (op.a >> op.b >> op.c).fnrx)
+        self.assertEqual(literal('abc'), op.op(seq(seq(char('a'), char('b')),
+                                                   char('c'))).fnrx)
+        self.assertEqual(seq(char('a'), char('b')), seq(op.a, op.b))
+
+    def test_group(self):
+        """Teste les groupes de capture construits avec les
+        opérateurs, que l'optimisation ne fusionne ni ne retire
+        """
+
+        date = op.group(op.digit[4:4], 'year') >> op.minus >> \
+            op.group(op.digit[2:2], 'month')
+        self.assertEqual({'year': '2024', 'month': '05'},
+                         fullmatch(date, '2024-05').groupdict())
+        rx = op.group(op.a) >> op.b | op.group(op.a) >> op.c
+        self.assertEqual((None, 'a'), match(rx, 'ac').groups())
+        rx = op.a[0:] | op.group(op.b)
+        self.assertEqual((None,), match(rx, 'b').groups())
+        self.assertEqual((None,), match(op.op(repeat(op.group(op.a), 0, 0)),
+                                        'a').groups())
+
+    def test_charset(self):
+        """Teste la construction d'ensembles de caractères
+        avec les opérateurs
+        """
+
+        vowels = op.a | op.e | op.i | op.o | op.u | op.y
+        self.assertIsInstance(vowels.fnrx, CharSet)
+        self.assertEqual(charset('aeiouy'), vowels.fnrx)
+        alnum = op.lower | op.upper | op.digit
+        self.assertEqual(charset(charinterval('a', 'z'),
+                                 charinterval('A', 'Z'),
+                                 charinterval('0', '9')), alnum.fnrx)
+        consonants = op.lower - vowels
+        self.assertTrue(consonants(initial('b')).matched())
+        self.assertFalse(consonants(initial('a')).matched())
+        self.assertFalse(consonants(initial('B')).matched())
+        self.assertEqual(charset('ae'), (vowels & (op.a - op.f)).fnrx)
+        not_digit = ~op.digit
+        self.assertTrue(not_digit(initial('a')).matched())
+        self.assertTrue(not_digit(initial('\u00e9')).matched())
+        self.assertFalse(not_digit(initial('5')).matched())
+        self.assertFalse(not_digit(initial('')).matched())
+        self.assertEqual(charset('bcdfgh'), (op.b - op.h - vowels).fnrx)
+        self.assertIsInstance((op.a | (op.b >> op.c)).fnrx, Choice)
+
+        with self.assertRaises(UnsupportedPatternError):
+            ~(op.a >> op.b)
+
+    def test_lazy_presets(self):
+        """Teste que les caractères et intervalles prédéfinis ne
+        sont construits qu'à leur premier accès, puis conservés
+        """
+
+        self.assertNotIn('Q', vars(op))
+        self.assertIn('Q', dir(op))
+        from fre.opregex import Q
+        self.assertIs(Q, op.Q)
+        self.assertIn('Q', vars(op))
+        self.assertEqual(char('Q'), Q.fnrx)
+        self.assertEqual(char('7'), op._7.fnrx)
+        self.assertEqual(char('_'), op.__.fnrx)
+        self.assertEqual(char(':'), op.colon.fnrx)
+        self.assertEqual(charinterval('a', 'z'), op.lower.fnrx)
+        self.assertEqual(charinterval('0', '9'), op.digit.fnrx)
+
+        with self.assertRaises(AttributeError):
+            op.unknown
+
+    def test_star_import(self):
+        """Teste que import * exporte les caractères et
+        intervalles prédéfinis
+        """
+
+        namespace = {}
+        exec('from fre.opregex import *', namespace)
+        self.assertEqual(charinterval('a', 'z'), namespace['lower'].fnrx)
+        self.assertEqual(char('a'), namespace['a'].fnrx)
+        self.assertEqual(char(':'), namespace['colon'].fnrx)
+        self.assertIn('op', namespace)
+        self.assertIn('group', namespace)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,121 @@
+from functools import reduce
+from random import Random
+from sys import maxsize
+from unittest import TestCase, main
+
+from fre.fnregex import char, charinterval, charset, literal, seq, choice, \
+    repeat, match, fullmatch, Seq, Literal, Repeat
+from fre.optimize import optimize, simplify
+from test_fnregex import random_pattern
+
+
+class SimplifyTest(TestCase):
+
+    def test_seq(self):
+        """Teste l'aplatissement des séquences et la fusion des
+        caractères en Literal
+        """
+
+        self.assertEqual(literal('abc'),
+                         optimize(seq(seq(char('a'), char('b')), char('c'))))
+        self.assertEqual(seq(literal('ab'), charinterval('0', '9'), char('c')),
+                         optimize(seq(char('a'), seq(char('b'),
+                                                     charinterval('0', '9')),
+                                      char('c'))))
+        self.assertEqual(char('a'), simplify(seq(char('a'))))
+        self.assertEqual(char('a'), simplify(seq(char('a'), literal(''))))
+
+    def test_choice(self):
+        """Teste la fusion en CharSet et la factorisation des
+        préfixes communs
+        """
+
+        self.assertEqual(charset('abc'),
+                         optimize(choice(char('a'), choice(char('b'),
+                                                           char('c')))))
+        digit = charinterval('0', '9')
+        self.assertEqual(seq(digit, charset('bc')),
+                         optimize(choice(seq(digit, char('b')),
+                                         seq(digit, char('c')))))
+        self.assertEqual(seq(digit, literal('for'),
+                             choice(char('e'), Seq(()))),
+                         optimize(choice(seq(digit, literal('fore')),
+                                         seq(digit, literal('for')))))
+        self.assertEqual(seq(digit, literal('for'),
+                             choice(Seq(()), char('e'))),
+                         optimize(choice(seq(digit, literal('for')),
+                                         seq(digit, literal('fore')))))
+        self.assertEqual(choice(literal('ab'), literal('ac')),
+                         optimize(choice(literal('ab'), literal('ac'))))
+        self.assertEqual(choice(char('a'), literal('bc'), char('a')),
+                         optimize(choice(char('a'), literal('bc'), char('a'))))
+
+    def test_unreachable(self):
+        """Teste que les branches qui suivent une branche
+        réussissant toujours sont conservées pour le mode
+        backtrack, sans changer le matching possessif
+        """
+
+        rx = choice(repeat(char('a'), 0, 2), char('b'))
+        self.assertEqual(rx, optimize(rx))
+        self.assertEqual(0, match(optimize(rx), 'b').index)
+
+    def test_repeat(self):
+        """Teste la simplification des répétitions"""
+
+        a = char('a')
+        self.assertEqual(a, optimize(repeat(a, 1, 1)))
+        self.assertEqual(Seq(()), optimize(repeat(a, 0, 0)))
+        self.assertEqual(Repeat(a, 0, maxsize),
+                         optimize(repeat(repeat(a, 0, maxsize), 1, maxsize)))
+        self.assertEqual(Repeat(a, 2, maxsize),
+                         optimize(repeat(repeat(a, 2, maxsize), 1, 3)))
+        self.assertEqual(Repeat(a, 0, maxsize),
+                         optimize(repeat(repeat(a, 1, maxsize), 0, 1)))
+        self.assertEqual(repeat(repeat(a, 2, maxsize), 0, 1),
+                         optimize(repeat(repeat(a, 2, maxsize), 0, 1)))
+
+    def test_deep(self):
+        """Teste l'optimisation d'un arbre très profond"""
+
+        deep = reduce(lambda acc, _: seq(acc, char('a')), range(5000),
+                      char('a'))
+        self.assertEqual(Literal('a' * 5001), optimize(deep))
+
+
+class DifferentialTest(TestCase):
+
+    def test_random(self):
+        """Compare les résultats des expressions optimisées et
+        non optimisées sur des expressions aléatoires
+        """
+
+        rnd = Random(8)
+
+        for _ in range(500):
+            pattern = random_pattern(rnd, 4)
+
+            if rnd.random() < 0.2:
+                pattern = repeat(repeat(pattern, rnd.randint(0, 2), maxsize),
+                                 rnd.randint(0, 1),
+                                 rnd.choice([1, 3, maxsize]))
+
+            if rnd.random() < 0.2:
+                words = [literal(''.join(rnd.choice('ab')
+                                         for _ in range(rnd.randint(1, 3))))
+                         for _ in range(3)]
+                pattern = choice(*rnd.sample(words + [pattern], 4))
+
+            optimized = optimize(pattern)
+
+            for _ in range(20):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                self.assertEqual(match(pattern, inp), match(optimized, inp),
+                                 (pattern, inp))
+                self.assertEqual(fullmatch(pattern, inp).matched(),
+                                 fullmatch(optimized, inp).matched())
+
+
+if __name__ == '__main__':
+    main()
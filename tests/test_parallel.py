@@ -0,0 +1,56 @@
+import os
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.fnregex import match, fullmatch
+from fre.parallel import match_all, count_matches, lines
+
+code = op.upper[2:2] >> op.minus >> op.digit[4:4]
+
+
+class ParallelTest(TestCase):
+
+    def setUp(self):
+        rnd = Random(14)
+        self.corpus = [rnd.choice(['AB-1234', 'AB-12345', 'ab-1234', ''])
+                       for _ in range(500)]
+
+    def test_match_all(self):
+        """Teste l'ordre des résultats répartis sur des processus"""
+
+        for full, fn in ((False, match), (True, fullmatch)):
+            expected = [fn(code, inp).matched() for inp in self.corpus]
+            self.assertEqual(expected, match_all(code, self.corpus, full,
+                                                 processes=2, chunk_size=7))
+            self.assertEqual(expected, match_all(code, iter(self.corpus),
+                                                 full, processes=1))
+
+    def test_count_matches(self):
+        """Teste le décompte des correspondances"""
+
+        expected = sum(fullmatch(code, inp).matched() for inp in self.corpus)
+        self.assertEqual(expected, count_matches(code, self.corpus, True,
+                                                 processes=3, chunk_size=50))
+        self.assertEqual(0, count_matches(code, [], processes=2))
+
+    def test_lines(self):
+        """Teste la lecture des lignes d'un fichier"""
+
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'corpus.txt')
+
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(self.corpus) + '\n')
+
+            self.assertEqual(self.corpus, list(lines(path)))
+            self.assertEqual([inp.encode() for inp in self.corpus],
+                             list(lines(path, None)))
+            self.assertEqual(count_matches(code, self.corpus, True),
+                             count_matches(code, lines(path), True,
+                                           processes=2, chunk_size=64))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.fnregex import match, fullmatch, literal
+from fre.patternset import PatternSet, compile
+from test_fnregex import random_pattern
+
+word = op.lower[1:]
+number = op.digit[1:]
+# a[1:] >> a n'est pas déterministe, il est testé à part
+patterns = [op.op(literal('GET')) >> op.colon >> word, number, word,
+            op.a[1:] >> op.a, op.op(literal('GET')) >> op.colon]
+
+
+class PatternSetTest(TestCase):
+
+    def test_matches(self):
+        """Teste la recherche des FnRegex qui correspondent"""
+
+        patternset = compile(patterns)
+        self.assertEqual(5, len(patternset))
+        self.assertEqual([0, 4], patternset.matches('GET:index'))
+        self.assertEqual({0: 9, 4: 4}, patternset.ends('GET:index'))
+        self.assertEqual([0], patternset.matches('GET:index', full=True))
+        self.assertEqual([1], patternset.matches('123abc'))
+        self.assertEqual([2], patternset.matches('abc', full=True))
+        self.assertEqual([2], patternset.matches('aaa'))
+        self.assertEqual([], patternset.matches('-'))
+        self.assertEqual([2], patternset.matches('x-GET:a', pos=0))
+        self.assertEqual([0, 4], patternset.matches('x-GET:a', pos=2))
+        self.assertEqual([4], patternset.matches('GET:a', endpos=4))
+
+    def test_first(self):
+        """Teste la recherche de la FnRegex prioritaire"""
+
+        patternset = PatternSet(patterns)
+        self.assertEqual(0, patternset.first('GET:index'))
+        self.assertEqual(4, patternset.first('GET:'))
+        self.assertEqual(4, patternset.first('GET:', full=True))
+        self.assertEqual(2, patternset.first('aaa', full=True))
+        self.assertIsNone(patternset.first('GET'))
+        self.assertIsNone(PatternSet([]).first('a'))
+
+    def test_longest(self):
+        """Teste la recherche de la plus longue correspondance"""
+
+        patternset = PatternSet(patterns)
+        self.assertEqual((0, 9, False), patternset.longest('GET:index'))
+        self.assertEqual((0, 5, True), patternset.longest('GET:a-'))
+        self.assertEqual((4, 4, False), patternset.longest('GET:a', endpos=4))
+        self.assertEqual((1, 3, True), patternset.longest('123abc'))
+        self.assertEqual((2, 3, False), patternset.longest('aaa'))
+        self.assertEqual((None, 0, True), patternset.longest('-'))
+
+    def test_random(self):
+        """Compare le PatternSet aux appels de match et fullmatch
+        sur des ensembles aléatoires
+        """
+
+        rnd = Random(21)
+
+        for _ in range(200):
+            fnrxs = [random_pattern(rnd, 3) for _ in range(rnd.randint(1, 10))]
+            patternset = PatternSet(fnrxs, cache_size=rnd.choice([1, 1000]))
+
+            for _ in range(5):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                ends = {i: match(p, inp).index for i, p in enumerate(fnrxs)
+                        if match(p, inp).matched()}
+                full = [i for i, p in enumerate(fnrxs)
+                        if fullmatch(p, inp).matched()]
+                self.assertEqual(ends, patternset.ends(inp))
+                self.assertEqual(full, patternset.matches(inp, full=True))
+                self.assertEqual(min(ends, default=None),
+                                 patternset.first(inp))
+                self.assertEqual(full[0] if full else None,
+                                 patternset.first(inp, full=True))
+
+    def test_cache(self):
+        """Teste que le cache d'états reste borné"""
+
+        patternset = PatternSet([op.a[0:] >> op.b, op.lower[3:3]],
+                                cache_size=2)
+        self.assertEqual([0, 1], patternset.matches('aaaab'))
+        self.assertLessEqual(patternset.states, 2)
+        self.assertGreater(patternset.flushes, 0)
+
+
+if __name__ == '__main__':
+    main()
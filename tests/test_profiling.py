@@ -0,0 +1,81 @@
+import json
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.fnregex import match, fullmatch, node, FAIL
+from fre.profiling import Profiler
+from test_fnregex import random_pattern
+
+name = op.lower[1:10]
+email = name >> op.dot >> name >> op.at >> name >> op.dot >> name
+
+
+class ProfilerTest(TestCase):
+
+    def test_stats(self):
+        """Teste les statistiques de chaque noeud"""
+
+        profiler = Profiler(email)
+        self.assertTrue(profiler.fullmatch('padget.pro@gmail.com').matched())
+        self.assertFalse(profiler.match('PADGET').matched())
+        root = profiler.root
+        self.assertEqual((2, 1, 1, 20), (root.calls, root.successes,
+                                         root.failures, root.consumed))
+        first = root.children[0]
+        self.assertEqual('Repeat[1:10]', first.label())
+        self.assertEqual((2, 1, 6), (first.calls, first.failures,
+                                     first.consumed))
+        self.assertEqual((8, 6), (first.children[0].calls,
+                                  first.children[0].successes))
+        self.assertGreaterEqual(root.time, sum(c.time for c in root.children))
+
+        profiler.reset()
+        self.assertEqual(0, root.calls + first.children[0].time)
+
+    def test_export(self):
+        """Teste le rapport texte, l'export et le hook"""
+
+        calls = []
+        profiler = Profiler(email, lambda stats, pos, end: calls.append(
+            (stats.label(), pos, end)))
+        profiler.match('a.b@c')
+        self.assertIn(("Char(c='@')", 3, 4), calls)
+        self.assertIn(("Char(c='.')", 5, FAIL), calls)
+        self.assertEqual(('Seq(7)', 0, FAIL), calls[-1])
+
+        tree = json.loads(json.dumps(profiler.tree()))
+        self.assertEqual(7, len(tree['children']))
+        self.assertEqual(1, tree['failures'])
+        report = profiler.report().splitlines()
+        self.assertEqual(1 + 12, len(report))
+        self.assertTrue(report[1].endswith('Seq(7)'))
+
+    def test_untouched(self):
+        """Teste que la FnRegex profilée n'est pas instrumentée"""
+
+        tree = node(email)
+        Profiler(email).match('a.b@c.d')
+        self.assertIs(tree, node(email))
+        self.assertEqual(match(email, 'a.b@c.d'), Profiler(email)
+                         .match('a.b@c.d'))
+
+    def test_random(self):
+        """Compare le matching instrumenté au matching des FnRegex"""
+
+        rnd = Random(18)
+
+        for _ in range(200):
+            rx = random_pattern(rnd, 3)
+            profiler = Profiler(rx)
+
+            for _ in range(5):
+                inp = ''.join(rnd.choice('abc')
+                              for _ in range(rnd.randrange(6)))
+                self.assertEqual(match(rx, inp), profiler.match(inp))
+                self.assertEqual(fullmatch(rx, inp).matched(),
+                                 profiler.fullmatch(inp).matched())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import re
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.fnregex import char, charinterval, charset, literal, seq, choice, \
+    repeat, MatchResult, UnsupportedPatternError
+from fre.stdre import compile, translate
+
+
+class TranslateTest(TestCase):
+
+    def test_translate(self):
+        """Teste la traduction de chaque type de noeud"""
+
+        self.assertEqual('a', translate(char('a')))
+        self.assertEqual('[a-z]', translate(charinterval('a', 'z')))
+        self.assertEqual('[\\-\\]-\\^a]', translate(charset('-]^a')))
+        self.assertEqual('a\\.b', translate(literal('a.b')))
+        self.assertEqual('(?>a|bc)', translate(choice(char('a'),
+                                                      literal('bc'))))
+        self.assertEqual('[0-9]{1,3}+', translate(op.digit[1:3]))
+        self.assertEqual('(?:ab){2,}+', translate(op.op(literal('ab'))[2:]))
+        self.assertEqual('(?!)', translate(repeat(char('a'), 3, 2)))
+
+    def test_not_atomic(self):
+        """Teste la traduction sans groupes atomiques, réservée
+        aux expressions déterministes
+        """
+
+        self.assertEqual('(?:a|bc)', translate(choice(char('a'),
+                                                      literal('bc')),
+                                               atomic=False))
+
+        with self.assertRaises(UnsupportedPatternError):
+            translate(op.a[1:] >> op.a, atomic=False)
+
+    def test_unsupported(self):
+        """Teste le refus des FnRegex opaques"""
+
+        with self.assertRaises(UnsupportedPatternError):
+            compile(seq(char('a'), lambda m: m))
+
+
+class ReFnRegexTest(TestCase):
+
+    def test_email(self):
+        """Teste la compilation d'une regex d'email"""
+
+        name = op.lower[1:10]
+        email = compile(name >> ((op.dot >> name)[0:1]) >> op.at >> name >>
+                        op.dot >> name)
+        self.assertIsInstance(email.regex, re.Pattern)
+        self.assertEqual(20, email.match('padget.pro@gmail.com!').index)
+        self.assertFalse(email.match('padget.pro!gmail.com').matched())
+        self.assertTrue(email.fullmatch('padget@gmail.com').matched())
+        self.assertFalse(email.fullmatch('padget@gmail.com!').matched())
+
+    def test_possessive(self):
+        """Teste que les répétitions ne rendent jamais de
+        caractères, comme celles des FnRegex
+        """
+
+        self.assertFalse(compile(op.a[1:] >> op.a).match('aaa').matched())
+        self.assertEqual(1, compile(op.a | op.a >> op.b).match('ab').index)
+
+    def test_fnregex(self):
+        """Teste qu'un ReFnRegex s'utilise comme une FnRegex"""
+
+        digits = compile(op.digit[1:3])
+        self.assertEqual(4, (op.op(digits) >> op.a)(
+            MatchResult('x12a', 1)).index)
+
+
+if __name__ == '__main__':
+    main()
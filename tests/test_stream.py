@@ -0,0 +1,137 @@
+import io
+import mmap
+import os
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre.analysis import is_deterministic
+from fre.fnregex import match, fullmatch, UnsupportedPatternError
+from fre.stream import StreamMatcher, match_stream, fullmatch_stream
+from test_fnregex import random_pattern
+
+name = op.lower[1:10]
+email = name >> op.dot >> name >> op.at >> name >> op.dot >> name
+
+
+def split(inp: str, rnd: Random):
+    """Découpe aléatoirement inp en morceaux"""
+
+    i = 0
+
+    while i < len(inp):
+        size = rnd.randint(0, 3)
+        yield inp[i:i + size]
+        i += size
+
+
+class StreamTest(TestCase):
+
+    def test_chunks(self):
+        """Teste le matching d'un input découpé en morceaux"""
+
+        chunks = ['padg', 'et.pro@gm', 'ail.c', 'om']
+        self.assertEqual(20, match_stream(email, chunks).index)
+        self.assertTrue(fullmatch_stream(email, chunks).matched())
+        self.assertFalse(fullmatch_stream(email, chunks + ['!']).matched())
+        self.assertFalse(match_stream(email, ['padget', '!']).matched())
+
+    def test_early(self):
+        """Teste que la source n'est plus lue une fois le
+        résultat décidé
+        """
+
+        def source():
+            yield 'abc1'
+            raise AssertionError('read after decision')
+
+        self.assertEqual(3, match_stream(op.lower[1:], source()).index)
+        self.assertFalse(fullmatch_stream(op.lower[1:], source()).matched())
+        self.assertEqual(2, match_stream(op.a >> op.b, source()).index)
+
+    def test_matcher(self):
+        """Teste l'utilisation incrémentale d'un StreamMatcher"""
+
+        matcher = StreamMatcher(op.digit[1:3])
+        self.assertFalse(matcher.feed('1'))
+        self.assertIsNone(matcher.result)
+        self.assertTrue(matcher.feed('23'))
+        self.assertEqual(3, matcher.result.index)
+        self.assertEqual(3, matcher.close().index)
+
+        matcher = StreamMatcher(op.digit[1:3], full=True)
+        self.assertFalse(matcher.feed('12'))
+        self.assertTrue(matcher.close().matched())
+
+    def test_bytes(self):
+        """Teste le décodage incrémental des morceaux binaires,
+        un caractère pouvant être coupé entre deux morceaux
+        """
+
+        word = op.op(op.charinterval('a', 'ÿ'))[1:]
+        data = 'hété!'.encode('utf-8')
+        self.assertEqual(4, match_stream(word, [data[:2], data[2:]]).index)
+        self.assertEqual(4, match_stream(word, data, chunk_size=1).index)
+        self.assertTrue(fullmatch_stream(word, [data[:2], data[2:6]])
+                        .matched())
+        self.assertEqual(2, match_stream(word, 'hé!'.encode('latin-1'),
+                                         encoding='latin-1').index)
+
+    def test_files(self):
+        """Teste le matching de fichiers et de mmap"""
+
+        text = 'padget.pro@gmail.com'
+        self.assertTrue(fullmatch_stream(email, io.StringIO(text),
+                                         chunk_size=3).matched())
+        self.assertTrue(fullmatch_stream(email, io.BytesIO(text.encode()),
+                                         chunk_size=3).matched())
+
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'digits')
+
+            with open(path, 'wb') as f:
+                f.write(b'0123456789' * 10000)
+
+            with open(path, 'rb') as f:
+                self.assertTrue(fullmatch_stream(op.digit[1:], f,
+                                                 chunk_size=4096).matched())
+
+            with open(path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.assertEqual(100000, match_stream(op.digit[1:], m).index)
+
+    def test_unsupported(self):
+        """Teste le refus des expressions non déterministes"""
+
+        with self.assertRaises(UnsupportedPatternError):
+            match_stream(op.a[1:] >> op.a, ['aa'])
+
+    def test_random(self):
+        """Compare le matching d'un flux découpé aléatoirement à
+        celui de l'input entier
+        """
+
+        rnd = Random(11)
+
+        for _ in range(300):
+            pattern = random_pattern(rnd, 4)
+
+            if not is_deterministic(pattern):
+                continue
+
+            for _ in range(10):
+                inp = ''.join(rnd.choice('abcd')
+                              for _ in range(rnd.randint(0, 8)))
+                expected = match(pattern, inp)
+                result = match_stream(pattern, split(inp, rnd))
+                self.assertEqual((expected.matched(), expected.index),
+                                 (result.matched(), result.index),
+                                 (pattern, inp))
+                self.assertEqual(fullmatch(pattern, inp).matched(),
+                                 fullmatch_stream(pattern, split(inp, rnd))
+                                 .matched())
+
+
+if __name__ == '__main__':
+    main()
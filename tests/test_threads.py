@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre import backends
+from fre.fnregex import match, fullmatch, node
+from fre.threads import match_all, count_matches
+
+code = op.upper[2:2] >> op.minus >> op.digit[4:4]
+opaque = code >> op.op(lambda m: m.current_ok())
+
+
+class ThreadsTest(TestCase):
+
+    def setUp(self):
+        rnd = Random(15)
+        self.corpus = [rnd.choice(['AB-1234', 'AB-12345', 'ab-1234', ''])
+                       for _ in range(500)]
+
+    def test_match_all(self):
+        """Teste l'ordre des résultats répartis sur des threads"""
+
+        for rx in (code, opaque):
+            for full, fn in ((False, match), (True, fullmatch)):
+                expected = [fn(rx, inp).matched() for inp in self.corpus]
+                self.assertEqual(expected, match_all(rx, self.corpus, full,
+                                                     threads=4,
+                                                     chunk_size=7))
+                self.assertEqual(expected, match_all(rx, iter(self.corpus),
+                                                     full, threads=1))
+
+    def test_count_matches(self):
+        """Teste le décompte des correspondances"""
+
+        expected = sum(fullmatch(code, inp).matched() for inp in self.corpus)
+        self.assertEqual(expected, count_matches(code, self.corpus, True,
+                                                 threads=3, chunk_size=50))
+        self.assertEqual(0, count_matches(code, [], threads=2))
+
+    def test_shared(self):
+        """Teste le partage d'une seule forme compilée entre threads"""
+
+        rx = node(op.lower[1:5] >> op.digit)
+
+        with ThreadPoolExecutor(8) as executor:
+            compiled = set(map(id, executor.map(
+                lambda _: backends.compile(rx, 'codegen'), range(64))))
+
+        self.assertEqual(1, len(compiled))
+
+
+if __name__ == '__main__':
+    main()
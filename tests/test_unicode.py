@@ -0,0 +1,132 @@
+import marshal
+import os
+import unicodedata
+from random import Random
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import fre.opregex as op
+import fre.unicode as uc
+from fre.fnregex import CharSet, fullmatch, findall
+from fre.stdre import translate
+
+
+class UnicodeTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # les tables sont construites une seule fois, dans un
+        # cache temporaire
+        cls.cache = TemporaryDirectory()
+        cls.state = uc.CACHE_DIR, uc._tables, dict(uc._classes)
+        uc.CACHE_DIR, uc._tables = cls.cache.name, None
+        uc._classes.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        uc.CACHE_DIR, uc._tables, classes = cls.state
+        uc._classes.clear()
+        uc._classes.update(classes)
+        cls.cache.cleanup()
+
+    def test_category(self):
+        """Teste les catégories générales et majeures"""
+
+        letters = uc.category('L')
+        self.assertIsInstance(letters, CharSet)
+        self.assertTrue(all(c in letters for c in 'aZéΩ一'))
+        self.assertFalse(any(c in letters for c in '1 -٠'))
+        self.assertIn('٠', uc.category('Nd'))
+        self.assertIn('A', uc.category('LC'))
+        self.assertNotIn('一', uc.category('LC'))
+        self.assertIs(letters, uc.category('L'))
+
+        with self.assertRaises(ValueError):
+            uc.category('Xx')
+
+    def test_script(self):
+        """Teste les écritures"""
+
+        self.assertTrue(all(c in uc.script('Latin') for c in 'azéＡ'))
+        self.assertTrue(all(c in uc.script('Greek') for c in 'αΩ'))
+        self.assertIn('一', uc.script('Han'))
+        self.assertIn('가', uc.script('Hangul'))
+        self.assertNotIn('1', uc.script('Latin'))
+        self.assertNotIn('a', uc.script('Greek'))
+
+        with self.assertRaises(ValueError):
+            uc.script('Klingon')
+
+    def test_unicodedata(self):
+        """Compare les catégories à unicodedata sur des code
+        points aléatoires
+        """
+
+        rnd = Random(25)
+
+        for _ in range(2000):
+            c = chr(rnd.randrange(0x110000))
+            name = unicodedata.category(c)
+            self.assertIn(c, uc.category(name))
+            self.assertIn(c, uc.category(name[0]))
+            self.assertNotIn(c, uc.category('Zs' if name != 'Zs' else 'Lu'))
+
+    def test_cache(self):
+        """Teste que les tables sont relues depuis le cache
+        disque plutôt que reconstruites
+        """
+
+        built = uc.tables()
+        self.assertEqual(1, len(os.listdir(self.cache.name)))
+
+        try:
+            uc._tables = None
+
+            with patch('fre.unicode._build',
+                       side_effect=AssertionError('not cached')):
+                self.assertEqual(built, uc.tables())
+        finally:
+            uc._tables = built
+
+    def test_corrupt_cache(self):
+        """Teste qu'un cache disque corrompu est reconstruit"""
+
+        built = uc.tables()
+        path = uc._path(self.cache.name)
+        valid = {name: table.tobytes() for name, table in built.items()}
+
+        try:
+            for payload in ([1, 2], {'Lu': 3}, {'Lu': b'\0' * 4},
+                            dict(valid, Lu=b'\0' * 6), None):
+                with open(path, 'wb') as f:
+                    f.write(b'\xff' if payload is None
+                            else marshal.dumps(payload))
+
+                uc._tables = None
+                self.assertEqual(built, uc.tables())
+
+                with open(path, 'rb') as f:
+                    self.assertEqual(valid, marshal.loads(f.read()))
+        finally:
+            uc._tables = built
+
+    def test_opregex(self):
+        """Teste les classes Unicode avec les opérateurs et les
+        différentes formes de matching
+        """
+
+        word = op.category('L')[1:]
+        self.assertTrue(fullmatch(word, 'Éléphant').matched())
+        self.assertFalse(fullmatch(word, 'été2').matched())
+        self.assertEqual(['naïve', 'café', '東京'],
+                         findall(word, 'naïve café, 東京 1984'))
+        greek = op.script('Greek')[1:]
+        self.assertTrue(fullmatch(greek, 'αβγ').matched())
+        self.assertTrue(fullmatch(word, 'Ωmega', backend='dfa')
+                        .matched())
+        self.assertRegex('Ωmega', '^%s$' % translate(word))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import pickle
+from random import Random
+from sys import maxsize
+from unittest import TestCase, main
+
+import fre.opregex as op
+from fre import codegen, dfa, wire
+from fre.fnregex import MatchResult, UnsupportedPatternError, node, seq, \
+    repeat, char, literal, fullmatch
+from test_fnregex import random_pattern
+
+
+class WireTest(TestCase):
+
+    def test_roundtrip(self):
+        """Teste la sérialisation d'arbres aléatoires"""
+
+        rnd = Random(14)
+
+        for _ in range(300):
+            rx = node(random_pattern(rnd, 4))
+            self.assertEqual(rx, wire.loads(wire.dumps(rx)))
+
+        for rx in (repeat(char('x'), 0, maxsize), repeat(char('x'), -2, -1),
+                   literal('été \U0001F600'), op.lower | op.upper,
+                   op.group(op.a) >> op.group(op.b, 'b\u00e9')):
+            self.assertEqual(node(rx), wire.loads(wire.dumps(rx)))
+
+    def test_format(self):
+        """Teste la compacité et la stabilité du format"""
+
+        self.assertEqual(b'FRE\x01\x00a\x00b\x04\x02\x00\x01',
+                         wire.dumps(seq(char('a'), char('b'))))
+        shared = op.digit[1:3]
+        # le sous-arbre partagé n'est écrit qu'une fois
+        self.assertEqual(b'FRE\x01\x0109\x06\x00\x02\x07\x00-'
+                         b'\x04\x03\x01\x02\x01',
+                         wire.dumps(seq(shared, char('-'), shared)))
+
+    def test_errors(self):
+        """Teste les données invalides et les FnRegex opaques"""
+
+        for data in (b'', b'XYZ\x01', b'FRE\x02\x00a', b'FRE\x01',
+                     b'FRE\x01\x09', b'FRE\x01\x04\x01\x05',
+                     b'FRE\x03\x03\x05ab'):
+            with self.assertRaises(ValueError):
+                wire.loads(data)
+
+        with self.assertRaises(UnsupportedPatternError):
+            wire.dumps(lambda m: m)
+
+
+class PickleTest(TestCase):
+
+    def test_patterns(self):
+        """Teste pickle sur les FnRegex construites par opérateurs"""
+
+        rx = op.a >> op.b | op.digit[1:3]
+        copy = pickle.loads(pickle.dumps(rx))
+        self.assertEqual(rx, copy)
+        self.assertTrue(fullmatch(copy, '12').matched())
+
+    def test_deep(self):
+        """Teste pickle sur un arbre très profond"""
+
+        rx = char('a')
+
+        for _ in range(5000):
+            rx = seq(rx, char('b'))
+
+        copy = pickle.loads(pickle.dumps(rx))
+        self.assertEqual(rx._depth, copy._depth)
+        self.assertTrue(fullmatch(copy, 'a' + 'b' * 5000).matched())
+
+    def test_compiled(self):
+        """Teste pickle sur les formes compilées et les résultats"""
+
+        rx = op.digit[1:3] >> op.minus
+        generated = pickle.loads(pickle.dumps(codegen.compile(rx)))
+        self.assertTrue(generated.fullmatch('12-').matched())
+        automaton = pickle.loads(pickle.dumps(dfa.compile(rx)))
+        self.assertTrue(automaton.fullmatch('1-').matched())
+        m = MatchResult('ab', 1)
+        self.assertEqual(m, pickle.loads(pickle.dumps(m)))
+
+
+if __name__ == '__main__':
+    main()